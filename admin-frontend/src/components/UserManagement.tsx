@@ -8,6 +8,10 @@ const UserManagement = () => {
   const [error, setError] = useState<string | null>(null);
   const [roleFilter, setRoleFilter] = useState<string>('');
   const [searchQuery, setSearchQuery] = useState('');
+  const [page, setPage] = useState(1);
+  const [totalUsers, setTotalUsers] = useState(0);
+  const [totalIsApproximate, setTotalIsApproximate] = useState(false);
+  const [hasNextPage, setHasNextPage] = useState(false);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
   const [selectedUser, setSelectedUser] = useState<User | null>(null);
@@ -26,19 +30,26 @@ const UserManagement = () => {
   const [editRole, setEditRole] = useState<'user' | 'staff' | 'admin'>('user');
 
   useEffect(() => {
-    fetchUsers();
+    setPage(1);
   }, [roleFilter, searchQuery]);
 
+  useEffect(() => {
+    fetchUsers();
+  }, [roleFilter, searchQuery, page]);
+
   const fetchUsers = async () => {
     try {
       setLoading(true);
       setError(null);
-      const params: any = {};
+      const params: any = { page };
       if (roleFilter) params.role = roleFilter;
       if (searchQuery) params.search = searchQuery;
       
       const data = await getUsers(params);
-      setUsers(data);
+      setUsers(data.results);
+      setTotalUsers(data.count);
+      setTotalIsApproximate(data.count_is_approximate);
+      setHasNextPage(data.next !== null);
     } catch (err: any) {
       setError(err.response?.data?.error?.message || 'Failed to load users');
     } finally {
@@ -242,6 +253,28 @@ const UserManagement = () => {
             )}
           </tbody>
         </table>
+        <div className="flex items-center justify-between px-6 py-3 border-t border-gray-200 text-sm text-gray-600">
+          <span>
+            {totalIsApproximate ? 'About ' : ''}{totalUsers.toLocaleString()} users
+          </span>
+          <div className="space-x-2">
+            <button
+              onClick={() => setPage(page - 1)}
+              disabled={page === 1}
+              className="px-3 py-1 border border-gray-300 rounded-lg disabled:opacity-50"
+            >
+              Previous
+            </button>
+            <span>Page {page}</span>
+            <button
+              onClick={() => setPage(page + 1)}
+              disabled={!hasNextPage}
+              className="px-3 py-1 border border-gray-300 rounded-lg disabled:opacity-50"
+            >
+              Next
+            </button>
+          </div>
+        </div>
       </div>
 
       {/* Create User Modal */}
@@ -1,15 +1,22 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Product } from '../types/product';
-import { getAllProducts, toggleProductStatus, deletePackage, deleteCampaign } from '../services/productService';
+import {
+  getProducts,
+  getNextProductCursor,
+  toggleProductStatus,
+  deletePackage,
+  deleteCampaign,
+} from '../services/productService';
 import ProductForm from '../components/ProductForm';
 import DeleteConfirmationDialog from '../components/DeleteConfirmationDialog';
 
 const ProductManagementPage = () => {
   const navigate = useNavigate();
   const [products, setProducts] = useState<Product[]>([]);
-  const [filteredProducts, setFilteredProducts] = useState<Product[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState<'all' | 'package' | 'campaign'>('all');
@@ -21,50 +28,37 @@ const ProductManagementPage = () => {
     product: null,
   });
 
-  useEffect(() => {
-    fetchProducts();
-  }, []);
+  // Only the response to the latest request is shown
+  const latestRequest = useRef(0);
 
   useEffect(() => {
-    applyFilters();
-  }, [products, searchTerm, filterType, filterStatus]);
+    fetchProducts();
+  }, [searchTerm, filterType, filterStatus]);
 
-  const fetchProducts = async () => {
+  // Fetch the first page, or the page after `cursor` and append it
+  const fetchProducts = async (cursor?: string) => {
+    const request = ++latestRequest.current;
     try {
-      setLoading(true);
-      const data = await getAllProducts();
-      setProducts(data);
+      if (cursor) setLoadingMore(true);
+      const page = await getProducts({
+        search: searchTerm || undefined,
+        type: filterType !== 'all' ? filterType : undefined,
+        is_active: filterStatus !== 'all' ? filterStatus === 'active' : undefined,
+        cursor,
+      });
+      if (request !== latestRequest.current) return;
+      setProducts((loaded) => (cursor ? [...loaded, ...page.results] : page.results));
+      setNextCursor(getNextProductCursor(page));
       setError(null);
     } catch (err: any) {
+      if (request !== latestRequest.current) return;
       setError(err.response?.data?.message || 'Failed to load products');
     } finally {
-      setLoading(false);
-    }
-  };
-
-  const applyFilters = () => {
-    let filtered = [...products];
-
-    // Search filter
-    if (searchTerm) {
-      filtered = filtered.filter((product) =>
-        product.name.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-
-    // Type filter
-    if (filterType !== 'all') {
-      filtered = filtered.filter((product) => product.type === filterType);
-    }
-
-    // Status filter
-    if (filterStatus !== 'all') {
-      filtered = filtered.filter((product) =>
-        filterStatus === 'active' ? product.is_active : !product.is_active
-      );
+      if (request === latestRequest.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
-
-    setFilteredProducts(filtered);
   };
 
   const handleToggleStatus = async (product: Product) => {
@@ -218,14 +212,14 @@ const ProductManagementPage = () => {
                 </tr>
               </thead>
               <tbody className="bg-white divide-y divide-gray-200">
-                {filteredProducts.length === 0 ? (
+                {products.length === 0 ? (
                   <tr>
                     <td colSpan={6} className="px-6 py-8 text-center text-gray-500">
                       No products found
                     </td>
                   </tr>
                 ) : (
-                  filteredProducts.map((product) => (
+                  products.map((product) => (
                     <tr key={`${product.type}-${product.id}`} className="hover:bg-gray-50">
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div className="text-sm font-medium text-gray-900">{product.name}</div>
@@ -288,6 +282,17 @@ const ProductManagementPage = () => {
               </tbody>
             </table>
           </div>
+          {nextCursor && (
+            <div className="flex justify-center px-6 py-3 border-t border-gray-200">
+              <button
+                onClick={() => fetchProducts(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm text-gray-700 border border-gray-300 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
 
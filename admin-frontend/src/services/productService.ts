@@ -1,11 +1,27 @@
 import api from './api';
 import { Product, Package, Campaign, ProductFormData } from '../types/product';
 
-// Get all products (packages + campaigns)
-export const getAllProducts = async (): Promise<Product[]> => {
-  const response = await api.get('/admin/products/');
-  return response.data;
-};
+export interface PaginatedProducts {
+  next: string | null;
+  results: Product[];
+}
+
+// Get a page of products (packages + campaigns), newest first. Pass the
+// cursor of the previous page to continue after it.
+export const getProducts = async (params?: {
+  search?: string;
+  type?: 'package' | 'campaign';
+  is_active?: boolean;
+  cursor?: string;
+  page_size?: number;
+}): Promise<PaginatedProducts> => {
+  const response = await api.get('/admin/products/', { params });
+  return response.data;
+};
+
+// Cursor of the page after `page`, or null on the last page
+export const getNextProductCursor = (page: PaginatedProducts): string | null =>
+  page.next ? new URL(page.next).searchParams.get('cursor') : null;
 
 // Get package by ID
 export const getPackage = async (id: number): Promise<Package> => {
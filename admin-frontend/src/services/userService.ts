@@ -17,15 +17,24 @@ export interface CreateUserRequest {
   firebase_uid?: string;
 }
 
+export interface PaginatedUsers {
+  count: number;
+  count_is_approximate: boolean;
+  next: string | null;
+  previous: string | null;
+  results: User[];
+}
+
 export interface UpdateUserRoleRequest {
   role: 'user' | 'staff' | 'admin';
 }
 
-// Get all users with optional filters
+// Get a page of users with optional filters
 export const getUsers = async (params?: {
   role?: string;
   search?: string;
-}): Promise<User[]> => {
+  page?: number;
+}): Promise<PaginatedUsers> => {
   const response = await api.get('/auth/users/', { params });
   return response.data;
 };
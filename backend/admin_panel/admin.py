@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, SlowQuery
 
 
 @admin.register(Notification)
@@ -9,3 +9,12 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ['user__phone_number', 'user__username', 'title', 'message']
     readonly_fields = ['created_at']
     ordering = ['-created_at']
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'duration_ms', 'view_name', 'location', 'created_at']
+    list_filter = ['view_name', 'database', 'created_at']
+    search_fields = ['location', 'view_name', 'sql']
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+    ordering = ['-created_at']
@@ -0,0 +1,374 @@
+import heapq
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Avg, Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from authentication.models import CustomUser
+from orders.models import Order, ChecklistItem
+from .checklist_service import ChecklistService
+from .services import NotificationService
+from .cache_utils import invalidate_analytics_cache
+
+logger = logging.getLogger(__name__)
+
+OPEN_ORDER_STATUSES = ['assigned', 'in_progress']
+
+# Statuses an order can only have with a staff member assigned
+ASSIGNED_ORDER_STATUSES = OPEN_ORDER_STATUSES + ['completed']
+
+# Statuses an admin may move an order to from each status. Orders still
+# waiting for payment and completed orders cannot be changed in bulk.
+ALLOWED_STATUS_TRANSITIONS = {
+    'pending_payment': set(),
+    'pending_resources': {'ready_for_processing'},
+    'ready_for_processing': {'pending_resources', 'assigned', 'in_progress', 'completed'},
+    'assigned': {'assigned', 'in_progress', 'completed'},
+    'in_progress': {'assigned', 'in_progress', 'completed'},
+    'completed': set(),
+}
+
+
+class InvalidStatusTransition(ValueError):
+    """Raised when a bulk update would move orders to a status they cannot reach"""
+
+    def __init__(self, transitions):
+        super().__init__(f'{len(transitions)} order(s) cannot be moved to the requested status')
+        self.transitions = transitions
+
+
+class AssignmentService:
+    """Service for distributing ready orders across staff by workload"""
+
+    @staticmethod
+    def open_orders_by_staff(staff_ids):
+        """Open order counts per staff member, as rows of assigned_to_id and count"""
+        return (
+            Order.objects.filter(assigned_to_id__in=staff_ids, status__in=OPEN_ORDER_STATUSES)
+            .order_by()
+            .values('assigned_to_id')
+            .annotate(count=Count('id'))
+        )
+
+    @staticmethod
+    def remaining_minutes_by_staff(staff_ids):
+        """Estimated minutes of incomplete checklist items on open orders per staff member"""
+        return (
+            ChecklistItem.objects.filter(
+                checklist__order__assigned_to_id__in=staff_ids,
+                checklist__order__status__in=OPEN_ORDER_STATUSES,
+                completed=False
+            )
+            .order_by()
+            .values('checklist__order__assigned_to_id')
+            .annotate(minutes=Sum(Coalesce(
+                'template_item__estimated_duration_minutes',
+                Value(settings.AUTO_ASSIGN_DEFAULT_TASK_MINUTES)
+            )))
+        )
+
+    @staticmethod
+    def get_staff_workloads(staff_ids):
+        """
+        Get the open work of staff members with two grouped queries.
+
+        Remaining effort is the estimated duration of every incomplete
+        checklist item on the staff member's open orders; items without an
+        estimate count as AUTO_ASSIGN_DEFAULT_TASK_MINUTES. Both queries
+        read orders through order_staff_status_idx, so they only touch the
+        open orders of the given staff (see orders/test_query_plans.py).
+
+        Returns a dict mapping staff id to
+        {'open_orders': int, 'remaining_minutes': int}.
+        """
+        workloads = {
+            staff_id: {'open_orders': 0, 'remaining_minutes': 0}
+            for staff_id in staff_ids
+        }
+
+        for row in AssignmentService.open_orders_by_staff(staff_ids):
+            workloads[row['assigned_to_id']]['open_orders'] = row['count']
+
+        for row in AssignmentService.remaining_minutes_by_staff(staff_ids):
+            workloads[row['checklist__order__assigned_to_id']]['remaining_minutes'] = row['minutes'] or 0
+
+        return workloads
+
+    @staticmethod
+    def get_staff_workload_summary():
+        """
+        Get every staff and admin user with their workload in one query.
+
+        Order counts and the average completion time are aggregated over a
+        single join to orders; the checklist backlog (incomplete items on
+        open orders) is a correlated subquery, so no per-staff queries run.
+
+        Returns a list of dicts ordered by username.
+        """
+        week_start = timezone.now() - timedelta(days=7)
+        backlog = (
+            ChecklistItem.objects.filter(
+                checklist__order__assigned_to=OuterRef('pk'),
+                checklist__order__status__in=OPEN_ORDER_STATUSES,
+                completed=False
+            )
+            .order_by()
+            .values('checklist__order__assigned_to')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+
+        staff = (
+            CustomUser.objects.filter(role__in=['staff', 'admin'])
+            .annotate(
+                open_orders=Count('assigned_orders', filter=Q(assigned_orders__status='assigned')),
+                in_progress_orders=Count('assigned_orders', filter=Q(assigned_orders__status='in_progress')),
+                completed_this_week=Count('assigned_orders', filter=Q(
+                    assigned_orders__status='completed',
+                    assigned_orders__updated_at__gte=week_start
+                )),
+                average_completion_time=Avg(
+                    ExpressionWrapper(
+                        F('assigned_orders__updated_at') - F('assigned_orders__created_at'),
+                        output_field=DurationField()
+                    ),
+                    filter=Q(assigned_orders__status='completed')
+                ),
+                checklist_backlog=Coalesce(Subquery(backlog), 0)
+            )
+            .order_by('username')
+            .values(
+                'id', 'username', 'phone_number', 'first_name', 'last_name', 'role',
+                'open_orders', 'in_progress_orders', 'completed_this_week',
+                'average_completion_time', 'checklist_backlog'
+            )
+        )
+
+        summary = []
+        for row in staff:
+            duration = row.pop('average_completion_time')
+            row['average_completion_hours'] = (
+                round(duration.total_seconds() / 3600, 2) if duration is not None else None
+            )
+            summary.append(row)
+        return summary
+
+    @staticmethod
+    def estimate_order_minutes(order_ids):
+        """
+        Estimate the effort of orders from their checklist items.
+        Returns a dict mapping order id to estimated minutes.
+        """
+        rows = (
+            ChecklistItem.objects.filter(checklist__order_id__in=order_ids)
+            .order_by()
+            .values('checklist__order_id')
+            .annotate(minutes=Sum(Coalesce(
+                'template_item__estimated_duration_minutes',
+                Value(settings.AUTO_ASSIGN_DEFAULT_TASK_MINUTES)
+            )))
+        )
+        return {row['checklist__order_id']: row['minutes'] or 0 for row in rows}
+
+    @staticmethod
+    def plan_assignments(orders, order_minutes, workloads):
+        """
+        Give each order to the staff member with the least estimated
+        remaining work at that point, so a batch spreads across staff; ties
+        go to fewer open orders.
+
+        Returns a dict mapping order id to staff id.
+        """
+        heap = [
+            (load['remaining_minutes'], load['open_orders'], staff_id)
+            for staff_id, load in workloads.items()
+        ]
+        heapq.heapify(heap)
+
+        plan = {}
+        for order in orders:
+            minutes, open_orders, staff_id = heapq.heappop(heap)
+            plan[order.id] = staff_id
+            heapq.heappush(heap, (minutes + order_minutes.get(order.id, 0), open_orders + 1, staff_id))
+        return plan
+
+    @staticmethod
+    def assign_pending_orders(batch_size=None):
+        """
+        Assign a batch of ready_for_processing orders to staff members.
+
+        Orders are claimed with SKIP LOCKED so an order is never assigned
+        twice. The batch is planned against the current workloads, then only
+        the staff members it picked are locked (in id order) and the batch
+        is planned again among them with their workloads re-read, so a
+        concurrent run that assigned to the same staff has committed and is
+        accounted for. Other staff rows stay unlocked.
+
+        Returns the list of assigned orders.
+        """
+        batch_size = batch_size or settings.AUTO_ASSIGN_BATCH_SIZE
+
+        with transaction.atomic():
+            staff_ids = list(
+                CustomUser.objects.filter(role='staff', is_active=True)
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+            if not staff_ids:
+                return []
+
+            orders = list(
+                Order.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(status='ready_for_processing', assigned_to__isnull=True)
+                .select_related('user')
+                .prefetch_related('items')
+                .order_by('created_at')[:batch_size]
+            )
+            if not orders:
+                return []
+
+            # Checklists are needed anyway and give the effort estimate
+            ChecklistService.generate_checklists_for_orders(orders)
+            order_minutes = AssignmentService.estimate_order_minutes([order.id for order in orders])
+            plan = AssignmentService.plan_assignments(
+                orders, order_minutes, AssignmentService.get_staff_workloads(staff_ids)
+            )
+
+            chosen_ids = list(
+                CustomUser.objects.select_for_update()
+                .filter(id__in=set(plan.values()), role='staff', is_active=True)
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+            if not chosen_ids:
+                # Deactivated since they were read
+                return []
+            plan = AssignmentService.plan_assignments(
+                orders, order_minutes, AssignmentService.get_staff_workloads(chosen_ids)
+            )
+
+            now = timezone.now()
+            for order in orders:
+                order.assigned_to_id = plan[order.id]
+                order.status = 'assigned'
+                order.updated_at = now
+
+            Order.objects.bulk_update(orders, ['assigned_to', 'status', 'updated_at'])
+            NotificationService.notify_staff_orders_assigned(orders)
+            transaction.on_commit(invalidate_analytics_cache)
+
+        logger.info(f"Auto-assigned {len(orders)} orders to {len(chosen_ids)} staff members")
+        return orders
+
+    @staticmethod
+    def update_orders(order_ids, staff_user=None, new_status=None):
+        """
+        Assign and/or transition many orders in one transaction.
+
+        Every transition is checked against ALLOWED_STATUS_TRANSITIONS first;
+        if any order cannot reach the new status nothing is changed and
+        InvalidStatusTransition is raised.
+
+        When a staff member is given the orders are assigned to them; without
+        a new status, orders already assigned or in progress keep theirs and
+        the others become 'assigned'. Their checklists are generated in one batch
+        and the staff member gets one bulk-inserted notification per order.
+        Admins are notified of every order that becomes completed, as when
+        an order is completed through its checklist. Orders are saved with a
+        single bulk UPDATE and the analytics cache is invalidated once.
+
+        Returns a list of per-order results in the order of order_ids.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+
+        results = {}
+        with transaction.atomic():
+            orders = Order.objects.select_for_update().filter(id__in=order_ids).prefetch_related('items')
+            orders = {order.id: order for order in orders}
+
+            targets = {}
+            for order in orders.values():
+                if new_status is None and staff_user is not None:
+                    # Reassigning alone does not restart work on an open order
+                    targets[order.id] = order.status if order.status in OPEN_ORDER_STATUSES else 'assigned'
+                else:
+                    targets[order.id] = new_status
+
+            invalid = [
+                {
+                    'order_id': order.id,
+                    'order_number': order.order_number,
+                    'from_status': order.status,
+                    'to_status': targets[order.id]
+                }
+                for order in (orders[order_id] for order_id in order_ids if order_id in orders)
+                if targets[order.id] not in ALLOWED_STATUS_TRANSITIONS[order.status]
+            ]
+            if invalid:
+                raise InvalidStatusTransition(invalid)
+
+            now = timezone.now()
+            updated = []
+            completed = []
+            for order_id in order_ids:
+                order = orders.get(order_id)
+                if order is None:
+                    results[order_id] = {'order_id': order_id, 'success': False, 'message': 'Order not found'}
+                    continue
+
+                target = targets[order_id]
+                if staff_user is not None:
+                    order.assigned_to = staff_user
+                elif target in ASSIGNED_ORDER_STATUSES and order.assigned_to_id is None:
+                    results[order_id] = {
+                        'order_id': order_id,
+                        'order_number': order.order_number,
+                        'success': False,
+                        'message': 'Order must be assigned to a staff member first'
+                    }
+                    continue
+
+                if target == 'completed':
+                    completed.append(order)
+                order.status = target
+                order.updated_at = now
+                updated.append(order)
+                results[order_id] = {
+                    'order_id': order_id,
+                    'order_number': order.order_number,
+                    'success': True,
+                    'status': target,
+                    'assigned_to': order.assigned_to_id
+                }
+
+            if updated:
+                Order.objects.bulk_update(updated, ['assigned_to', 'status', 'updated_at'])
+                if staff_user is not None:
+                    ChecklistService.generate_checklists_for_orders(updated)
+                    NotificationService.notify_staff_orders_assigned(updated)
+                for order in completed:
+                    NotificationService.queue_admin_notification(order, 'order_completed')
+                transaction.on_commit(invalidate_analytics_cache)
+
+        return [results[order_id] for order_id in order_ids]
+
+    @staticmethod
+    def schedule_assignment():
+        """Queue an assignment run after the current transaction commits, if enabled"""
+        if not settings.AUTO_ASSIGN_ORDERS:
+            return
+
+        def send():
+            from .tasks import auto_assign_orders
+
+            try:
+                auto_assign_orders.delay()
+            except Exception as exc:
+                # The periodic run will pick the order up
+                logger.error(f"Could not queue order auto-assignment: {str(exc)}")
+
+        transaction.on_commit(send)
@@ -1,13 +1,25 @@
+from django.conf import settings
 from django.core.cache import cache
+from rest_framework.response import Response
 from functools import wraps
 import hashlib
 import json
+from election_cart.admission import unavailable
+from election_cart.cache_keys import invalidate_namespace, versioned_key
+from election_cart.degraded_mode import defer_analytics_invalidation, is_degraded, save_snapshot, snapshot
+from election_cart.instrumentation import get_view_name
+from election_cart.metrics import analytics_cache_requests, load_shed
 
 
 def cache_analytics(timeout=300):
     """
     Decorator to cache analytics API responses.
     
+    Each response is also kept as a snapshot for DEGRADED_MODE_SNAPSHOT_TTL
+    seconds, in a cache that invalidation does not touch. In degraded mode a
+    request the cache cannot answer gets the snapshot instead of being
+    computed, or 503 when there is none.
+    
     Args:
         timeout: Cache timeout in seconds (default 300 = 5 minutes)
     """
@@ -26,21 +38,36 @@ def cache_analytics(timeout=300):
             # Create a hash of the cache key data
             cache_key_str = json.dumps(cache_key_data, sort_keys=True)
             cache_key_hash = hashlib.md5(cache_key_str.encode()).hexdigest()
-            cache_key = f'analytics:{view_func.__name__}:{cache_key_hash}'
+            cache_key = versioned_key('analytics', f'{view_func.__name__}:{cache_key_hash}')
             
             # Try to get from cache
-            cached_response = cache.get(cache_key)
-            if cached_response is not None:
-                return cached_response
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                analytics_cache_requests.labels(view_func.__name__, 'hit').inc()
+                return Response(cached_data)
+            analytics_cache_requests.labels(view_func.__name__, 'miss').inc()
+            
+            snapshot_key = f'analytics:{view_func.__name__}:{cache_key_hash}'
+            if is_degraded():
+                snapshot_data = snapshot(snapshot_key)
+                if snapshot_data is None:
+                    load_shed.labels(get_view_name(request), 'rejected').inc()
+                    return unavailable(
+                        'Temporarily unavailable during peak traffic', settings.DEGRADED_MODE_RETRY_AFTER
+                    )
+                load_shed.labels(get_view_name(request), 'snapshot').inc()
+                response = Response(snapshot_data)
+                response['X-Degraded-Mode'] = 'snapshot'
+                return response
             
             # Call the view function
             response = view_func(request, *args, **kwargs)
             
-            # Cache the response if successful
+            # Cache the response data if successful; the response itself
+            # cannot be rendered before DRF picks a renderer
             if response.status_code == 200:
-                # Render the response before caching to avoid pickle errors
-                response.render()
-                cache.set(cache_key, response, timeout)
+                cache.set(cache_key, response.data, timeout)
+                save_snapshot(snapshot_key, response.data)
             
             return response
         
@@ -52,16 +79,16 @@ def invalidate_analytics_cache():
     """
     Invalidate all analytics cache entries.
     This should be called when new orders are created or updated.
-    """
-    # Get all cache keys (this is implementation-specific)
-    # For LocMemCache, we can use cache.clear() to clear all
-    # For Redis, we would use pattern matching
     
-    # Simple approach: clear all cache
-    # In production with Redis, you could use:
-    # cache.delete_pattern('analytics:*')
+    The analytics key namespace gets a new version; other cache entries
+    are kept.
+    """
+    if is_degraded():
+        # Keep serving the cached analytics; invalidated when switched off
+        defer_analytics_invalidation()
+        return False
     
-    cache.clear()
+    invalidate_namespace('analytics')
     return True
 
 
@@ -82,4 +109,4 @@ def get_cache_key_for_analytics(view_name, **params):
     }
     cache_key_str = json.dumps(cache_key_data, sort_keys=True)
     cache_key_hash = hashlib.md5(cache_key_str.encode()).hexdigest()
-    return f'analytics:{view_name}:{cache_key_hash}'
+    return versioned_key('analytics', f'{view_name}:{cache_key_hash}')
@@ -1,6 +1,9 @@
+from collections import defaultdict
 from orders.models import OrderChecklist, ChecklistItem
 from products.models import ChecklistTemplateItem
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q, prefetch_related_objects
+from django.utils import timezone
 
 
 class ChecklistService:
@@ -13,64 +16,157 @@ class ChecklistService:
         If no templates exist, falls back to default checklist generation.
         Returns the created OrderChecklist instance.
         """
-        # Create or get checklist
-        checklist, created = OrderChecklist.objects.get_or_create(order=order)
-        
-        # If checklist already exists with items, return it
-        if not created and checklist.items.exists():
-            return checklist
-        
-        # Try to generate checklist from templates
-        template_items = ChecklistService._get_template_items_for_order(order)
-        
-        if template_items:
-            # Create checklist items from templates
-            ChecklistItem.objects.bulk_create([
-                ChecklistItem(
-                    checklist=checklist,
-                    template_item=template_item,
-                    description=template_item.name,
-                    order_index=template_item.order,
-                    is_optional=template_item.is_optional
+        return ChecklistService.generate_checklists_for_orders([order])[order.id]
+    
+    @staticmethod
+    def generate_checklists_for_orders(orders):
+        """
+        Generate checklists for many orders at once.
+        
+        Checklists, order items and template items are loaded with one query
+        each for the whole batch and every new checklist item is written with
+        a single bulk_create. Orders whose checklist already has items are
+        left untouched.
+        
+        Args:
+            orders: Iterable of Order instances
+            
+        Returns:
+            dict: OrderChecklist instances keyed by order id
+        """
+        orders = list(orders)
+        if not orders:
+            return {}
+        
+        order_ids = [order.id for order in orders]
+        
+        # Create missing checklists; ignore_conflicts keeps concurrent
+        # assignments of the same order from failing on the unique order_id.
+        # Built from order_id so the unsaved (pk-less) instances are not
+        # cached as order.checklist
+        existing_order_ids = set(
+            OrderChecklist.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True)
+        )
+        OrderChecklist.objects.bulk_create(
+            [OrderChecklist(order_id=order.id) for order in orders if order.id not in existing_order_ids],
+            ignore_conflicts=True
+        )
+        checklists = {
+            checklist.order_id: checklist
+            for checklist in OrderChecklist.objects.filter(order_id__in=order_ids)
+        }
+        
+        # Only orders whose checklist has no items yet need generating
+        populated_order_ids = set(
+            ChecklistItem.objects.filter(
+                checklist__order_id__in=order_ids
+            ).order_by().values_list('checklist__order_id', flat=True).distinct()
+        )
+        pending_orders = [order for order in orders if order.id not in populated_order_ids]
+        if not pending_orders:
+            return checklists
+        
+        prefetch_related_objects(pending_orders, 'items')
+        templates_by_product = ChecklistService._get_template_items_by_product(
+            [order_item for order in pending_orders for order_item in order.items.all()]
+        )
+        
+        new_items = []
+        fallback_orders = []
+        for order in pending_orders:
+            checklist = checklists[order.id]
+            template_items = ChecklistService._get_template_items_for_order(order, templates_by_product)
+            
+            if template_items:
+                # Create checklist items from templates
+                new_items.extend(
+                    ChecklistItem(
+                        checklist=checklist,
+                        template_item=template_item,
+                        description=template_item.name,
+                        order_index=template_item.order,
+                        is_optional=template_item.is_optional
+                    )
+                    for template_item in template_items
                 )
-                for template_item in template_items
-            ])
-        else:
-            # Fallback to default checklist generation
-            checklist_items = ChecklistService._generate_checklist_items(order)
+            else:
+                fallback_orders.append(order)
+        
+        if fallback_orders:
+            # Resolve customers and products for all fallback orders at once
+            prefetch_related_objects(fallback_orders, 'user')
+            prefetch_related_objects(
+                [order_item for order in fallback_orders for order_item in order.items.all()],
+                'content_object'
+            )
             
-            # Create checklist items
-            ChecklistItem.objects.bulk_create([
-                ChecklistItem(
-                    checklist=checklist,
-                    description=item['description'],
-                    order_index=item['order_index'],
-                    is_optional=item.get('is_optional', False)
+            for order in fallback_orders:
+                checklist = checklists[order.id]
+                new_items.extend(
+                    ChecklistItem(
+                        checklist=checklist,
+                        description=item['description'],
+                        order_index=item['order_index'],
+                        is_optional=item.get('is_optional', False)
+                    )
+                    for item in ChecklistService._generate_checklist_items(order)
                 )
-                for item in checklist_items
-            ])
         
-        return checklist
+        ChecklistItem.objects.bulk_create(new_items)
+        
+        # Seed the progress counters of the newly populated checklists
+        counters = defaultdict(lambda: dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0))
+        for item in new_items:
+            for field, value in item.counter_contribution().items():
+                counters[item.checklist_id][field] += value
+        updated_checklists = []
+        for checklist in checklists.values():
+            if checklist.id in counters:
+                for field, value in counters[checklist.id].items():
+                    setattr(checklist, field, value)
+                updated_checklists.append(checklist)
+        if updated_checklists:
+            OrderChecklist.objects.bulk_update(updated_checklists, OrderChecklist.COUNTER_FIELDS)
+        
+        return checklists
     
     @staticmethod
-    def _get_template_items_for_order(order):
+    def _get_template_items_by_product(order_items):
+        """
+        Fetch checklist template items for all products referenced by the
+        given order items in a single query.
+        Returns a dict mapping (content_type_id, object_id) to template items
+        ordered by their order field.
+        """
+        product_keys = {(order_item.content_type_id, order_item.object_id) for order_item in order_items}
+        if not product_keys:
+            return {}
+        
+        condition = Q()
+        for content_type_id, object_id in product_keys:
+            condition |= Q(content_type_id=content_type_id, object_id=object_id)
+        
+        templates_by_product = defaultdict(list)
+        for template_item in ChecklistTemplateItem.objects.filter(condition).order_by('order'):
+            templates_by_product[(template_item.content_type_id, template_item.object_id)].append(template_item)
+        
+        return templates_by_product
+    
+    @staticmethod
+    def _get_template_items_for_order(order, templates_by_product=None):
         """
         Get all checklist template items for products in the order.
         Returns a list of ChecklistTemplateItem objects ordered by their order field.
         """
-        template_items = []
+        order_items = order.items.all()
+        if templates_by_product is None:
+            templates_by_product = ChecklistService._get_template_items_by_product(order_items)
         
-        for order_item in order.items.all():
-            content_type = order_item.content_type
-            object_id = order_item.object_id
-            
-            # Get template items for this product
-            items = ChecklistTemplateItem.objects.filter(
-                content_type=content_type,
-                object_id=object_id
-            ).order_by('order')
-            
-            template_items.extend(items)
+        template_items = []
+        for order_item in order_items:
+            template_items.extend(
+                templates_by_product.get((order_item.content_type_id, order_item.object_id), [])
+            )
         
         # Re-sort all items by order to maintain proper sequence
         template_items.sort(key=lambda x: x.order)
@@ -102,7 +198,7 @@ class ChecklistService:
         # Generate tasks for each order item
         for order_item in order.items.all():
             item_name = str(order_item.content_object) if order_item.content_object else 'Item'
-            item_type = order_item.content_type.model
+            item_type = ContentType.objects.get_for_id(order_item.content_type_id).model
             quantity = order_item.quantity
             
             # Review resources
@@ -112,15 +208,16 @@ class ChecklistService:
             })
             index += 1
             
-            # Package-specific tasks
+            # Package- or campaign-specific tasks
             if item_type == 'package':
-                checklist_items.extend(ChecklistService._generate_package_tasks(item_name, quantity, index))
-                index += len(ChecklistService._generate_package_tasks(item_name, quantity, index))
-            
-            # Campaign-specific tasks
+                tasks = ChecklistService._generate_package_tasks(item_name, quantity, index)
             elif item_type == 'campaign':
-                checklist_items.extend(ChecklistService._generate_campaign_tasks(item_name, quantity, index))
-                index += len(ChecklistService._generate_campaign_tasks(item_name, quantity, index))
+                tasks = ChecklistService._generate_campaign_tasks(item_name, quantity, index)
+            else:
+                tasks = []
+            
+            checklist_items.extend(tasks)
+            index += len(tasks)
         
         # Final tasks
         checklist_items.append({
@@ -233,14 +330,12 @@ class ChecklistService:
         """
         Calculate progress percentage for a checklist.
         Excludes optional items from the calculation.
+        Reads the checklist's denormalized counters, so no queries are made.
         Returns a dict with progress information.
         """
-        items = checklist.items.all()
-        total_items = items.count()
-        
-        # Calculate progress excluding optional items
-        required_items = items.filter(is_optional=False)
-        total_required = required_items.count()
+        total_items = checklist.total_items
+        completed_items = checklist.completed_items
+        total_required = checklist.required_items
         
         if total_required == 0:
             # If no required items, use all items for calculation
@@ -253,7 +348,6 @@ class ChecklistService:
                     'progress_percentage': 0
                 }
             
-            completed_items = items.filter(completed=True).count()
             progress_percentage = int((completed_items / total_items) * 100)
             
             return {
@@ -265,8 +359,7 @@ class ChecklistService:
             }
         
         # Calculate based on required items only
-        completed_required = required_items.filter(completed=True).count()
-        completed_items = items.filter(completed=True).count()
+        completed_required = checklist.completed_required
         progress_percentage = int((completed_required / total_required) * 100)
         
         return {
@@ -277,6 +370,37 @@ class ChecklistService:
             'progress_percentage': progress_percentage
         }
     
+    @staticmethod
+    def set_item_completed(item, completed, user=None):
+        """
+        Mark a checklist item as complete or incomplete.
+        
+        The item row is only written when its state actually changes, so two
+        staff members toggling the same item at once are counted once, and
+        the checklist counters are adjusted with F() expressions.
+        Returns True if the item changed.
+        """
+        completed = bool(completed)
+        changed = ChecklistService.set_items_completed(item.checklist_id, [item.pk], completed, user)
+        
+        if changed:
+            item.completed = completed
+            item.completed_at = timezone.now() if completed else None
+            item.completed_by = user if completed else None
+        return bool(changed)
+    
+    @staticmethod
+    def set_items_completed(checklist_id, item_ids, completed, user=None):
+        """
+        Mark many items of one checklist as complete or incomplete in a
+        single transaction.
+        
+        Only items whose state changes are written and counted (see
+        ChecklistItemQuerySet.set_completed). Returns the number of items
+        that changed.
+        """
+        return ChecklistItem.objects.filter(checklist_id=checklist_id, pk__in=item_ids).set_completed(completed, user)
+    
     @staticmethod
     def update_order_status_based_on_checklist(order):
         """
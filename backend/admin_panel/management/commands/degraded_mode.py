@@ -0,0 +1,28 @@
+"""
+Switch degraded mode for all workers (see election_cart/degraded_mode.py).
+
+    python manage.py degraded_mode          # show whether it is on
+    python manage.py degraded_mode on
+    python manage.py degraded_mode off      # also runs the deferred work
+
+Workers only see the switch when DEGRADED_MODE_CACHE is shared with them
+(Redis, via REDIS_CACHE_URL).
+"""
+from django.core.management.base import BaseCommand
+
+from election_cart.degraded_mode import set_degraded, status
+
+
+class Command(BaseCommand):
+    help = 'Show or switch degraded mode (load shedding for peak traffic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('state', nargs='?', choices=['on', 'off'], help='Switch degraded mode on or off')
+
+    def handle(self, *args, **options):
+        if options['state']:
+            set_degraded(options['state'] == 'on')
+        current = status()
+        self.stdout.write(f"Degraded mode: {'on' if current['enabled'] else 'off'}")
+        self.stdout.write(f"Deferred notifications: {current['deferred_notifications']}")
+        self.stdout.write(f"Analytics invalidation pending: {current['analytics_invalidation_pending']}")
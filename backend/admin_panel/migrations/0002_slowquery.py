@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200)),
+                ('location', models.CharField(help_text='Innermost project frame, e.g. AnalyticsService.get_top_products', max_length=300)),
+                ('file_path', models.CharField(max_length=300)),
+                ('line_number', models.PositiveIntegerField()),
+                ('stack', models.TextField(help_text='Project frames, innermost first')),
+                ('sql', models.TextField()),
+                ('duration_ms', models.FloatField()),
+                ('database', models.CharField(default='default', max_length=50)),
+                ('explain', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='slowquery_created_idx'), models.Index(fields=['location'], name='slowquery_location_idx')],
+            },
+        ),
+    ]
@@ -24,3 +24,57 @@ class Notification(models.Model):
     
     def __str__(self):
         return f"{self.notification_type} - {self.user.phone_number}"
+
+
+class SlowQuery(models.Model):
+    """
+    A query that ran longer than SLOW_QUERY_THRESHOLD_MS, with where it came
+    from and, for a sample of SELECTs, its execution plan. Only the newest
+    SLOW_QUERY_LOG_SIZE rows are kept.
+    """
+    view_name = models.CharField(max_length=200)
+    location = models.CharField(max_length=300, help_text='Innermost project frame, e.g. AnalyticsService.get_top_products')
+    file_path = models.CharField(max_length=300)
+    line_number = models.PositiveIntegerField()
+    stack = models.TextField(help_text='Project frames, innermost first')
+    sql = models.TextField()
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=50, default='default')
+    explain = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='slowquery_created_idx'),
+            models.Index(fields=['location'], name='slowquery_location_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms at {self.location}"
+
+
+class RequestProfile(models.Model):
+    """
+    cProfile statistics and SQL of a profiled request (see
+    election_cart/profiling.py). Only the newest PROFILER_BUFFER_SIZE rows
+    are kept, for at most PROFILER_TTL seconds.
+    """
+    view_name = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    user = models.CharField(max_length=150, help_text='Username of the admin who profiled the request')
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    db_time_ms = models.FloatField()
+    stats = models.TextField(help_text='pstats report sorted by cumulative time')
+    raw = models.BinaryField(help_text="Marshalled stats in cProfile's dump_stats format")
+    queries = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from authentication.models import CustomUser
-from orders.models import Order, OrderItem, OrderResource, OrderChecklist, ChecklistItem, DynamicResourceSubmission
+from orders.models import Order, OrderItem, OrderResource, OrderChecklist, ChecklistItem
 from products.models import ResourceFieldDefinition
-from products.serializers import PackageSerializer, CampaignSerializer
+from products.serializers import PackageSerializer, CampaignSerializer, ProductItemListSerializer
 from .models import Notification
 
 
@@ -39,6 +39,8 @@ class StaffSerializer(serializers.ModelSerializer):
     
     def get_assigned_orders_count(self, obj):
         """Get count of orders assigned to this staff member"""
+        if hasattr(obj, 'open_orders_count'):
+            return obj.open_orders_count
         return obj.assigned_orders.filter(status__in=['assigned', 'in_progress']).count()
     
     def get_name(self, obj):
@@ -63,6 +65,7 @@ class OrderItemDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['id', 'item_type', 'item_details', 'quantity', 'price', 'subtotal', 'resources_uploaded', 'resources']
+        list_serializer_class = ProductItemListSerializer
     
     def get_item_type(self, obj):
         """Return the type of item (package or campaign)"""
@@ -101,8 +104,8 @@ class OrderItemDetailSerializer(serializers.ModelSerializer):
         except OrderResource.DoesNotExist:
             resources['static'] = None
         
-        # Get dynamic resource submissions
-        dynamic_submissions = DynamicResourceSubmission.objects.filter(order_item=obj).select_related('field_definition')
+        # Get dynamic resource submissions (prefetched with their field definitions)
+        dynamic_submissions = obj.dynamic_resources.all()
         resources['dynamic'] = []
         
         for submission in dynamic_submissions:
@@ -204,8 +207,8 @@ class AdminOrderDetailSerializer(serializers.ModelSerializer):
             except OrderResource.DoesNotExist:
                 pass
             
-            # Get dynamic resource submissions
-            dynamic_submissions = DynamicResourceSubmission.objects.filter(order_item=item).select_related('field_definition')
+            # Get dynamic resource submissions (prefetched with their field definitions)
+            dynamic_submissions = item.dynamic_resources.all()
             
             for submission in dynamic_submissions:
                 field_def = submission.field_definition
@@ -260,7 +263,7 @@ class AdminOrderDetailSerializer(serializers.ModelSerializer):
                     'completed_by': UserBasicSerializer(item.completed_by).data if item.completed_by else None,
                     'order_index': item.order_index,
                     'is_optional': item.is_optional,
-                    'template_item_id': item.template_item.id if item.template_item else None
+                    'template_item_id': item.template_item_id
                 } for item in items]
             }
         except OrderChecklist.DoesNotExist:
@@ -282,6 +285,33 @@ class OrderAssignmentSerializer(serializers.Serializer):
             raise serializers.ValidationError('Staff member not found')
 
 
+class BulkOrderUpdateSerializer(OrderAssignmentSerializer):
+    """Serializer for assigning or transitioning many orders at once"""
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+    staff_id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    
+    def validate(self, attrs):
+        """Require a staff member or a target status"""
+        if 'staff_id' not in attrs and 'status' not in attrs:
+            raise serializers.ValidationError('Provide staff_id, status or both')
+        return attrs
+
+
+class ChecklistBulkUpdateSerializer(serializers.Serializer):
+    """Serializer for marking many checklist items at once"""
+    item_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+    completed = serializers.BooleanField()
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for notifications"""
     order_number = serializers.SerializerMethodField()
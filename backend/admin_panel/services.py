@@ -1,11 +1,69 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
 from authentication.models import CustomUser
+from election_cart.degraded_mode import defer_notification, is_degraded
 from orders.models import Order
 from .models import Notification
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def progress_notification_key(order_id):
+    """Cache key marking a pending progress notification for an order"""
+    return f'notifications:progress_pending:{order_id}'
+
+
+def coalesce_cache():
+    """Cache shared by all workers that holds the pending-notification markers"""
+    return caches[settings.NOTIFICATION_COALESCE_CACHE]
 
 
 class NotificationService:
     """Service for creating and managing notifications"""
     
+    @staticmethod
+    def queue_admin_notification(order, notification_type):
+        """
+        Queue notifications for all admin users on the background worker.
+        
+        The task is sent once the current transaction commits. Progress
+        updates are coalesced per order: while one is pending, further
+        progress events for the same order are dropped and the pending task
+        reports the latest progress when it runs.
+        
+        In degraded mode the notification is deferred instead and sent when
+        degraded mode is switched off.
+        
+        Returns True if a task was queued.
+        """
+        if is_degraded():
+            transaction.on_commit(lambda: defer_notification(order.id, notification_type))
+            return True
+        
+        countdown = 0
+        if notification_type == 'progress_update':
+            countdown = settings.NOTIFICATION_COALESCE_WINDOW
+            if not coalesce_cache().add(progress_notification_key(order.id), True, countdown):
+                return False
+        
+        transaction.on_commit(
+            lambda: NotificationService._send_admin_notification_task(order.id, notification_type, countdown)
+        )
+        return True
+    
+    @staticmethod
+    def _send_admin_notification_task(order_id, notification_type, countdown):
+        """Send the fan-out task, creating the notifications in-process if the broker is down"""
+        from .tasks import send_admin_notifications
+        
+        try:
+            send_admin_notifications.apply_async(args=[order_id, notification_type], countdown=countdown)
+        except Exception as exc:
+            logger.error(f"Could not queue {notification_type} notifications for order {order_id}: {str(exc)}")
+            send_admin_notifications.apply(args=[order_id, notification_type])
+    
     @staticmethod
     def notify_admins_new_order(order):
         """
@@ -45,6 +103,28 @@ class NotificationService:
         
         return notification
     
+    @staticmethod
+    def notify_staff_orders_assigned(orders):
+        """
+        Notify staff members about many assigned orders with a single insert.
+        Each order's assigned_to must be set; prefetch the orders' items, or
+        counting them runs a query per order.
+        """
+        notifications = [
+            Notification(
+                user_id=order.assigned_to_id,
+                notification_type='order_assigned',
+                title='New Order Assigned',
+                message=f'Order {order.order_number} has been assigned to you. Total items: {order.get_total_items()}',
+                order=order
+            )
+            for order in orders
+        ]
+        
+        Notification.objects.bulk_create(notifications)
+        
+        return len(notifications)
+    
     @staticmethod
     def notify_admins_progress_update(order, progress_percentage):
         """
@@ -94,7 +174,7 @@ class NotificationService:
         """
         Get notifications for a specific user.
         """
-        queryset = Notification.objects.filter(user=user)
+        queryset = Notification.objects.filter(user=user).select_related('order')
         
         if unread_only:
             queryset = queryset.filter(is_read=False)
@@ -0,0 +1,152 @@
+"""
+Celery tasks for admin notifications, order assignment and slow query storage
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def send_admin_notifications(self, order_id, notification_type):
+    """
+    Create notifications for all admin users about an order
+    
+    Progress updates are coalesced per order: the task reports the order's
+    progress at the time it runs, so several checklist updates within the
+    coalescing window produce a single notification.
+    
+    Args:
+        order_id: ID of the order the notification is about
+        notification_type: 'new_order', 'progress_update' or 'order_completed'
+        
+    Returns:
+        dict: Status and number of notifications created
+    """
+    from orders.models import Order
+    from .checklist_service import ChecklistService
+    from .services import NotificationService, coalesce_cache, progress_notification_key
+    
+    try:
+        if notification_type == 'progress_update':
+            # Let the next progress event schedule a new notification
+            coalesce_cache().delete(progress_notification_key(order_id))
+        
+        order = Order.objects.select_related('user', 'assigned_to', 'checklist').get(id=order_id)
+        
+        if notification_type == 'new_order':
+            count = NotificationService.notify_admins_new_order(order)
+        elif notification_type == 'order_completed':
+            count = NotificationService.notify_admins_order_completed(order)
+        elif notification_type == 'progress_update':
+            progress = ChecklistService.get_checklist_progress(order.checklist)
+            count = NotificationService.notify_admins_progress_update(order, progress['progress_percentage'])
+        else:
+            logger.error(f"Unknown admin notification type {notification_type}")
+            return {
+                'status': 'error',
+                'message': f'Unknown notification type {notification_type}'
+            }
+        
+        return {
+            'status': 'success',
+            'notifications_created': count
+        }
+        
+    except Order.DoesNotExist:
+        logger.error(f"Order {order_id} not found")
+        return {
+            'status': 'error',
+            'message': f'Order {order_id} not found'
+        }
+    except Order.checklist.RelatedObjectDoesNotExist:
+        logger.error(f"Order {order_id} has no checklist")
+        return {
+            'status': 'error',
+            'message': f'Order {order_id} has no checklist'
+        }
+    except Exception as exc:
+        logger.error(f"Error sending {notification_type} notifications for order {order_id}: {str(exc)}")
+        # Retry the task
+        raise self.retry(exc=exc, countdown=60)  # Retry after 60 seconds
+
+
+@shared_task
+def send_deferred_admin_notifications():
+    """
+    Send the admin notifications deferred while degraded mode was on
+    
+    Returns:
+        dict: Status and number of notifications sent
+    """
+    from election_cart.degraded_mode import take_deferred_notifications
+    
+    notifications = take_deferred_notifications()
+    for order_id, notification_type in notifications:
+        send_admin_notifications.apply(args=[order_id, notification_type])
+    logger.info(f"Sent {len(notifications)} deferred admin notifications")
+    
+    return {
+        'status': 'success',
+        'sent': len(notifications)
+    }
+
+
+@shared_task(bind=True, max_retries=3)
+def auto_assign_orders(self):
+    """
+    Assign ready orders to staff by workload
+    
+    Runs periodically from Celery beat (scheduled only when
+    AUTO_ASSIGN_ORDERS is on) and whenever an order becomes ready for
+    processing. Keeps assigning batches until the backlog is drained.
+    
+    Returns:
+        dict: Status and number of orders assigned
+    """
+    from django.conf import settings
+    from .assignment_service import AssignmentService
+    
+    if not settings.AUTO_ASSIGN_ORDERS:
+        return {
+            'status': 'disabled',
+            'assigned': 0
+        }
+    
+    try:
+        assigned = 0
+        while True:
+            orders = AssignmentService.assign_pending_orders()
+            assigned += len(orders)
+            if len(orders) < settings.AUTO_ASSIGN_BATCH_SIZE:
+                break
+        
+        return {
+            'status': 'success',
+            'assigned': assigned
+        }
+        
+    except Exception as exc:
+        logger.error(f"Error auto-assigning orders: {str(exc)}")
+        # Retry the task
+        raise self.retry(exc=exc, countdown=60)  # Retry after 60 seconds
+
+
+@shared_task
+def store_slow_queries(view_name, rows):
+    """
+    Store the slow queries captured in a request, explaining the sampled ones
+    
+    Args:
+        view_name: URL name of the view that ran the queries
+        rows: Queries as prepared by election_cart.slow_queries.record_slow_queries
+    
+    Returns:
+        dict: Status and number of slow queries stored
+    """
+    from election_cart import slow_queries
+    
+    return {
+        'status': 'success',
+        'stored': slow_queries.store_slow_queries(view_name, rows)
+    }
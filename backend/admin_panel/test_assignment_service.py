@@ -0,0 +1,162 @@
+"""
+Tests for workload-based automatic order assignment
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from authentication.models import CustomUser
+from products.models import Package, ChecklistTemplateItem
+from orders.models import Order, OrderItem
+from admin_panel.models import Notification
+from admin_panel.assignment_service import AssignmentService
+from admin_panel.checklist_service import ChecklistService
+from admin_panel.tasks import auto_assign_orders
+
+
+@override_settings(AUTO_ASSIGN_DEFAULT_TASK_MINUTES=30)
+class AssignmentServiceTest(TestCase):
+    """Test assignment of ready orders to staff"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='1111111111',
+            password='testpass123',
+            role='customer'
+        )
+        self.busy_staff = CustomUser.objects.create_user(
+            username='busy',
+            phone_number='2222222222',
+            password='testpass123',
+            role='staff'
+        )
+        self.free_staff = CustomUser.objects.create_user(
+            username='free',
+            phone_number='3333333333',
+            password='testpass123',
+            role='staff'
+        )
+
+        self.package = Package.objects.create(
+            name='Test Package',
+            price=1000.00,
+            description='Test package description'
+        )
+        package_ct = ContentType.objects.get_for_model(Package)
+        ChecklistTemplateItem.objects.create(
+            content_type=package_ct,
+            object_id=self.package.id,
+            name='Design',
+            description='Design the material',
+            order=0,
+            estimated_duration_minutes=120
+        )
+        ChecklistTemplateItem.objects.create(
+            content_type=package_ct,
+            object_id=self.package.id,
+            name='Review',
+            description='Review the material',
+            order=1
+        )
+
+        # The busy staff member already has one open order (150 minutes)
+        busy_order = self._create_order('assigned')
+        busy_order.assigned_to = self.busy_staff
+        busy_order.save()
+        ChecklistService.generate_checklist_for_order(busy_order)
+
+    def _create_order(self, status='ready_for_processing'):
+        """Create an order with one package item"""
+        order = Order.objects.create(user=self.customer, total_amount=1000.00, status=status)
+        OrderItem.objects.create(
+            order=order,
+            content_type=ContentType.objects.get_for_model(Package),
+            object_id=self.package.id,
+            quantity=1,
+            price=1000.00
+        )
+        return order
+
+    def test_staff_workloads(self):
+        """Test that workloads count open orders and remaining effort"""
+        workloads = AssignmentService.get_staff_workloads([self.busy_staff.id, self.free_staff.id])
+
+        self.assertEqual(workloads[self.busy_staff.id], {'open_orders': 1, 'remaining_minutes': 150})
+        self.assertEqual(workloads[self.free_staff.id], {'open_orders': 0, 'remaining_minutes': 0})
+
+    def test_orders_go_to_least_loaded_staff(self):
+        """Test that a batch is balanced by estimated effort"""
+        orders = [self._create_order() for _ in range(3)]
+
+        assigned = AssignmentService.assign_pending_orders()
+
+        self.assertEqual(len(assigned), 3)
+        assignees = [Order.objects.get(id=order.id).assigned_to_id for order in orders]
+        self.assertEqual(assignees, [self.free_staff.id, self.busy_staff.id, self.free_staff.id])
+        self.assertEqual(Order.objects.filter(status='ready_for_processing').count(), 0)
+        self.assertEqual(Notification.objects.filter(notification_type='order_assigned').count(), 3)
+
+        # Assigned orders are not picked up again
+        self.assertEqual(AssignmentService.assign_pending_orders(), [])
+
+    def test_assignment_queries_do_not_grow_with_batch(self):
+        """Test that a larger batch runs the same number of queries"""
+        counts = []
+        for size in (1, 4):
+            for _ in range(size):
+                self._create_order()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(len(AssignmentService.assign_pending_orders()), size)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertIn('Total items: 1', Notification.objects.filter(notification_type='order_assigned').last().message)
+
+    @override_settings(AUTO_ASSIGN_ORDERS=False)
+    def test_disabled_task_runs_no_queries(self):
+        """Test that the task returns without touching the database when auto-assignment is off"""
+        self._create_order()
+
+        with self.assertNumQueries(0):
+            result = auto_assign_orders.apply().get()
+
+        self.assertEqual(result['status'], 'disabled')
+
+    def test_bulk_update_orders(self):
+        """Test assigning and transitioning many orders in one call"""
+        orders = [self._create_order() for _ in range(3)]
+        order_ids = [order.id for order in orders]
+
+        results = AssignmentService.update_orders(order_ids + [999999], staff_user=self.free_staff)
+
+        self.assertEqual([result['success'] for result in results], [True, True, True, False])
+        self.assertEqual(
+            Order.objects.filter(id__in=order_ids, assigned_to=self.free_staff, status='assigned').count(), 3
+        )
+        for order in orders:
+            self.assertEqual(order.checklist.items.count(), 2)
+
+        # Status-only transitions require an assignee for open statuses
+        unassigned = self._create_order()
+        results = AssignmentService.update_orders([orders[0].id, unassigned.id], new_status='in_progress')
+        self.assertTrue(results[0]['success'])
+        self.assertFalse(results[1]['success'])
+        self.assertEqual(Order.objects.get(id=orders[0].id).status, 'in_progress')
+
+    def test_staff_workload_summary(self):
+        """Test that the workload summary aggregates per staff member in one query"""
+        completed = self._create_order('completed')
+        completed.assigned_to = self.free_staff
+        completed.save()
+
+        with self.assertNumQueries(1):
+            summary = {row['id']: row for row in AssignmentService.get_staff_workload_summary()}
+
+        self.assertEqual(summary[self.busy_staff.id]['open_orders'], 1)
+        self.assertEqual(summary[self.busy_staff.id]['checklist_backlog'], 2)
+        self.assertIsNone(summary[self.busy_staff.id]['average_completion_hours'])
+        self.assertEqual(summary[self.free_staff.id]['completed_this_week'], 1)
+        self.assertEqual(summary[self.free_staff.id]['checklist_backlog'], 0)
+        self.assertIsNotNone(summary[self.free_staff.id]['average_completion_hours'])
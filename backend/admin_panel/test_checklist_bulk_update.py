@@ -0,0 +1,157 @@
+"""
+Tests for the bulk checklist update endpoint
+"""
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from orders.models import Order, OrderChecklist, ChecklistItem
+
+
+class BulkChecklistUpdateAPITest(TestCase):
+    """Test PATCH /api/staff/orders/{order_id}/checklist/"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.staff_user = CustomUser.objects.create_user(
+            username='staff',
+            phone_number='9000000001',
+            password='testpass123',
+            role='staff'
+        )
+        self.other_staff = CustomUser.objects.create_user(
+            username='staff2',
+            phone_number='9000000002',
+            password='testpass123',
+            role='staff'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='9000000003',
+            password='testpass123',
+            role='customer'
+        )
+        self.order, self.items = self._create_order_with_checklist()
+        self.url = f'/api/staff/orders/{self.order.id}/checklist/'
+
+    def _create_order_with_checklist(self):
+        """An assigned order with three required items and one optional item"""
+        order = Order.objects.create(
+            user=self.customer, total_amount=1000.00, status='assigned', assigned_to=self.staff_user
+        )
+        checklist = OrderChecklist.objects.create(order=order)
+        items = [
+            ChecklistItem.objects.create(
+                checklist=checklist, description=f'Task {index}', order_index=index, is_optional=index == 3
+            )
+            for index in range(4)
+        ]
+        return order, items
+
+    def test_assigned_staff_updates_items(self):
+        """Test that the assigned staff member marks items and gets the order progress back"""
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.patch(self.url, {
+            'item_ids': [self.items[0].id, self.items[1].id],
+            'completed': True
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['success'])
+        self.assertEqual(response.data['updated_count'], 2)
+        self.assertEqual(response.data['order_progress'], {
+            'total_items': 4,
+            'completed_items': 2,
+            'required_items': 3,
+            'completed_required': 2,
+            'progress_percentage': 66,
+            'order_status': 'in_progress'
+        })
+        completed = ChecklistItem.objects.filter(checklist__order=self.order, completed=True)
+        self.assertEqual(set(completed.values_list('completed_by', flat=True)), {self.staff_user.id})
+
+    def test_completing_required_items_completes_order(self):
+        """Test that the order is completed and admins are notified once when required items are done"""
+        self.client.force_authenticate(user=self.staff_user)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.patch(self.url, {
+                'item_ids': [item.id for item in self.items[:3]],
+                'completed': True
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['order_progress']['progress_percentage'], 100)
+        self.assertEqual(response.data['order_progress']['order_status'], 'completed')
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'completed')
+        self.assertTrue(callbacks)
+
+    def test_unchanged_items_are_not_counted(self):
+        """Test that items already in the requested state are not counted as updated"""
+        self.client.force_authenticate(user=self.staff_user)
+        self.client.patch(self.url, {'item_ids': [self.items[0].id], 'completed': True}, format='json')
+
+        response = self.client.patch(self.url, {
+            'item_ids': [self.items[0].id, self.items[1].id],
+            'completed': True
+        }, format='json')
+
+        self.assertEqual(response.data['updated_count'], 1)
+
+    def test_items_of_other_orders_are_rejected(self):
+        """Test that a batch with foreign or unknown item IDs changes nothing and lists the invalid IDs"""
+        _, other_items = self._create_order_with_checklist()
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.patch(self.url, {
+            'item_ids': [self.items[0].id, other_items[0].id, 999999],
+            'completed': True
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['success'])
+        self.assertEqual(response.data['invalid_item_ids'], [other_items[0].id, 999999])
+        self.assertFalse(ChecklistItem.objects.filter(completed=True).exists())
+
+    def test_invalid_payload(self):
+        """Test that an empty item list or a missing completed flag is rejected"""
+        self.client.force_authenticate(user=self.staff_user)
+
+        for payload in ({'item_ids': [], 'completed': True}, {'item_ids': [self.items[0].id]}):
+            response = self.client.patch(self.url, payload, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_order_without_checklist(self):
+        """Test that an order without a checklist answers 404"""
+        order = Order.objects.create(
+            user=self.customer, total_amount=1000.00, status='assigned', assigned_to=self.staff_user
+        )
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.patch(
+            f'/api/staff/orders/{order.id}/checklist/', {'item_ids': [1], 'completed': True}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_permissions(self):
+        """Test that only admins and the assigned staff member can update the checklist"""
+        payload = {'item_ids': [self.items[0].id], 'completed': True}
+
+        self.assertEqual(self.client.patch(self.url, payload, format='json').status_code, 401)
+
+        for user in (self.other_staff, self.customer):
+            self.client.force_authenticate(user=user)
+            self.assertEqual(self.client.patch(self.url, payload, format='json').status_code, 403)
+        self.assertFalse(ChecklistItem.objects.filter(completed=True).exists())
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.patch(self.url, payload, format='json').status_code, 200)
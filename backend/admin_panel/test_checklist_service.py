@@ -120,6 +120,13 @@ class ChecklistServiceTest(TestCase):
         self.assertTrue(item3.is_optional)
         self.assertEqual(item3.template_item, self.template_item3)
     
+    def test_generated_checklist_is_reachable_from_order(self):
+        """Test that order.checklist is the saved checklist after generation"""
+        checklist = ChecklistService.generate_checklist_for_order(self.order)
+
+        self.assertEqual(self.order.checklist.pk, checklist.pk)
+        self.assertEqual(self.order.checklist.items.count(), 3)
+
     def test_progress_calculation_excludes_optional_items(self):
         """Test that progress calculation excludes optional items"""
         # Generate checklist
@@ -198,6 +205,108 @@ class ChecklistServiceTest(TestCase):
         # Verify items don't have template references
         for item in items:
             self.assertIsNone(item.template_item)
+    
+    def test_generate_checklists_for_multiple_orders(self):
+        """Test batch generation uses a fixed number of queries"""
+        package_ct = ContentType.objects.get_for_model(Package)
+        orders = [self.order]
+        for _ in range(4):
+            order = Order.objects.create(
+                user=self.user,
+                total_amount=1000.00,
+                status='ready_for_processing'
+            )
+            OrderItem.objects.create(
+                order=order,
+                content_type=package_ct,
+                object_id=self.package.id,
+                quantity=1,
+                price=1000.00
+            )
+            orders.append(order)
+        
+        with self.assertNumQueries(8):
+            checklists = ChecklistService.generate_checklists_for_orders(orders)
+        
+        self.assertEqual(len(checklists), 5)
+        for order in orders:
+            self.assertEqual(checklists[order.id].items.count(), 3)
+        
+        # Regenerating leaves existing checklists untouched
+        ChecklistService.generate_checklists_for_orders(orders)
+        self.assertEqual(ChecklistItem.objects.filter(checklist__order__in=orders).count(), 15)
+    
+    def test_checklist_counters_follow_item_changes(self):
+        """Test that the denormalized counters track item toggles"""
+        checklist = ChecklistService.generate_checklist_for_order(self.order)
+        checklist.refresh_counters()
+        self.assertEqual(
+            (checklist.total_items, checklist.required_items, checklist.completed_items, checklist.completed_required),
+            (3, 2, 0, 0)
+        )
+        
+        # Toggling an item twice only counts once
+        item = ChecklistItem.objects.get(checklist=checklist, order_index=0)
+        self.assertTrue(ChecklistService.set_item_completed(item, True, self.staff))
+        self.assertFalse(ChecklistService.set_item_completed(item, True, self.staff))
+        
+        # Progress is read from the counters without querying
+        checklist.refresh_counters()
+        with self.assertNumQueries(0):
+            progress = ChecklistService.get_checklist_progress(checklist)
+        self.assertEqual(progress['completed_required'], 1)
+        self.assertEqual(progress['progress_percentage'], 50)
+        
+        # Un-completing and deleting items update the counters too
+        ChecklistService.set_item_completed(item, False)
+        ChecklistItem.objects.get(checklist=checklist, order_index=2).delete()
+        checklist.refresh_counters()
+        self.assertEqual(
+            (checklist.total_items, checklist.required_items, checklist.completed_items, checklist.completed_required),
+            (2, 2, 0, 0)
+        )
+    
+    def test_set_items_completed_in_bulk(self):
+        """Test that bulk updates only count items whose state changes"""
+        checklist = ChecklistService.generate_checklist_for_order(self.order)
+        item_ids = list(checklist.items.values_list('id', flat=True))
+        
+        ChecklistService.set_items_completed(checklist.id, item_ids[:1], True, self.staff)
+        updated = ChecklistService.set_items_completed(checklist.id, item_ids, True, self.staff)
+        self.assertEqual(updated, 2)
+        
+        checklist.refresh_counters()
+        progress = ChecklistService.get_checklist_progress(checklist)
+        self.assertEqual(progress['completed_items'], 3)
+        self.assertEqual(progress['progress_percentage'], 100)
+        self.assertFalse(checklist.items.filter(completed_by__isnull=True).exists())
+    
+    def test_stale_item_save_is_counted_once(self):
+        """Test that saving an item loaded before a bulk update does not count it twice"""
+        checklist = ChecklistService.generate_checklist_for_order(self.order)
+        stale = ChecklistItem.objects.get(checklist=checklist, order_index=0)
+        ChecklistService.set_items_completed(checklist.id, [stale.pk], True, self.staff)
+        
+        stale.completed = True
+        stale.save()
+        
+        checklist.refresh_counters()
+        self.assertEqual((checklist.completed_items, checklist.completed_required), (1, 1))
+    
+    def test_queryset_writes_keep_counters(self):
+        """Test that queryset deletes are counted and counted fields cannot be bulk updated"""
+        checklist = ChecklistService.generate_checklist_for_order(self.order)
+        ChecklistService.set_items_completed(checklist.id, checklist.items.values_list('id', flat=True), True)
+        
+        with self.assertRaises(TypeError):
+            checklist.items.update(completed=False)
+        checklist.items.filter(order_index__gte=1).delete()
+        
+        checklist.refresh_counters()
+        self.assertEqual(
+            (checklist.total_items, checklist.required_items, checklist.completed_items, checklist.completed_required),
+            (1, 1, 1, 1)
+        )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+"""
+Tests for queued admin notifications
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import TestCase
+from authentication.models import CustomUser
+from orders.models import Order, OrderChecklist, ChecklistItem
+from admin_panel.models import Notification
+from admin_panel.services import NotificationService, progress_notification_key
+from admin_panel.tasks import send_admin_notifications
+
+
+class NotificationQueueTest(TestCase):
+    """Test admin notification fan-out through the task queue"""
+    
+    def setUp(self):
+        """Set up test data"""
+        caches[settings.NOTIFICATION_COALESCE_CACHE].clear()
+        cache.clear()
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='1111111111',
+            password='testpass123',
+            role='customer'
+        )
+        for index in range(2):
+            CustomUser.objects.create_user(
+                username=f'admin{index}',
+                phone_number=f'222222222{index}',
+                password='testpass123',
+                role='admin'
+            )
+        self.order = Order.objects.create(
+            user=self.customer,
+            total_amount=1000.00,
+            status='in_progress'
+        )
+        checklist = OrderChecklist.objects.create(order=self.order)
+        for index in range(4):
+            ChecklistItem.objects.create(checklist=checklist, description=f'Task {index}', order_index=index)
+    
+    def test_progress_updates_are_coalesced(self):
+        """Test that repeated progress events queue a single task"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(NotificationService.queue_admin_notification(self.order, 'progress_update'))
+            self.assertFalse(NotificationService.queue_admin_notification(self.order, 'progress_update'))
+            self.assertTrue(NotificationService.queue_admin_notification(self.order, 'order_completed'))
+        
+        self.assertEqual(len(callbacks), 2)
+        # Nothing is written in the request itself
+        self.assertEqual(Notification.objects.count(), 0)
+    
+    def test_progress_updates_are_coalesced_across_workers(self):
+        """Test that the pending marker lives in the coordination cache every worker shares"""
+        with self.captureOnCommitCallbacks():
+            self.assertTrue(NotificationService.queue_admin_notification(self.order, 'progress_update'))
+            # Another worker has its own default cache but shares the coordination cache
+            cache.clear()
+            self.assertFalse(NotificationService.queue_admin_notification(self.order, 'progress_update'))
+        
+        self.assertTrue(caches['coordination'].get(progress_notification_key(self.order.id)))
+    
+    def test_task_reports_current_progress(self):
+        """Test that the task notifies every admin with the latest progress"""
+        NotificationService.queue_admin_notification(self.order, 'progress_update')
+        ChecklistItem.objects.filter(order_index__lt=2).set_completed(True)
+        
+        result = send_admin_notifications.apply(args=[self.order.id, 'progress_update']).get()
+        
+        self.assertEqual(result['notifications_created'], 2)
+        notification = Notification.objects.filter(notification_type='progress_update').first()
+        self.assertIn('50%', notification.message)
+        
+        # The next progress event can be queued again
+        with self.captureOnCommitCallbacks():
+            self.assertTrue(NotificationService.queue_admin_notification(self.order, 'progress_update'))
@@ -0,0 +1,160 @@
+"""
+Tests for the bulk order update endpoint
+"""
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from orders.models import Order
+from admin_panel.models import Notification
+
+
+class BulkOrderUpdateAPITest(TestCase):
+    """Test POST /api/admin/orders/bulk-update/"""
+
+    url = '/api/admin/orders/bulk-update/'
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.staff_user = CustomUser.objects.create_user(
+            username='staff',
+            phone_number='9000000001',
+            password='testpass123',
+            role='staff'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='9000000002',
+            password='testpass123',
+            role='customer'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _create_order(self, status='ready_for_processing', assigned_to=None):
+        return Order.objects.create(
+            user=self.customer, total_amount=1000.00, status=status, assigned_to=assigned_to
+        )
+
+    def test_assign_orders(self):
+        """Test that orders are assigned and the staff member is notified once per order"""
+        orders = [self._create_order() for _ in range(2)]
+
+        response = self.client.post(self.url, {
+            'order_ids': [order.id for order in orders] + [999999],
+            'staff_id': self.staff_user.id
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 2)
+        self.assertEqual([result['success'] for result in response.data['results']], [True, True, False])
+        self.assertEqual(response.data['results'][2]['message'], 'Order not found')
+        self.assertEqual(Order.objects.filter(assigned_to=self.staff_user, status='assigned').count(), 2)
+        self.assertEqual(
+            Notification.objects.filter(user=self.staff_user, notification_type='order_assigned').count(), 2
+        )
+
+    def test_invalid_transition_rejects_batch(self):
+        """Test that one invalid transition leaves every order of the batch unchanged"""
+        ready = self._create_order()
+        unpaid = self._create_order('pending_payment')
+
+        response = self.client.post(self.url, {
+            'order_ids': [ready.id, unpaid.id],
+            'staff_id': self.staff_user.id
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['success'])
+        self.assertEqual(response.data['invalid_transitions'], [{
+            'order_id': unpaid.id,
+            'order_number': unpaid.order_number,
+            'from_status': 'pending_payment',
+            'to_status': 'assigned'
+        }])
+        ready.refresh_from_db()
+        self.assertEqual(ready.status, 'ready_for_processing')
+        self.assertIsNone(ready.assigned_to_id)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_completed_orders_cannot_be_reopened(self):
+        """Test that completed orders are rejected"""
+        order = self._create_order('completed', assigned_to=self.staff_user)
+
+        response = self.client.post(self.url, {'order_ids': [order.id], 'status': 'in_progress'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'completed')
+
+    def test_assign_and_complete_notifies_admins(self):
+        """Test that completing with a staff member queues the completion notification per order"""
+        orders = [self._create_order() for _ in range(2)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, {
+                'order_ids': [order.id for order in orders],
+                'staff_id': self.staff_user.id,
+                'status': 'completed'
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.filter(status='completed', assigned_to=self.staff_user).count(), 2)
+        # One completion notification task per order and the analytics invalidation
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(
+            Notification.objects.filter(user=self.staff_user, notification_type='order_assigned').count(), 2
+        )
+
+    def test_status_requires_assignee(self):
+        """Test that unassigned orders cannot be moved to an open or completed status"""
+        order = self._create_order()
+
+        for new_status in ('in_progress', 'completed'):
+            response = self.client.post(self.url, {'order_ids': [order.id], 'status': new_status}, format='json')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['updated_count'], 0)
+            self.assertFalse(response.data['success'])
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'ready_for_processing')
+
+    def test_reassign_keeps_open_status(self):
+        """Test that reassigning without a status keeps in-progress orders in progress"""
+        started = self._create_order('in_progress', assigned_to=self.admin_user)
+        ready = self._create_order()
+
+        response = self.client.post(self.url, {
+            'order_ids': [started.id, ready.id],
+            'staff_id': self.staff_user.id
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['in_progress', 'assigned'])
+        started.refresh_from_db()
+        self.assertEqual((started.status, started.assigned_to_id), ('in_progress', self.staff_user.id))
+
+    def test_requires_staff_or_status(self):
+        """Test that a request without staff_id and status is rejected"""
+        order = self._create_order()
+
+        response = self.client.post(self.url, {'order_ids': [order.id]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_admin(self):
+        """Test that staff members cannot bulk update orders"""
+        order = self._create_order()
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.post(self.url, {
+            'order_ids': [order.id],
+            'staff_id': self.staff_user.id
+        }, format='json')
+
+        self.assertEqual(response.status_code, 403)
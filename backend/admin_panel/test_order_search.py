@@ -0,0 +1,97 @@
+"""
+Tests for the denormalized admin order search
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from products.models import Package
+from orders.models import Order, OrderItem
+
+
+class OrderSearchTest(TestCase):
+    """Test searching orders through the search text column"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='Ward12Voter',
+            phone_number='9876543210',
+            password='testpass123',
+            role='user'
+        )
+        self.package = Package.objects.create(
+            name='Poster Campaign Kit',
+            price=1000.00,
+            description='Posters and banners'
+        )
+        self.order = Order.objects.create(user=self.customer, total_amount=1000.00)
+        OrderItem.objects.create(
+            order=self.order,
+            content_type=ContentType.objects.get_for_model(Package),
+            object_id=self.package.id,
+            quantity=1,
+            price=1000.00
+        )
+        Order.objects.create(user=self.admin_user, total_amount=50.00)
+    
+    def search(self, term):
+        """Return the ids of orders matching a search term"""
+        response = self.client.get('/api/admin/orders/', {'search': term})
+        return [order['id'] for order in response.data]
+    
+    def test_search_matches_order_customer_and_products(self):
+        """Test partial matches on every denormalized field"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        self.assertEqual(self.search(self.order.order_number[-6:].lower()), [self.order.id])
+        self.assertEqual(self.search('6543'), [self.order.id])
+        self.assertEqual(self.search('ward12'), [self.order.id])
+        self.assertEqual(self.search('CAMPAIGN KIT'), [self.order.id])
+    
+    def test_search_text_follows_user_changes(self):
+        """Test that changing a user's phone number updates their orders"""
+        customer = CustomUser.objects.get(id=self.customer.id)
+        customer.phone_number = '9123400000'
+        customer.save()
+        
+        self.order.refresh_from_db()
+        self.assertIn('9123400000', self.order.search_text)
+        self.assertNotIn('9876543210', self.order.search_text)
+        self.assertIn('poster campaign kit', self.order.search_text)
+    
+    def test_search_text_follows_product_renames(self):
+        """Test that renaming a product updates the orders containing it"""
+        package = Package.objects.get(id=self.package.id)
+        package.name = 'Banner Bundle'
+        package.save()
+        
+        self.order.refresh_from_db()
+        self.assertIn('banner bundle', self.order.search_text)
+        self.assertNotIn('poster campaign kit', self.order.search_text)
+    
+    def test_search_text_drops_deleted_items_and_products(self):
+        """Test that deleting an order item or its product removes the product name"""
+        self.order.items.get().delete()
+        self.order.refresh_from_db()
+        self.assertNotIn('poster campaign kit', self.order.search_text)
+        self.assertIn('9876543210', self.order.search_text)
+        
+        other_order = Order.objects.create(user=self.customer, total_amount=1000.00)
+        OrderItem.objects.create(
+            order=other_order,
+            content_type=ContentType.objects.get_for_model(Package),
+            object_id=self.package.id,
+            quantity=1,
+            price=1000.00
+        )
+        self.package.delete()
+        other_order.refresh_from_db()
+        self.assertNotIn('poster campaign kit', other_order.search_text)
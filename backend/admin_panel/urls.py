@@ -4,7 +4,16 @@ from .views import (
     AdminOrderDetailView,
     get_order_statistics,
     assign_order_to_staff,
+    bulk_update_orders,
     StaffListView,
+    staff_workload,
+    request_metrics,
+    slow_queries,
+    create_profile_token,
+    request_profiles,
+    request_profile_detail,
+    download_request_profile,
+    degraded_mode,
     NotificationListView,
     mark_notification_read,
     mark_all_notifications_read,
@@ -26,12 +35,23 @@ from products import views as product_views
 urlpatterns = [
     # Order management endpoints
     path('orders/statistics/', get_order_statistics, name='admin-order-statistics'),
+    path('orders/bulk-update/', bulk_update_orders, name='admin-order-bulk-update'),
     path('orders/', AdminOrderListView.as_view(), name='admin-order-list'),
     path('orders/<int:pk>/', AdminOrderDetailView.as_view(), name='admin-order-detail'),
     path('orders/<int:order_id>/assign/', assign_order_to_staff, name='admin-order-assign'),
     
     # Staff management endpoints
     path('staff/', StaffListView.as_view(), name='admin-staff-list'),
+    path('staff/workload/', staff_workload, name='admin-staff-workload'),
+
+    # Request instrumentation
+    path('metrics/requests/', request_metrics, name='admin-request-metrics'),
+    path('metrics/slow-queries/', slow_queries, name='admin-slow-queries'),
+    path('profiles/token/', create_profile_token, name='admin-profile-token'),
+    path('profiles/', request_profiles, name='admin-request-profiles'),
+    path('profiles/<int:profile_id>/', request_profile_detail, name='admin-request-profile-detail'),
+    path('profiles/<int:profile_id>/download/', download_request_profile, name='admin-request-profile-download'),
+    path('degraded-mode/', degraded_mode, name='admin-degraded-mode'),
     
     # Notification endpoints
     path('notifications/', NotificationListView.as_view(), name='notification-list'),
@@ -48,20 +68,7 @@ urlpatterns = [
     path('products/resource-fields/<int:field_id>/', manage_resource_field, name='manage-resource-field'),
     path('products/<str:product_type>/<int:product_id>/resource-fields/', manage_product_resource_fields, name='product-resource-fields'),
     
-    # Product detail and management - comes after more specific patterns
-    path('products/<str:product_type>/<int:product_id>/', product_views.get_product_detail, name='product-detail'),
-    path('products/<str:product_type>/<int:product_id>/update/', product_views.update_product, name='product-update'),
-    path('products/<str:product_type>/<int:product_id>/delete/', product_views.delete_product, name='product-delete'),
-    path('products/<str:product_type>/<int:product_id>/toggle-status/', product_views.toggle_product_status, name='product-toggle-status'),
-    path('products/<str:product_type>/<int:product_id>/audit-logs/', product_views.get_product_audit_logs, name='product-audit-logs'),
-    
-    # Checklist template management endpoints
-    path('products/<str:product_type>/<int:product_id>/checklist-template/', 
-         product_views.ChecklistTemplateViewSet.as_view({
-             'get': 'list',
-             'post': 'create'
-         }), 
-         name='checklist-template-list'),
+    # Checklist template and image endpoints without a product - MUST come before product detail
     path('products/checklist-template/<int:pk>/', 
          product_views.ChecklistTemplateViewSet.as_view({
              'get': 'retrieve',
@@ -75,13 +82,6 @@ urlpatterns = [
              'patch': 'reorder'
          }), 
          name='checklist-template-reorder'),
-    
-    # Product image management endpoints
-    path('products/<str:product_type>/<int:product_id>/images/', 
-         product_views.ProductImageViewSet.as_view({
-             'post': 'create'
-         }), 
-         name='product-images-create'),
     path('products/images/<int:pk>/', 
          product_views.ProductImageViewSet.as_view({
              'get': 'retrieve',
@@ -101,7 +101,27 @@ urlpatterns = [
          }), 
          name='product-images-set-primary'),
     
-
+    # Product detail and management - comes after more specific patterns
+    path('products/<str:product_type>/<int:product_id>/', product_views.get_product_detail, name='product-detail'),
+    path('products/<str:product_type>/<int:product_id>/update/', product_views.update_product, name='product-update'),
+    path('products/<str:product_type>/<int:product_id>/delete/', product_views.delete_product, name='product-delete'),
+    path('products/<str:product_type>/<int:product_id>/toggle-status/', product_views.toggle_product_status, name='product-toggle-status'),
+    path('products/<str:product_type>/<int:product_id>/audit-logs/', product_views.get_product_audit_logs, name='product-audit-logs'),
+    
+    # Checklist template management endpoints
+    path('products/<str:product_type>/<int:product_id>/checklist-template/', 
+         product_views.ChecklistTemplateViewSet.as_view({
+             'get': 'list',
+             'post': 'create'
+         }), 
+         name='checklist-template-list'),
+    
+    # Product image management endpoints
+    path('products/<str:product_type>/<int:product_id>/images/', 
+         product_views.ProductImageViewSet.as_view({
+             'post': 'create'
+         }), 
+         name='product-images-create'),
     
     # Analytics endpoints
     path('analytics/overview/', analytics_overview, name='analytics-overview'),
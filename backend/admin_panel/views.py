@@ -4,24 +4,33 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count
+from django.utils.decorators import method_decorator
 
 from authentication.models import CustomUser
 from authentication.permissions import IsAdmin, IsAdminOrStaff
 from orders.models import Order, OrderChecklist, ChecklistItem
-from .models import Notification
+from .models import Notification, SlowQuery
 from .serializers import (
     AdminOrderListSerializer,
     AdminOrderDetailSerializer,
     StaffSerializer,
     OrderAssignmentSerializer,
+    BulkOrderUpdateSerializer,
+    ChecklistBulkUpdateSerializer,
     NotificationSerializer
 )
 from .services import NotificationService
 from .checklist_service import ChecklistService
+from .assignment_service import AssignmentService, InvalidStatusTransition
 from .analytics_service import AnalyticsService
 from .cache_utils import cache_analytics, invalidate_analytics_cache
+from election_cart.degraded_mode import set_degraded, status as degraded_mode_status
+from election_cart.db_router import use_replica
+from election_cart.instrumentation import view_metrics
+from election_cart.profiling import PROFILE_QUERY_PARAM, issue_profile_token, profile_store
 
 
+@method_decorator(use_replica(), name='get')
 class AdminOrderListView(generics.ListAPIView):
     """
     GET /api/admin/orders/
@@ -56,20 +65,18 @@ class AdminOrderListView(generics.ListAPIView):
                 except ValueError:
                     pass
         
-        # Search by order number or user phone
+        # Search by order number, user phone/username or product name
+        # using the denormalized, trigram-indexed search text
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(order_number__icontains=search) |
-                Q(user__phone_number__icontains=search) |
-                Q(user__username__icontains=search)
-            )
+            queryset = queryset.filter(search_text__contains=search.lower())
         
         return queryset
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 def get_order_statistics(request):
     """
     GET /api/admin/orders/statistics/
@@ -154,6 +161,43 @@ def assign_order_to_staff(request, order_id):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def bulk_update_orders(request):
+    """
+    POST /api/admin/orders/bulk-update/
+    Assign many orders to a staff member and/or move them to a new status
+    """
+    serializer = BulkOrderUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    staff_id = serializer.validated_data.get('staff_id')
+    staff_user = get_object_or_404(CustomUser, id=staff_id) if staff_id else None
+    
+    try:
+        results = AssignmentService.update_orders(
+            serializer.validated_data['order_ids'],
+            staff_user=staff_user,
+            new_status=serializer.validated_data.get('status')
+        )
+    except InvalidStatusTransition as exc:
+        return Response({
+            'success': False,
+            'message': str(exc),
+            'invalid_transitions': exc.transitions
+        }, status=status.HTTP_400_BAD_REQUEST)
+    updated_count = sum(1 for result in results if result['success'])
+    
+    return Response({
+        'success': updated_count > 0,
+        'message': f'{updated_count} of {len(results)} order(s) updated',
+        'updated_count': updated_count,
+        'results': results
+    }, status=status.HTTP_200_OK)
+
+
+@method_decorator(use_replica(), name='get')
 class StaffListView(generics.ListAPIView):
     """
     GET /api/admin/staff/
@@ -164,8 +208,150 @@ class StaffListView(generics.ListAPIView):
     pagination_class = None  # Disable pagination
     
     def get_queryset(self):
-        # Return users with staff or admin role
-        return CustomUser.objects.filter(role__in=['staff', 'admin']).order_by('username')
+        # Return users with staff or admin role, counting open orders in the same query
+        return CustomUser.objects.filter(role__in=['staff', 'admin']).annotate(
+            open_orders_count=Count(
+                'assigned_orders',
+                filter=Q(assigned_orders__status__in=['assigned', 'in_progress'])
+            )
+        ).order_by('username')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
+@cache_analytics(timeout=60)
+def staff_workload(request):
+    """
+    GET /api/admin/staff/workload/
+    List staff members with open, in-progress and completed-this-week order
+    counts, average completion time and checklist backlog.
+    Cached briefly; order status changes invalidate the cache.
+    """
+    return Response(AssignmentService.get_staff_workload_summary())
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def request_metrics(request):
+    """
+    GET /api/admin/metrics/requests/
+    Per-view request metrics of this process: requests, queries, DB time,
+    cache hits/misses, total time and budget violations.
+    DELETE resets the metrics.
+    """
+    if request.method == 'DELETE':
+        view_metrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(view_metrics.snapshot())
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def slow_queries(request):
+    """
+    GET /api/admin/metrics/slow-queries/
+    The most recent slow queries with their view, call site, stack and
+    sampled execution plan. Query params: view (URL name), location
+    (substring of the call site), limit (default 100).
+    DELETE clears the slow query log.
+    """
+    if request.method == 'DELETE':
+        SlowQuery.objects.all().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    queries = SlowQuery.objects.all()
+    view_name = request.query_params.get('view')
+    if view_name:
+        queries = queries.filter(view_name=view_name)
+    location = request.query_params.get('location')
+    if location:
+        queries = queries.filter(location__icontains=location)
+    try:
+        limit = min(int(request.query_params.get('limit', 100)), 1000)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(list(queries.values()[:limit]))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def create_profile_token(request):
+    """
+    POST /api/admin/profiles/token/
+    Issue a short-lived token that profiles the caller's own requests when
+    sent in the X-Profile header or the _profile query parameter.
+    """
+    from django.conf import settings
+
+    return Response({
+        'token': issue_profile_token(request.user),
+        'header': 'X-Profile',
+        'query_param': PROFILE_QUERY_PARAM,
+        'expires_in': settings.PROFILER_TOKEN_MAX_AGE,
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def request_profiles(request):
+    """
+    GET /api/admin/profiles/
+    Summaries of the stored request profiles, newest first.
+    DELETE discards all stored profiles.
+    """
+    if request.method == 'DELETE':
+        profile_store.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(profile_store.list())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def request_profile_detail(request, profile_id):
+    """
+    GET /api/admin/profiles/{id}/
+    A stored profile with its cProfile statistics and query log.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({key: value for key, value in profile.items() if key != 'raw'})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def download_request_profile(request, profile_id):
+    """
+    GET /api/admin/profiles/{id}/download/
+    The raw cProfile data, readable with pstats or snakeviz.
+    """
+    from django.http import HttpResponse
+
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    response = HttpResponse(profile['raw'], content_type='application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.prof"'
+    return response
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def degraded_mode(request):
+    """
+    GET /api/admin/degraded-mode/
+    Whether degraded mode is on and how much work it has deferred.
+    POST {"enabled": true|false} switches it for all workers; switching it
+    off invalidates the analytics cache and queues a task sending the
+    deferred notifications.
+    """
+    if request.method == 'POST':
+        enabled = request.data.get('enabled')
+        if not isinstance(enabled, bool):
+            return Response({'error': 'enabled must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+        set_degraded(enabled)
+    return Response(degraded_mode_status())
 
 
 class NotificationListView(generics.ListAPIView):
@@ -298,6 +484,44 @@ class StaffOrderDetailView(generics.RetrieveAPIView):
             )
 
 
+PROGRESS_MILESTONES = (25, 50, 75, 100)
+
+
+def _apply_checklist_progress(order, previous_percentage, progress_percentage):
+    """
+    Move an order along after its checklist progress changed and notify
+    admins when a milestone (25%, 50%, 75%, 100%) is reached.
+    """
+    # Update order status based on progress
+    if progress_percentage == 100 and order.status != 'completed':
+        # All items completed - mark order as completed
+        order.status = 'completed'
+        order.save()
+        
+        # Invalidate analytics cache when order is completed
+        invalidate_analytics_cache()
+        
+        # Notify admins that order is completed
+        NotificationService.queue_admin_notification(order, 'order_completed')
+    elif progress_percentage > 0 and order.status == 'assigned':
+        # Some progress made - update status to in_progress
+        order.status = 'in_progress'
+        order.save()
+        
+        # Invalidate analytics cache when order status changes
+        invalidate_analytics_cache()
+    
+    # Notify admins of progress update when a milestone was reached or crossed
+    if progress_percentage == previous_percentage:
+        return
+    milestone_crossed = any(
+        previous_percentage < milestone <= progress_percentage
+        for milestone in PROGRESS_MILESTONES
+    )
+    if milestone_crossed or progress_percentage in PROGRESS_MILESTONES:
+        NotificationService.queue_admin_notification(order, 'progress_update')
+
+
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated, IsAdminOrStaff])
 def update_checklist_item(request, item_id):
@@ -305,10 +529,11 @@ def update_checklist_item(request, item_id):
     PATCH /api/staff/checklist/{item_id}/
     Mark a checklist item as complete or incomplete
     """
-    from django.utils import timezone
-    
     # Get the checklist item
-    checklist_item = get_object_or_404(ChecklistItem, id=item_id)
+    checklist_item = get_object_or_404(
+        ChecklistItem.objects.select_related('checklist__order', 'completed_by'),
+        id=item_id
+    )
     
     # Get the order associated with this checklist item
     order = checklist_item.checklist.order
@@ -330,46 +555,19 @@ def update_checklist_item(request, item_id):
             'message': 'completed field is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Update the checklist item
-    checklist_item.completed = completed
-    
-    if completed:
-        checklist_item.completed_at = timezone.now()
-        checklist_item.completed_by = request.user
-    else:
-        checklist_item.completed_at = None
-        checklist_item.completed_by = None
-    
-    checklist_item.save()
+    # Update the checklist item and its checklist's progress counters
+    checklist = checklist_item.checklist
+    previous_percentage = ChecklistService.get_checklist_progress(checklist)['progress_percentage']
+    ChecklistService.set_item_completed(checklist_item, completed, request.user)
     
-    # Calculate order completion percentage using ChecklistService
+    # Calculate order completion percentage from the freshly read counters
     # This properly excludes optional items from the calculation
-    progress = ChecklistService.get_checklist_progress(checklist_item.checklist)
+    checklist.refresh_counters()
+    progress = ChecklistService.get_checklist_progress(checklist)
     progress_percentage = progress['progress_percentage']
     
-    # Update order status based on progress
-    if progress_percentage == 100 and order.status != 'completed':
-        # All items completed - mark order as completed
-        order.status = 'completed'
-        order.save()
-        
-        # Invalidate analytics cache when order is completed
-        invalidate_analytics_cache()
-        
-        # Notify admins that order is completed
-        NotificationService.notify_admins_order_completed(order)
-    elif progress_percentage > 0 and order.status == 'assigned':
-        # Some progress made - update status to in_progress
-        order.status = 'in_progress'
-        order.save()
-        
-        # Invalidate analytics cache when order status changes
-        invalidate_analytics_cache()
-    
-    # Notify admins of progress update (for significant milestones)
-    # Notify at 25%, 50%, 75% completion or when order is completed
-    if progress_percentage in [25, 50, 75] or progress_percentage == 100:
-        NotificationService.notify_admins_progress_update(order, progress_percentage)
+    # Update order status and notify admins based on progress
+    _apply_checklist_progress(order, previous_percentage, progress_percentage)
     
     # Return updated checklist item and progress
     return Response({
@@ -399,6 +597,75 @@ def update_checklist_item(request, item_id):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated, IsAdminOrStaff])
+def bulk_update_checklist_items(request, order_id):
+    """
+    PATCH /api/staff/orders/{order_id}/checklist/
+    Mark many checklist items of an order as complete or incomplete at once
+    """
+    order = get_object_or_404(Order.objects.select_related('checklist'), id=order_id)
+    
+    # Staff can only update checklists for their assigned orders
+    if request.user.role == 'staff' and order.assigned_to_id != request.user.id:
+        return Response({
+            'success': False,
+            'message': 'You do not have permission to update this checklist'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        checklist = order.checklist
+    except OrderChecklist.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'This order does not have a checklist'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = ChecklistBulkUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    item_ids = set(serializer.validated_data['item_ids'])
+    completed = serializer.validated_data['completed']
+    
+    # Every item must belong to this order's checklist
+    found_ids = set(
+        ChecklistItem.objects.filter(checklist=checklist, id__in=item_ids).values_list('id', flat=True)
+    )
+    missing_ids = sorted(item_ids - found_ids)
+    if missing_ids:
+        return Response({
+            'success': False,
+            'message': 'Some checklist items do not belong to this order',
+            'invalid_item_ids': missing_ids
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Update all items, then evaluate status and notifications once
+    previous_percentage = ChecklistService.get_checklist_progress(checklist)['progress_percentage']
+    updated_count = ChecklistService.set_items_completed(checklist.id, item_ids, completed, request.user)
+    
+    checklist.refresh_counters()
+    progress = ChecklistService.get_checklist_progress(checklist)
+    progress_percentage = progress['progress_percentage']
+    
+    if updated_count:
+        _apply_checklist_progress(order, previous_percentage, progress_percentage)
+    
+    return Response({
+        'success': True,
+        'message': f'{updated_count} checklist item(s) updated successfully',
+        'updated_count': updated_count,
+        'order_progress': {
+            'total_items': progress['total_items'],
+            'completed_items': progress['completed_items'],
+            'required_items': progress['required_items'],
+            'completed_required': progress['completed_required'],
+            'progress_percentage': progress_percentage,
+            'order_status': order.status
+        }
+    }, status=status.HTTP_200_OK)
+
+
 
 # ============================================================================
 # RESOURCE FIELD MANAGEMENT ENDPOINTS
@@ -633,6 +900,7 @@ def reorder_resource_fields(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 @cache_analytics(timeout=300)  # Cache for 5 minutes
 def analytics_overview(request):
     """
@@ -694,6 +962,7 @@ def analytics_overview(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 @cache_analytics(timeout=300)  # Cache for 5 minutes
 def analytics_revenue_trend(request):
     """
@@ -720,6 +989,7 @@ def analytics_revenue_trend(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 @cache_analytics(timeout=300)  # Cache for 5 minutes
 def analytics_top_products(request):
     """
@@ -765,6 +1035,7 @@ def analytics_top_products(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 @cache_analytics(timeout=300)  # Cache for 5 minutes
 def analytics_staff_performance(request):
     """
@@ -809,6 +1080,7 @@ def analytics_staff_performance(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 @cache_analytics(timeout=300)  # Cache for 5 minutes
 def analytics_order_distribution(request):
     """
@@ -853,6 +1125,7 @@ def analytics_order_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@use_replica()
 def analytics_export(request):
     """
     GET /api/admin/analytics/export/
@@ -5,6 +5,7 @@ import firebase_admin
 from firebase_admin import auth, credentials
 import jwt
 from datetime import datetime, timedelta
+from .cache_utils import get_cached_user
 from .models import CustomUser
 
 
@@ -93,7 +94,7 @@ class JWTAuthentication(authentication.BaseAuthentication):
             user_id = payload.get('user_id')
             
             try:
-                user = CustomUser.objects.get(id=user_id)
+                user = get_cached_user(user_id)
                 return (user, None)
             except CustomUser.DoesNotExist:
                 raise exceptions.AuthenticationFailed('User not found')
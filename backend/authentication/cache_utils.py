@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """
+    Get the user with the given ID, cached for USER_CACHE_TIMEOUT seconds.
+    
+    Raises CustomUser.DoesNotExist like CustomUser.objects.get().
+    """
+    from .models import CustomUser
+    
+    user = cache.get(user_cache_key(user_id))
+    if user is None:
+        user = CustomUser.objects.get(id=user_id)
+        cache.set(user_cache_key(user_id), user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_cached_user(user_id):
+    """
+    Drop the cached user; called whenever a user row changes.
+    
+    The key is deleted again on commit, in case another request cached the
+    old row before the change was committed.
+    """
+    cache.delete(user_cache_key(user_id))
+    transaction.on_commit(lambda: cache.delete(user_cache_key(user_id)))
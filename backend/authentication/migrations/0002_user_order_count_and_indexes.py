@@ -0,0 +1,64 @@
+# Generated by Django 4.2.25 on 2026-10-18 22:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_counts(apps, schema_editor):
+    """Populate order_count for existing users in one UPDATE"""
+    CustomUser = apps.get_model('authentication', 'CustomUser')
+    Order = apps.get_model('orders', 'Order')
+    orders = (
+        Order.objects.filter(user=OuterRef('pk'))
+        .order_by()
+        .values('user')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    CustomUser.objects.update(order_count=Coalesce(Subquery(orders), 0))
+
+
+def create_search_indexes(apps, schema_editor):
+    """Trigram indexes for icontains search on phone number and username (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in ('phone_number', 'username'):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS authentication_customuser_{column}_trgm '
+            f'ON authentication_customuser USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in ('phone_number', 'username'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS authentication_customuser_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('orders', '0006_checklist_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-created_at'], name='authenticat_created_e4f771_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', '-created_at'], name='authenticat_role_e713eb_idx'),
+        ),
+        migrations.RunPython(backfill_order_counts, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
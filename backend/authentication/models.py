@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from .cache_utils import forget_cached_user
 
 
 class CustomUser(AbstractUser):
@@ -14,6 +15,42 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    
+    # Number of orders placed, kept up to date by Order.save()/delete()
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['role', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.phone_number} ({self.role})"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the fields copied into the order search text
+        if 'phone_number' in field_names and 'username' in field_names:
+            instance._search_fields = (instance.phone_number, instance.username)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Save the user and refresh their orders' search text if needed"""
+        search_fields = getattr(self, '_search_fields', None)
+        super().save(*args, **kwargs)
+        
+        forget_cached_user(self.pk)
+        
+        current = (self.phone_number, self.username)
+        if search_fields is not None and search_fields != current:
+            from orders.models import Order
+            Order.objects.filter(user=self).refresh_search_text()
+        self._search_fields = current
+    
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        forget_cached_user(user_id)
+        return result
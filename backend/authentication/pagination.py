@@ -0,0 +1,58 @@
+"""
+Pagination with cheap approximate totals for large tables
+"""
+import json
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator that estimates large totals from the query planner.
+
+    On PostgreSQL the row estimate of EXPLAIN is used instead of COUNT(*)
+    when it is above APPROXIMATE_COUNT_THRESHOLD; small results and other
+    databases are counted exactly.
+    """
+    APPROXIMATE_COUNT_THRESHOLD = 10000
+
+    @cached_property
+    def count(self):
+        """Return the (possibly approximate) number of objects"""
+        estimate = self._planner_estimate()
+        if estimate is not None and estimate > self.APPROXIMATE_COUNT_THRESHOLD:
+            self.is_approximate = True
+            return estimate
+        self.is_approximate = False
+        return super().count
+
+    def _planner_estimate(self):
+        """Row estimate of the query plan, or None when unavailable"""
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        sql, params = query.get_compiler(using=self.object_list.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ApproximateCountPagination(PageNumberPagination):
+    """Page number pagination for large listings with an approximate total"""
+    django_paginator_class = ApproximateCountPaginator
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_approximate'] = getattr(self.page.paginator, 'is_approximate', False)
+        return response
@@ -3,8 +3,6 @@ from .models import CustomUser
 
 
 class UserSerializer(serializers.ModelSerializer):
-    order_count = serializers.IntegerField(read_only=True, default=0)
-    
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'phone_number', 'role', 'created_at', 'order_count']
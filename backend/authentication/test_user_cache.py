@@ -0,0 +1,46 @@
+"""
+Tests for the cached user lookup of token authentication
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.authentication import generate_jwt_token
+from authentication.models import CustomUser
+from orders.models import Order
+
+
+class UserCacheTest(TestCase):
+    """Test that authenticated users are cached and refreshed when they change"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='voter',
+            phone_number='9800000000',
+            password='testpass123',
+            role='user'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(self.user)}')
+    
+    def test_user_lookup_is_cached(self):
+        """Test that a repeated request does not load the user again"""
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/me/')
+        
+        self.assertEqual(response.status_code, 200)
+    
+    def test_changes_refresh_cached_user(self):
+        """Test that saving the user or adding an order drops the cached copy"""
+        self.client.get('/api/auth/me/')
+        
+        self.user.username = 'renamed'
+        self.user.save()
+        Order.objects.create(user=self.user, total_amount=100)
+        
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.data['username'], 'renamed')
+        self.assertEqual(response.data['order_count'], 1)
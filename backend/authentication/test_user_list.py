@@ -0,0 +1,63 @@
+"""
+Tests for the admin user listing
+"""
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from orders.models import Order
+
+
+class UserListTest(TestCase):
+    """Test the paginated user listing and incremental order counts"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.customers = [
+            CustomUser.objects.create_user(
+                username=f'voter{index}',
+                phone_number=f'98000000{index:02d}',
+                password='testpass123',
+                role='user'
+            )
+            for index in range(25)
+        ]
+    
+    def test_order_count_is_maintained(self):
+        """Test that creating and deleting orders updates order_count"""
+        customer = self.customers[0]
+        first = Order.objects.create(user=customer, total_amount=100)
+        Order.objects.create(user=customer, total_amount=200)
+        first.status = 'completed'
+        first.save()
+        
+        customer.refresh_from_db()
+        self.assertEqual(customer.order_count, 2)
+        
+        first.delete()
+        customer.refresh_from_db()
+        self.assertEqual(customer.order_count, 1)
+    
+    def test_user_list_is_paginated(self):
+        """Test that the listing returns pages and filters by search"""
+        self.client.force_authenticate(user=self.admin_user)
+        Order.objects.create(user=self.customers[3], total_amount=100)
+        
+        response = self.client.get('/api/auth/users/', {'role': 'user'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertFalse(response.data['count_is_approximate'])
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get('/api/auth/users/', {'search': 'voter3'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['order_count'], 1)
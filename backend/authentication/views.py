@@ -3,11 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import authenticate
-from django.db.models import Count
+from django.db.models import Q
+from django.utils.decorators import method_decorator
+from election_cart.db_router import use_replica
 from .models import CustomUser
 from .serializers import UserSerializer, UserCreateSerializer, UserUpdateSerializer
 from .authentication import generate_jwt_token
 from .permissions import IsAdmin
+from .pagination import ApproximateCountPagination
 
 
 @api_view(['POST'])
@@ -127,33 +130,32 @@ def get_user_profile(request):
 # USER MANAGEMENT ENDPOINTS (Admin only)
 # ============================================================================
 
+@method_decorator(use_replica(), name='get')
 class UserListView(generics.ListAPIView):
     """
     GET /api/auth/users/
-    List all users with their roles and order counts
+    List users with their roles and order counts, newest first
     Admin only
+    
+    Paginated; the total is estimated for very large result sets.
     """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
-    pagination_class = None  # Disable pagination
+    pagination_class = ApproximateCountPagination
     
     def get_queryset(self):
-        queryset = CustomUser.objects.annotate(
-            order_count=Count('orders')
-        ).order_by('-created_at')
+        queryset = CustomUser.objects.order_by('-created_at', '-id')
         
         # Filter by role
         role_filter = self.request.query_params.get('role', None)
         if role_filter:
             queryset = queryset.filter(role=role_filter)
         
-        # Search by phone or username
+        # Search by phone or username (served by trigram indexes on PostgreSQL)
         search = self.request.query_params.get('search', None)
         if search:
             queryset = queryset.filter(
-                phone_number__icontains=search
-            ) | queryset.filter(
-                username__icontains=search
+                Q(phone_number__icontains=search) | Q(username__icontains=search)
             )
         
         return queryset
@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for serializers, services and image/PDF hot paths.
+
+Run with `python manage.py benchmark`; results are compared with the
+stored baseline in benchmarks/baseline.json.
+"""
@@ -0,0 +1,198 @@
+"""
+Benchmark cases.
+
+Each case loads its inputs the way the corresponding view or task does, so
+the numbers include the queries a real request pays for.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from admin_panel.analytics_service import AnalyticsService
+from admin_panel.checklist_service import ChecklistService
+from admin_panel.serializers import AdminOrderDetailSerializer
+from admin_panel.views import AdminOrderDetailView, AdminOrderListView
+from orders.invoice_generator import InvoiceGenerator
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from products.models import ProductImage
+from products.validators import validate_image_file
+
+from .fixtures import ORDER_SIZES, image_upload
+from .runner import benchmark
+
+
+def register_order_size_cases():
+    for size in ORDER_SIZES:
+        def order_serializer(data, size=size):
+            order_id = data.orders[size]
+
+            def run():
+                # As GET /api/orders/{id}/
+                order = Order.objects.prefetch_related('items').get(id=order_id)
+                return OrderSerializer(order).data
+            return run
+
+        def admin_order_serializer(data, size=size):
+            order_id = data.orders[size]
+
+            def run():
+                # As GET /api/admin/orders/{id}/
+                order = AdminOrderDetailView.queryset.all().get(pk=order_id)
+                return AdminOrderDetailSerializer(order).data
+            return run
+
+        def generate_checklist(data, size=size):
+            order_id = data.unassigned_orders[size]
+
+            def run():
+                # As POST /api/admin/orders/{id}/assign/, rolled back so every call starts fresh
+                with transaction.atomic():
+                    checklist = ChecklistService.generate_checklist_for_order(Order.objects.get(id=order_id))
+                    transaction.set_rollback(True)
+                return checklist
+            return run
+
+        def generate_invoice(data, size=size):
+            order_id = data.orders[size]
+
+            def run():
+                # As the generate_invoice_async task
+                order = Order.objects.select_related(
+                    'user', 'payment_history'
+                ).prefetch_related('items').get(id=order_id)
+                return InvoiceGenerator().generate_invoice(order)
+            return run
+
+        benchmark(f'OrderSerializer[{size} items]')(order_serializer)
+        benchmark(f'AdminOrderDetailSerializer[{size} items]')(admin_order_serializer)
+        benchmark(f'ChecklistService.generate_checklist_for_order[{size} items]')(generate_checklist)
+        benchmark(f'InvoiceGenerator.generate_invoice[{size} items]')(generate_invoice)
+
+
+register_order_size_cases()
+
+
+@benchmark('AnalyticsService.get_revenue_metrics')
+def revenue_metrics(data):
+    return AnalyticsService.get_revenue_metrics
+
+
+@benchmark('AnalyticsService.get_top_products')
+def top_products(data):
+    return AnalyticsService.get_top_products
+
+
+@benchmark('AnalyticsService.get_staff_performance')
+def staff_performance(data):
+    return AnalyticsService.get_staff_performance
+
+
+@benchmark('AnalyticsService.get_order_status_distribution')
+def order_status_distribution(data):
+    return AnalyticsService.get_order_status_distribution
+
+
+@benchmark('AnalyticsService.get_revenue_trend')
+def revenue_trend(data):
+    return AnalyticsService.get_revenue_trend
+
+
+@benchmark('AnalyticsService.get_conversion_rate')
+def conversion_rate(data):
+    return AnalyticsService.get_conversion_rate
+
+
+@benchmark('AnalyticsService.get_year_over_year_growth')
+def year_over_year_growth(data):
+    now = timezone.now()
+    quarter = timedelta(days=90)
+
+    def run():
+        return AnalyticsService.get_year_over_year_growth(now - quarter, now, now - 2 * quarter, now - quarter)
+    return run
+
+
+# Admin order search (GET /api/admin/orders/?search=). The seeded orders get
+# their search text from generate_load_data, so the trigram index can be
+# measured at scale on PostgreSQL, e.g.
+#     python manage.py benchmark --filter search --orders 2000000
+SEARCH_TERMS = {
+    'order number': lambda data: Order.objects.get(id=data.orders[1]).order_number[-6:],
+    'phone': lambda data: data.customer.phone_number[-6:],
+    'username': lambda data: data.customer.username,
+    'product name': lambda data: data.products[0].name,
+}
+
+
+def list_view(params):
+    view = AdminOrderListView()
+    view.request = Request(APIRequestFactory().get('/api/admin/orders/', params))
+    return view
+
+
+def order_search_case(term_of):
+    def prepare(data):
+        view = list_view({'search': term_of(data)})
+
+        def run():
+            # The 50 newest matches with their items, as the list view loads them
+            return list(view.get_queryset()[:50])
+        return run
+    return prepare
+
+
+def legacy_order_search_case(term_of):
+    def prepare(data):
+        term = term_of(data)
+        view = list_view({})
+
+        def run():
+            # The icontains joins over order and customer the search text replaced
+            return list(view.get_queryset().filter(
+                Q(order_number__icontains=term)
+                | Q(user__phone_number__icontains=term)
+                | Q(user__username__icontains=term)
+            )[:50])
+        return run
+    return prepare
+
+
+def register_search_cases():
+    for label, term_of in SEARCH_TERMS.items():
+        benchmark(f'AdminOrderListView search[{label}]')(order_search_case(term_of))
+        if label != 'product name':
+            benchmark(f'legacy order search[{label}]')(legacy_order_search_case(term_of))
+
+
+register_search_cases()
+
+
+def thumbnail_case(name, size, mode, format):
+    def prepare(data):
+        product_image = ProductImage(image=image_upload(name, size, mode, format))
+        return product_image.create_thumbnail
+    return prepare
+
+
+def validation_case(name, size, mode, format):
+    def prepare(data):
+        upload = image_upload(name, size, mode, format)
+        return lambda: validate_image_file(upload)
+    return prepare
+
+
+def register_image_cases():
+    for label, args in (
+        ('2000x1500 JPEG', ('photo.jpg', (2000, 1500), 'RGB', 'JPEG')),
+        ('1024x1024 RGBA PNG', ('logo.png', (1024, 1024), 'RGBA', 'PNG')),
+    ):
+        benchmark(f'ProductImage.create_thumbnail[{label}]')(thumbnail_case(*args))
+        benchmark(f'validate_image_file[{label}]')(validation_case(*args))
+
+
+register_image_cases()
@@ -0,0 +1,98 @@
+"""
+Seeded database state shared by the benchmark cases.
+"""
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from admin_panel.checklist_service import ChecklistService
+from authentication.models import CustomUser
+from orders.models import Order, OrderItem, OrderResource, PaymentHistory
+from products.models import Campaign, Package
+
+
+PREFIX = 'bench'
+
+# Item counts of the orders the serializer and invoice benchmarks run on
+ORDER_SIZES = (1, 10, 50)
+
+
+def image_upload(name, size, mode='RGB', format='JPEG'):
+    """An in-memory upload of a noisy image, closer to a photo than a flat colour"""
+    image = Image.effect_noise(size, 64).convert(mode)
+    buffer = BytesIO()
+    image.save(buffer, format=format)
+    content_type = 'image/png' if format == 'PNG' else 'image/jpeg'
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=content_type)
+
+
+class BenchmarkData:
+    """
+    Bulk data from generate_load_data (users, products, a year of orders)
+    plus, per size in ORDER_SIZES, one fully processed order and one paid
+    order still waiting for its checklist.
+    """
+
+    def __init__(self, orders=2000, seed=7):
+        call_command(
+            'generate_load_data', seed=seed, users=orders // 4, staff=8, admins=1, products=10,
+            orders=orders, days=365, images=0, prefix=PREFIX, stdout=StringIO()
+        )
+        self.customer = CustomUser.objects.filter(username__startswith=f'{PREFIX}_user_').first()
+        self.staff = CustomUser.objects.filter(username__startswith=f'{PREFIX}_staff_').first()
+        self.products = (
+            list(Package.objects.filter(name__startswith=f'[{PREFIX}]'))
+            + list(Campaign.objects.filter(name__startswith=f'[{PREFIX}]'))
+        )
+        self.orders = {size: self.create_order(size) for size in ORDER_SIZES}
+        self.unassigned_orders = {size: self.create_order(size, assigned=False) for size in ORDER_SIZES}
+
+    def create_order(self, size, assigned=True):
+        """A paid order with `size` items and uploaded resources; assigned orders also get a checklist"""
+        paid_at = timezone.now() - timedelta(days=1)
+        order = Order.objects.create(
+            user=self.customer,
+            total_amount=0,
+            status='in_progress' if assigned else 'ready_for_processing',
+            razorpay_order_id=f'order_{PREFIX}{size}',
+            razorpay_payment_id=f'pay_{PREFIX}{size}',
+            payment_completed_at=paid_at,
+            assigned_to=self.staff if assigned else None
+        )
+        total = 0
+        for index in range(size):
+            product = self.products[index % len(self.products)]
+            item = OrderItem.objects.create(
+                order=order,
+                content_type=ContentType.objects.get_for_model(product),
+                object_id=product.id,
+                quantity=1 + index % 3,
+                price=product.price,
+                resources_uploaded=True
+            )
+            total += item.get_subtotal()
+            OrderResource.objects.create(
+                order_item=item,
+                candidate_photo=f'{PREFIX}/photo-{index}.jpg',
+                party_logo=f'{PREFIX}/logo-{index}.jpg',
+                campaign_slogan='Vote for progress',
+                preferred_date=(paid_at + timedelta(days=14)).date(),
+                whatsapp_number='9876543210'
+            )
+        Order.objects.filter(pk=order.pk).update(total_amount=total)
+        PaymentHistory.objects.create(
+            order=order,
+            transaction_id=order.razorpay_payment_id,
+            amount=total,
+            status='completed',
+            payment_date=paid_at,
+            invoice_number=f'INV-{order.order_number}'
+        )
+        if assigned:
+            ChecklistService.generate_checklist_for_order(order)
+        return order.pk
@@ -0,0 +1,170 @@
+"""
+Timing, baseline storage and comparison for the micro-benchmark suite.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+class BenchmarkCase:
+    """
+    A named benchmark.
+
+    `prepare` receives the seeded BenchmarkData and returns the zero-argument
+    callable that is timed, so per-case setup stays out of the measurement.
+    """
+
+    def __init__(self, name, prepare):
+        self.name = name
+        self.prepare = prepare
+
+    def __repr__(self):
+        return f'<BenchmarkCase {self.name}>'
+
+
+registry = []
+
+
+def benchmark(name):
+    """Register the decorated prepare function under `name`"""
+    def decorator(prepare):
+        registry.append(BenchmarkCase(name, prepare))
+        return prepare
+    return decorator
+
+
+def calibrate(func, min_time):
+    """Number of calls (1, 2, 5, 10, 20, ...) that together take at least min_time seconds"""
+    for scale in (10 ** exponent for exponent in range(7)):
+        for multiplier in (1, 2, 5):
+            loops = scale * multiplier
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            if time.perf_counter() - started >= min_time:
+                return loops
+    return loops
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """
+    Time func and return per-call statistics in milliseconds.
+
+    One untimed call warms caches and counts the queries a call runs; then
+    `repeat` runs of a calibrated number of calls are timed.
+    """
+    # The query log is capped; a full log would make the capture report 0
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    loops = calibrate(func, min_time)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - started) / loops * 1000)
+
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'min_ms': round(min(timings), 4),
+        'stdev_ms': round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+        'queries': len(queries),
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def environment():
+    """Describe where the numbers were taken; baselines only compare within one environment"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(terse=True),
+        'machine': platform.machine(),
+        'database': connection.vendor,
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_baseline(path, results, previous=None):
+    """Write results as the new baseline, keeping entries of cases that were not run"""
+    merged = dict(previous['results']) if previous else {}
+    merged.update(results)
+    with open(path, 'w') as handle:
+        json.dump({'environment': environment(), 'results': merged}, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compare results with a baseline.
+
+    Returns one row per result with the relative change of the median and a
+    verdict: 'slower'/'faster' when the median moved by more than
+    `threshold`, 'more queries'/'fewer queries' when the query count changed
+    (which outranks timing noise), 'new' without a baseline entry and 'same'
+    otherwise.
+    """
+    baseline_results = (baseline or {}).get('results', {})
+    rows = []
+    for name, result in results.items():
+        previous = baseline_results.get(name)
+        row = {'name': name, 'result': result, 'baseline': previous, 'change': None}
+        if previous is None:
+            row['verdict'] = 'new'
+        else:
+            row['change'] = (result['median_ms'] - previous['median_ms']) / previous['median_ms']
+            if result['queries'] > previous['queries']:
+                row['verdict'] = 'more queries'
+            elif result['queries'] < previous['queries']:
+                row['verdict'] = 'fewer queries'
+            elif row['change'] > threshold:
+                row['verdict'] = 'slower'
+            elif row['change'] < -threshold:
+                row['verdict'] = 'faster'
+            else:
+                row['verdict'] = 'same'
+        rows.append(row)
+    return rows
+
+
+REGRESSIONS = ('slower', 'more queries')
+
+
+def format_comparison(rows):
+    """Render compare() rows as a fixed-width text table"""
+    header = ['benchmark', 'median ms', 'min ms', 'queries', 'baseline ms', 'change', 'verdict']
+    lines = []
+    for row in rows:
+        result, previous = row['result'], row['baseline']
+        lines.append([
+            row['name'],
+            f"{result['median_ms']:.3f}",
+            f"{result['min_ms']:.3f}",
+            str(result['queries']) if not previous or previous['queries'] == result['queries']
+            else f"{previous['queries']}->{result['queries']}",
+            f"{previous['median_ms']:.3f}" if previous else '-',
+            f"{row['change']:+.1%}" if row['change'] is not None else '-',
+            row['verdict'],
+        ])
+    widths = [max(len(line[index]) for line in [header] + lines) for index in range(len(header))]
+    return '\n'.join(
+        '  '.join(cell.ljust(width) if index == 0 else cell.rjust(width)
+                  for index, (cell, width) in enumerate(zip(line, widths)))
+        for line in [header] + lines
+    )
@@ -0,0 +1,69 @@
+"""
+Tests for the benchmark runner and baseline comparison
+"""
+import json
+import os
+import tempfile
+
+from django.db import connection
+from django.test import TestCase
+from authentication.models import CustomUser
+from benchmarks.runner import compare, format_comparison, load_baseline, measure, save_baseline
+
+
+def result(median_ms, queries=2):
+    return {'median_ms': median_ms, 'min_ms': median_ms, 'stdev_ms': 0.0, 'queries': queries, 'loops': 1, 'repeat': 1}
+
+
+class MeasureTest(TestCase):
+    """Test timing and query counting of a single case"""
+
+    def test_counts_queries_per_call(self):
+        """Test that the queries of one call are reported next to the timings"""
+        stats = measure(lambda: list(CustomUser.objects.all()), repeat=2, min_time=0.001)
+
+        self.assertEqual(stats['queries'], 1)
+        self.assertEqual(stats['repeat'], 2)
+        self.assertGreaterEqual(stats['loops'], 1)
+        self.assertLessEqual(stats['min_ms'], stats['median_ms'])
+
+
+class CompareTest(TestCase):
+    """Test verdicts against a stored baseline"""
+
+    def test_verdicts(self):
+        """Test that timing changes beyond the threshold and query changes are flagged"""
+        baseline = {'results': {
+            'same': result(10.0),
+            'slower': result(10.0),
+            'faster': result(10.0),
+            'more queries': result(10.0, queries=2),
+            'fewer queries': result(10.0, queries=2),
+        }}
+        results = {
+            'same': result(10.5),
+            'slower': result(12.0),
+            'faster': result(8.0),
+            'more queries': result(10.0, queries=3),
+            'fewer queries': result(20.0, queries=1),
+            'new': result(1.0),
+        }
+
+        rows = compare(results, baseline, threshold=0.1)
+
+        self.assertEqual({row['name']: row['verdict'] for row in rows}, {name: name for name in results})
+        self.assertIn('2->3', format_comparison(rows))
+
+    def test_save_keeps_cases_that_were_not_run(self):
+        """Test that saving a filtered run does not drop other baseline entries"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            save_baseline(path, {'a': result(1.0), 'b': result(2.0)})
+            save_baseline(path, {'b': result(3.0)}, load_baseline(path))
+
+            with open(path) as handle:
+                stored = json.load(handle)
+
+        self.assertEqual(stored['results']['a']['median_ms'], 1.0)
+        self.assertEqual(stored['results']['b']['median_ms'], 3.0)
+        self.assertEqual(stored['environment']['database'], connection.vendor)
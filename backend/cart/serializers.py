@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
-from products.serializers import PackageSerializer, CampaignSerializer
+from products.models import prefetch_item_products
+from products.serializers import PackageSerializer, CampaignSerializer, ProductItemListSerializer
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -11,6 +12,7 @@ class CartItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ['id', 'item_type', 'item_details', 'quantity', 'subtotal', 'added_at']
+        list_serializer_class = ProductItemListSerializer
     
     def get_item_type(self, obj):
         """Return the type of item (package or campaign)"""
@@ -41,11 +43,14 @@ class CartSerializer(serializers.ModelSerializer):
     
     def get_items(self, obj):
         """Return cart items, filtering out items with deleted products"""
+        # Load all items with their products and images in a fixed number of queries
+        items = prefetch_item_products(obj.items.all())
+        
         # Get all items and filter out those with null content_object
-        valid_items = [item for item in obj.items.all() if item.content_object is not None]
+        valid_items = [item for item in items if item.content_object is not None]
         
         # Delete orphaned items (items with deleted products)
-        orphaned_items = [item for item in obj.items.all() if item.content_object is None]
+        orphaned_items = [item for item in items if item.content_object is None]
         for item in orphaned_items:
             item.delete()
         
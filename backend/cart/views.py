@@ -15,7 +15,7 @@ def get_cart(request):
     Get current user's cart.
     Endpoint: GET /api/cart/
     """
-    cart, created = Cart.objects.get_or_create(user=request.user)
+    cart, created = Cart.objects.prefetch_related('items').get_or_create(user=request.user)
     serializer = CartSerializer(cart)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
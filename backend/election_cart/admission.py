@@ -0,0 +1,174 @@
+"""
+Admission control for expensive endpoints.
+
+settings.WORKLOAD_CLASSES groups URL names into workload classes. Each
+class may have:
+
+- max_concurrent: a bulkhead. At most this many requests of the class run
+  at once across every process sharing the ADMISSION_CACHE; further
+  requests get 503 with Retry-After instead of tying up workers and
+  database connections. Each running request holds one of max_concurrent
+  slot keys, leased for LEASE_SECONDS in case its process dies. The limit
+  is only deployment-wide when ADMISSION_CACHE is Redis (REDIS_CACHE_URL);
+  with the local memory fallback every process gets max_concurrent slots
+  of its own.
+- statement_timeout_ms: PostgreSQL statement_timeout for the queries of
+  the request, on every database it uses. A query that runs longer is
+  cancelled and the request answered with 503.
+
+Views in no class, such as checkout and payment, are never limited, so
+saturated reporting traffic cannot take their capacity.
+"""
+import logging
+import os
+import random
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, OperationalError, connections
+from django.http import JsonResponse
+
+from .instrumentation import get_view_name
+from .metrics import admission_rejections
+
+logger = logging.getLogger(__name__)
+
+# Slot leases expire in case a process dies while holding one; longer than
+# any statement timeout
+LEASE_SECONDS = 10 * 60
+
+
+def workload_class(view_name):
+    """Name and settings of the workload class of a URL name, or (None, None)"""
+    for name, config in getattr(settings, 'WORKLOAD_CLASSES', {}).items():
+        if view_name in config.get('views', ()):
+            return name, config
+    return None, None
+
+
+class Bulkhead:
+    """Cross-process concurrency limit of `limit` slot keys in a shared cache"""
+
+    def __init__(self, name, limit):
+        self.slot_keys = [f'bulkhead:{name}:{slot}' for slot in range(limit)]
+        self.limit = limit
+        self.held = None
+        self.token = os.urandom(8).hex()
+
+    @property
+    def cache(self):
+        return caches[settings.ADMISSION_CACHE]
+
+    def acquire(self):
+        """Take a slot; False when all `limit` slots are in use"""
+        # Start at a random slot so that requests don't all probe slot 0 first
+        start = random.randrange(self.limit)
+        for key in self.slot_keys[start:] + self.slot_keys[:start]:
+            if self.cache.add(key, self.token, LEASE_SECONDS):
+                self.held = key
+                return True
+        return False
+
+    def release(self):
+        if self.held is None:
+            return
+        # Leave the slot alone if our lease expired and another request took it
+        if self.cache.get(self.held) == self.token:
+            self.cache.delete(self.held)
+        self.held = None
+
+    def in_use(self):
+        return len(self.cache.get_many(self.slot_keys))
+
+
+class StatementTimeout:
+    """
+    Database execute wrapper setting statement_timeout on each PostgreSQL
+    connection before its first query, and resetting it afterwards
+    """
+
+    def __init__(self, timeout_ms):
+        self.timeout_ms = int(timeout_ms)
+        self.applied = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context['connection']
+        if connection.vendor == 'postgresql' and connection.alias not in self.applied:
+            with connection.connection.cursor() as cursor:
+                cursor.execute('SET statement_timeout = %s', [self.timeout_ms])
+            self.applied.add(connection.alias)
+        return execute(sql, params, many, context)
+
+    def reset(self):
+        for alias in self.applied:
+            connection = connections[alias]
+            if connection.connection is None:
+                continue
+            try:
+                # Outside a transaction; a failed one was rolled back already
+                with connection.connection.cursor() as cursor:
+                    cursor.execute('RESET statement_timeout')
+            except DatabaseError:
+                # Don't hand the timeout on to the next request
+                connection.close()
+
+
+def is_statement_timeout(exc):
+    cause = exc.__cause__ or exc
+    return isinstance(exc, OperationalError) and getattr(cause, 'pgcode', None) == '57014'
+
+
+def unavailable(message, retry_after):
+    response = JsonResponse({'error': message}, status=503)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Apply the bulkhead and statement timeout of the view's workload class"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            admission = getattr(request, '_admission', None)
+            if admission is not None:
+                bulkhead, timeout, stack = admission
+                stack.close()
+                if timeout is not None:
+                    timeout.reset()
+                if bulkhead is not None:
+                    bulkhead.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name, config = workload_class(get_view_name(request))
+        if name is None:
+            return None
+
+        bulkhead = None
+        if config.get('max_concurrent'):
+            bulkhead = Bulkhead(name, config['max_concurrent'])
+            if not bulkhead.acquire():
+                admission_rejections.labels(name, 'saturated').inc()
+                logger.warning(f'Rejected {request.path}: {name} is at {bulkhead.limit} concurrent requests')
+                return unavailable('Server busy, try again shortly', config.get('retry_after', 5))
+
+        timeout = None
+        stack = ExitStack()
+        if config.get('statement_timeout_ms'):
+            timeout = StatementTimeout(config['statement_timeout_ms'])
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timeout))
+        request._admission = (bulkhead, timeout, stack)
+        return None
+
+    def process_exception(self, request, exception):
+        if getattr(request, '_admission', None) is None or not is_statement_timeout(exception):
+            return None
+        name, config = workload_class(get_view_name(request))
+        admission_rejections.labels(name, 'statement_timeout').inc()
+        logger.warning(f'Statement timeout in {request.path} ({name})')
+        return unavailable('The request took too long, try again later', config.get('retry_after', 5))
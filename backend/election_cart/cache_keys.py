@@ -0,0 +1,46 @@
+"""
+Versioned cache key namespaces.
+
+Keys built with versioned_key() include the current version of their
+namespace, so invalidate_namespace() drops every key of the namespace at
+once by replacing the version, without clearing the cache and with it
+the counters, flags and queues other modules keep there. Entries of older
+versions are no longer read and expire with their timeout.
+
+    key = versioned_key('catalog', path)
+    invalidate_namespace('catalog')
+
+The version is read through the default cache, so it is usually served
+from the process-local tier (see two_tier_cache.py). Versions are random
+tokens rather than counters: when the version entry is evicted, the next
+read starts a new token instead of falling back to a number older entries
+were stored under, so eviction can only cause misses, never stale reads.
+"""
+import secrets
+
+from django.core.cache import cache
+
+from .instrumentation import uncounted
+
+
+def _version_key(namespace):
+    return f'{namespace}:version'
+
+
+def _new_version():
+    return secrets.token_hex(8)
+
+
+def namespace_version(namespace):
+    # Bookkeeping, not a lookup of cached data
+    with uncounted():
+        return cache.get_or_set(_version_key(namespace), _new_version, None)
+
+
+def versioned_key(namespace, key):
+    return f'{namespace}:v{namespace_version(namespace)}:{key}'
+
+
+def invalidate_namespace(namespace):
+    """Make every key built with versioned_key(namespace, ...) stale"""
+    cache.set(_version_key(namespace), _new_version(), None)
@@ -2,7 +2,7 @@
 Celery configuration for Election Cart project
 """
 import os
-from celery import Celery
+from celery import Celery, signals
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'election_cart.settings')
@@ -18,6 +18,19 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Task duration and retry metrics (see election_cart/metrics.py)
+from . import metrics  # noqa: E402,F401
+
+
+@signals.task_prerun.connect
+@signals.task_postrun.connect
+def close_old_db_connections(task=None, **kwargs):
+    """Apply CONN_MAX_AGE and CONN_HEALTH_CHECKS to tasks as to requests"""
+    # Eagerly run tasks share the connection of the code that applied them
+    if not getattr(task.request, 'is_eager', False):
+        from django.db import close_old_connections
+        close_old_connections()
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
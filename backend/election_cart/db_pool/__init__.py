@@ -0,0 +1,4 @@
+"""
+Pooled PostgreSQL database backend, enabled with ENGINE
+'election_cart.db_pool' (see election_cart/settings.py).
+"""
@@ -0,0 +1,77 @@
+"""
+PostgreSQL backend that takes connections from a process-local pool.
+
+Django opens a connection per thread and, with CONN_MAX_AGE = 0, closes it
+at the end of every request. With this backend "opening" checks a
+connection out of the pool and "closing" returns it, so gunicorn threads
+and Celery tasks reuse a capped number of server connections.
+"""
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresDatabaseCreation
+
+from .pool import PoolTimeout, close_pools, get_pool
+
+Database = base.Database
+
+
+def _ping(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseCreation(PostgresDatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database would block DROP DATABASE
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    settings.DATABASES entries configure the pool with a POOL dict:
+    MAX_SIZE connections per process (default 10), TIMEOUT seconds to wait
+    for one (default 10), MAX_IDLE seconds after which an idle connection
+    is closed instead of reused (default 300) and HEALTH_CHECKS to run
+    SELECT 1 on every checkout (default False).
+    """
+    creation_class = DatabaseCreation
+
+    def _pool(self, conn_params):
+        options = self.settings_dict.get('POOL', {})
+        # Separate pools per database (the test database, the server's
+        # maintenance database used while creating it) and per user
+        key = (self.alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+        name = self.alias if self.alias != NO_DB_ALIAS else 'nodb'
+        return get_pool(
+            key, name, options.get('MAX_SIZE', 10), options.get('TIMEOUT', 10), options.get('MAX_IDLE', 300)
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self._pool(conn_params)
+        health_checks = self.settings_dict.get('POOL', {}).get('HEALTH_CHECKS', False)
+        try:
+            connection = pool.acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                _ping if health_checks else None
+            )
+        except PoolTimeout as exc:
+            raise Database.OperationalError(str(exc)) from exc
+        self._checked_out_from = pool
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = getattr(self, '_checked_out_from', None)
+        self._checked_out_from = None
+        if pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # A connection that saw errors may be broken; don't hand it out again
+            pool.release(self.connection, discard=self.errors_occurred)
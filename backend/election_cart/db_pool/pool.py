@@ -0,0 +1,137 @@
+"""
+Process-local database connection pool.
+
+A pool holds at most `max_size` connections. Threads that find every
+connection checked out wait up to `timeout` seconds for one to be returned
+and then fail with PoolTimeout. The time spent waiting is exported as
+election_cart_db_pool_wait_seconds.
+
+Pools are keyed by process id, so a forked process (Celery prefork,
+gunicorn with preload) never hands out a connection it inherited from its
+parent.
+"""
+import logging
+import os
+import threading
+import time
+
+from election_cart.metrics import db_connections_opened, db_pool_timeouts, db_pool_wait
+
+logger = logging.getLogger(__name__)
+
+# Keyed by (pid, key). Pools a forked child inherits stay referenced here
+# and are never used or closed by the child, which would end the parent's
+# sessions
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections shared by the threads of a process"""
+
+    def __init__(self, name, max_size, timeout=10, max_idle=300):
+        self.name = name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self, connect, is_usable=None):
+        """
+        Return an idle connection that passes `is_usable`, or a new one from
+        `connect()`; wait for a free slot when all are checked out
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            db_pool_timeouts.labels(self.name).inc()
+            raise PoolTimeout(
+                f'No connection to {self.name} became free within {self.timeout}s '
+                f'({self.max_size} in use)'
+            )
+        db_pool_wait.labels(self.name).observe(time.perf_counter() - started)
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+                if time.monotonic() - returned_at > self.max_idle:
+                    # The server or a firewall may have dropped it already
+                    self._discard(connection)
+                elif connection.closed or (is_usable is not None and not is_usable(connection)):
+                    self._discard(connection)
+                else:
+                    return connection
+            connection = connect()
+            db_connections_opened.labels(self.name).inc()
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """Give a connection back, rolling back any open transaction"""
+        try:
+            if not discard and not connection.closed:
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+            if discard or connection.closed:
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception as exc:
+            logger.debug(f'Error closing pooled connection to {self.name}: {exc}')
+
+
+def get_pool(key, name, max_size, timeout, max_idle):
+    """Return this process's pool for `key`, creating it on first use"""
+    pool_key = (os.getpid(), key)
+    pool = _pools.get(pool_key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(pool_key, ConnectionPool(name, max_size, timeout, max_idle))
+    return pool
+
+
+def close_pools():
+    """Close the idle connections of every pool of this process"""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [pool for (pool_pid, _), pool in _pools.items() if pool_pid == pid]
+    for pool in pools:
+        pool.close()
+
+
+def _after_fork():
+    # Another thread of the parent may have held the lock while forking
+    global _pools_lock
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
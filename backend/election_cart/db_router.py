@@ -0,0 +1,81 @@
+"""
+Read-replica routing.
+
+Reads go to the primary unless they run inside use_replica(), which marks
+read-only workloads (analytics, exports, admin lists) that tolerate
+replication lag:
+
+    @api_view(['GET'])
+    @use_replica()
+    def analytics_overview(request): ...
+
+    @method_decorator(use_replica(), name='get')
+    class AdminOrderListView(generics.ListAPIView): ...
+
+Reads still go to the primary when settings.REPLICA_DATABASE is unset or
+not in DATABASES, inside a transaction on the primary, and for the rest
+of a request (or Celery task) once it has written, so it reads its own
+writes.
+"""
+import contextvars
+from contextlib import contextmanager
+from celery.signals import task_prerun
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_wrote = contextvars.ContextVar('wrote_to_primary', default=False)
+
+
+@contextmanager
+def use_replica():
+    """Send reads to the replica within the block or decorated function"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none"""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def reset_pinning(**kwargs):
+    """Start a new unit of work (request or task) that has not written yet"""
+    _wrote.set(False)
+
+
+request_started.connect(reset_pinning, dispatch_uid='db_router_reset_pinning')
+task_prerun.connect(reset_pinning, dispatch_uid='db_router_reset_pinning')
+
+
+class ReadReplicaRouter:
+    """Route use_replica() reads to settings.REPLICA_DATABASE"""
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads in a transaction must see its uncommitted writes
+            return DEFAULT_DB_ALIAS
+        return replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
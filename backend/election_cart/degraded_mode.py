@@ -0,0 +1,141 @@
+"""
+Degraded mode: load shedding for peak traffic.
+
+While degraded mode is on:
+
+- The views in settings.DEGRADED_MODE_REJECT_VIEWS (analytics export,
+  order statistics, audit logs, notification lists) answer 503 with
+  Retry-After.
+- Analytics views decorated with cache_analytics are served from the last
+  snapshot of their response, or answer 503 when there is none. Snapshots
+  are kept whether or not degraded mode is on.
+- Analytics cache invalidation is postponed; one invalidation runs when
+  degraded mode is switched off.
+- Admin notification fan-out is postponed; the notifications are queued,
+  one per order and type, and sent by a Celery task when degraded mode is
+  switched off.
+
+The switch, the queue and the snapshots live in DEGRADED_MODE_CACHE, which
+is never cleared (Redis in production), so turning degraded mode on or off
+through /api/admin/degraded-mode/ or `manage.py degraded_mode on|off`
+applies to every worker without a restart.
+Shed requests and deferred work are counted in
+election_cart_load_shed_total and election_cart_deferred_work_total.
+"""
+import logging
+from django.conf import settings
+from django.core.cache import caches
+
+from .admission import unavailable
+from .instrumentation import get_view_name
+from .metrics import deferred_work, load_shed
+
+logger = logging.getLogger(__name__)
+
+ENABLED_KEY = 'degraded-mode:enabled'
+INVALIDATION_PENDING_KEY = 'degraded-mode:invalidation-pending'
+NOTIFICATION_COUNT_KEY = 'degraded-mode:notifications'
+
+
+def _cache():
+    return caches[settings.DEGRADED_MODE_CACHE]
+
+
+def is_degraded():
+    return bool(_cache().get(ENABLED_KEY, False))
+
+
+def set_degraded(enabled):
+    """
+    Switch degraded mode. Switching it off runs the postponed analytics
+    invalidation and queues a task sending the deferred notifications.
+    """
+    from admin_panel.cache_utils import invalidate_analytics_cache
+    from admin_panel.tasks import send_deferred_admin_notifications
+
+    cache = _cache()
+    if enabled:
+        cache.set(ENABLED_KEY, True, None)
+        logger.warning('Degraded mode enabled')
+        return
+    cache.delete(ENABLED_KEY)
+    logger.warning('Degraded mode disabled')
+
+    if cache.get(INVALIDATION_PENDING_KEY):
+        cache.delete(INVALIDATION_PENDING_KEY)
+        invalidate_analytics_cache()
+    if _deferred_notification_keys():
+        try:
+            send_deferred_admin_notifications.delay()
+        except Exception as exc:
+            # They stay queued; switching off again retries
+            logger.error(f'Could not queue the deferred admin notifications: {str(exc)}')
+
+
+def status():
+    cache = _cache()
+    return {
+        'enabled': is_degraded(),
+        'deferred_notifications': len(_deferred_notification_keys()),
+        'analytics_invalidation_pending': bool(cache.get(INVALIDATION_PENDING_KEY, False)),
+    }
+
+
+def defer_analytics_invalidation():
+    _cache().set(INVALIDATION_PENDING_KEY, True, None)
+    deferred_work.labels('analytics_invalidation').inc()
+
+
+def defer_notification(order_id, notification_type):
+    """Queue an admin notification until degraded mode is switched off"""
+    cache = _cache()
+    deferred_work.labels('notification').inc()
+    # One pending notification per order and type is enough
+    if not cache.add(f'degraded-mode:notification:{order_id}:{notification_type}', True, None):
+        return
+    cache.add(NOTIFICATION_COUNT_KEY, 0, None)
+    number = cache.incr(NOTIFICATION_COUNT_KEY)
+    cache.set(f'degraded-mode:notification:{number}', (order_id, notification_type), None)
+
+
+def _deferred_notification_keys():
+    count = _cache().get(NOTIFICATION_COUNT_KEY, 0)
+    return [f'degraded-mode:notification:{number}' for number in range(1, count + 1)]
+
+
+def take_deferred_notifications():
+    """Remove the deferred notifications from the queue, oldest first"""
+    cache = _cache()
+    keys = _deferred_notification_keys()
+    notifications = cache.get_many(keys)
+    cache.delete_many(keys + [NOTIFICATION_COUNT_KEY] + [
+        f'degraded-mode:notification:{order_id}:{notification_type}'
+        for order_id, notification_type in notifications.values()
+    ])
+    return [notifications[key] for key in keys if key in notifications]
+
+
+def snapshot(key):
+    """The last response data saved under key by save_snapshot(), or None"""
+    return _cache().get(f'degraded-mode:snapshot:{key}')
+
+
+def save_snapshot(key, data):
+    _cache().set(f'degraded-mode:snapshot:{key}', data, settings.DEGRADED_MODE_SNAPSHOT_TTL)
+
+
+class LoadSheddingMiddleware:
+    """Reject the views in DEGRADED_MODE_REJECT_VIEWS while degraded mode is on"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = get_view_name(request)
+        if view_name not in settings.DEGRADED_MODE_REJECT_VIEWS or not is_degraded():
+            return None
+        load_shed.labels(view_name, 'rejected').inc()
+        return unavailable('Temporarily unavailable during peak traffic', settings.DEGRADED_MODE_RETRY_AFTER)
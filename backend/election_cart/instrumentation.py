@@ -0,0 +1,232 @@
+"""
+Per-request instrumentation: SQL query count, DB time, cache hits and
+misses and total time, recorded per view with optional query budgets.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+
+from .metrics import record_request
+from .slow_queries import capture_slow_query, record_slow_queries, slow_query_threshold
+from .two_tier_cache import TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more queries than its budget allows"""
+
+
+class RequestMetrics:
+    """Counters collected while a single request is handled"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.slow_queries = []
+        self.started = time.perf_counter()
+        self.total_time = None
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, or None"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def uncounted():
+    """Leave the cache lookups of the block out of the request's metrics"""
+    token = _current_metrics.set(None)
+    try:
+        yield
+    finally:
+        _current_metrics.reset(token)
+
+
+class QueryCounter:
+    """
+    Database execute wrapper adding every query to a RequestMetrics and
+    capturing queries slower than `slow_threshold` seconds
+    """
+
+    def __init__(self, metrics, slow_threshold=None):
+        self.metrics = metrics
+        self.slow_threshold = slow_threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.queries += 1
+            self.metrics.db_time += elapsed
+            if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+                self.metrics.slow_queries.append(
+                    capture_slow_query(sql, params, many, elapsed, context['connection'].alias)
+                )
+
+
+class ViewMetricsRegistry:
+    """Thread-safe per-view aggregates of request metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, metrics, over_budget=False):
+        with self._lock:
+            stats = self._views.setdefault(view_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'db_time': 0.0,
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'cache_hits': 0,
+                'cache_misses': 0,
+                'over_budget': 0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += metrics.queries
+            stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+            stats['db_time'] += metrics.db_time
+            stats['total_time'] += metrics.total_time
+            stats['max_time'] = max(stats['max_time'], metrics.total_time)
+            stats['cache_hits'] += metrics.cache_hits
+            stats['cache_misses'] += metrics.cache_misses
+            stats['over_budget'] += int(over_budget)
+
+    def snapshot(self):
+        """Return a copy of the aggregates with per-request averages"""
+        with self._lock:
+            views = {name: dict(stats) for name, stats in self._views.items()}
+        for stats in views.values():
+            requests = stats['requests']
+            stats['avg_queries'] = round(stats['queries'] / requests, 2)
+            stats['avg_db_time_ms'] = round(stats['db_time'] * 1000 / requests, 2)
+            stats['avg_time_ms'] = round(stats['total_time'] * 1000 / requests, 2)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_metrics = ViewMetricsRegistry()
+
+
+def get_view_name(request):
+    """Name requests by URL pattern name, falling back to the view function"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Record query count, DB time, cache hits/misses and total time for every
+    request, aggregate them per view and enforce query budgets.
+
+    Budgets are configured in settings.QUERY_BUDGETS as a mapping of URL
+    name to the maximum number of queries. QUERY_BUDGET_MODE 'log' logs a
+    warning when a budget is exceeded, 'raise' raises QueryBudgetExceeded.
+    With INSTRUMENTATION_HEADERS (defaults to DEBUG) the numbers are added
+    to the response as X-DB-Queries, X-DB-Time-ms, X-Cache-Hits,
+    X-Cache-Misses and X-Response-Time-ms headers. Queries slower than
+    SLOW_QUERY_THRESHOLD_MS are recorded by election_cart.slow_queries.
+    Latency and status counts are also exported to Prometheus by
+    election_cart.metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        counter = QueryCounter(metrics, slow_query_threshold())
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        metrics.finish()
+
+        view_name = get_view_name(request)
+        if metrics.slow_queries:
+            record_slow_queries(view_name, metrics.slow_queries)
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        over_budget = budget is not None and metrics.queries > budget
+        view_metrics.record(view_name, metrics, over_budget)
+        record_request(view_name, request.method, response.status_code, metrics.total_time)
+
+        if getattr(settings, 'INSTRUMENTATION_HEADERS', settings.DEBUG):
+            response['X-DB-Queries'] = str(metrics.queries)
+            response['X-DB-Time-ms'] = f'{metrics.db_time * 1000:.1f}'
+            response['X-Cache-Hits'] = str(metrics.cache_hits)
+            response['X-Cache-Misses'] = str(metrics.cache_misses)
+            response['X-Response-Time-ms'] = f'{metrics.total_time * 1000:.1f}'
+
+        if over_budget:
+            message = f'{view_name} ran {metrics.queries} queries, budget is {budget}'
+            if getattr(settings, 'QUERY_BUDGET_MODE', 'log') == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+
+class InstrumentedCacheMixin:
+    """Count cache hits and misses on the current request's metrics"""
+
+    def _count(self, hits, misses):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.cache_hits += hits
+            metrics.cache_misses += misses
+
+    def get(self, key, default=None, version=None):
+        if getattr(self, '_in_get_many', False):
+            # Counted once by get_many
+            return super().get(key, default, version)
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            self._count(0, 1)
+            return default
+        self._count(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        self._in_get_many = True
+        try:
+            values = super().get_many(keys, version)
+        finally:
+            self._in_get_many = False
+        self._count(len(values), len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """Local memory cache that reports hits and misses per request"""
+
+
+class InstrumentedTwoTierCache(InstrumentedCacheMixin, TwoTierCache):
+    """Two-tier cache that reports hits and misses per request"""
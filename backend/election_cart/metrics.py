@@ -0,0 +1,193 @@
+"""
+Prometheus metrics for the API, the analytics cache, Celery tasks, uploads
+and Razorpay calls, exposed in the Prometheus text format at /metrics.
+
+Every worker process keeps its own counters. When gunicorn or Celery runs
+more than one process, set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by all processes on the host (before they start); each process then
+writes its samples there and /metrics aggregates all of them. gunicorn.conf.py
+cleans the directory up when workers exit.
+
+Only counters and histograms are used, as they aggregate across processes
+without extra configuration. The analytics cache hit ratio is
+    sum(rate(election_cart_analytics_cache_requests_total{result="hit"}[5m]))
+      / sum(rate(election_cart_analytics_cache_requests_total[5m]))
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from celery.signals import task_postrun, task_prerun, task_retry
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+UPLOAD_SIZE_BUCKETS = (
+    10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 2 * 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 20 * 1024 ** 2
+)
+TASK_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+request_duration = Histogram(
+    'election_cart_request_duration_seconds',
+    'Time to handle a request, by URL name',
+    ['view', 'method'],
+)
+requests_total = Counter(
+    'election_cart_requests',
+    'Requests handled, by URL name and response status',
+    ['view', 'method', 'status'],
+)
+analytics_cache_requests = Counter(
+    'election_cart_analytics_cache_requests',
+    'Analytics responses served from the cache (hit) or computed (miss)',
+    ['view', 'result'],
+)
+cache_lookups = Counter(
+    'election_cart_cache_lookups',
+    'Two-tier cache lookups by the tier that answered them',
+    ['tier', 'result'],
+)
+db_pool_wait = Histogram(
+    'election_cart_db_pool_wait_seconds',
+    'Time spent waiting for a free pooled database connection',
+    ['database'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+db_pool_timeouts = Counter(
+    'election_cart_db_pool_timeouts',
+    'Requests for a pooled database connection that timed out',
+    ['database'],
+)
+db_connections_opened = Counter(
+    'election_cart_db_connections_opened',
+    'New database connections opened by the connection pool',
+    ['database'],
+)
+admission_rejections = Counter(
+    'election_cart_admission_rejections',
+    'Requests answered with 503 by admission control, by workload class',
+    ['workload', 'reason'],
+)
+load_shed = Counter(
+    'election_cart_load_shed',
+    'Requests shed in degraded mode, rejected or served from a snapshot',
+    ['view', 'action'],
+)
+deferred_work = Counter(
+    'election_cart_deferred_work',
+    'Work postponed until degraded mode is switched off',
+    ['work'],
+)
+task_duration = Histogram(
+    'election_cart_celery_task_duration_seconds',
+    'Celery task run time, by final state of the run',
+    ['task', 'state'],
+    buckets=TASK_DURATION_BUCKETS,
+)
+task_retries = Counter(
+    'election_cart_celery_task_retries',
+    'Celery task retries scheduled',
+    ['task'],
+)
+upload_bytes = Histogram(
+    'election_cart_upload_size_bytes',
+    'Size of uploaded files, by content type',
+    ['content_type'],
+    buckets=UPLOAD_SIZE_BUCKETS,
+)
+upload_validation_duration = Histogram(
+    'election_cart_upload_validation_duration_seconds',
+    'Time spent validating the uploaded files of a request',
+    ['outcome'],
+)
+razorpay_duration = Histogram(
+    'election_cart_razorpay_request_duration_seconds',
+    'Latency of Razorpay API calls',
+    ['operation', 'outcome'],
+)
+
+_task_started = {}
+
+
+def record_request(view_name, method, status_code, duration):
+    """Record a handled request; called by RequestInstrumentationMiddleware"""
+    request_duration.labels(view_name, method).observe(duration)
+    requests_total.labels(view_name, method, str(status_code)).inc()
+
+
+def record_upload(content_type, size):
+    """Record the size of an uploaded file"""
+    upload_bytes.labels(content_type or 'unknown').observe(size)
+
+
+def validate_upload(uploads, validate):
+    """
+    Record the sizes of the uploaded files an upload view received, then run
+    its validation and record the duration. The outcome is 'error' when
+    validate() raises or returns a false value.
+    """
+    for upload in uploads:
+        record_upload(upload.content_type, upload.size)
+    started = time.perf_counter()
+    valid = False
+    try:
+        valid = bool(validate())
+        return valid
+    finally:
+        outcome = 'success' if valid else 'error'
+        upload_validation_duration.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_duration(histogram, **labels):
+    """Observe the duration of the block, with outcome 'success' or 'error'"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - started)
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        task_duration.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@task_retry.connect
+def _task_retry(sender=None, **kwargs):
+    task_retries.labels(sender.name).inc()
+
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', '')
+    if not token:
+        # Without a token the endpoint is only open during development
+        return settings.DEBUG
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires `Authorization: Bearer <METRICS_AUTH_TOKEN>`"""
+    if not _authorized(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,189 @@
+"""
+Opt-in cProfile capture of single requests.
+
+An admin obtains a short-lived signed token from
+POST /api/admin/profiles/token/ and sends it in the X-Profile header (or
+the _profile query parameter) of the request to profile. That request runs
+under cProfile with its SQL recorded; the profile is kept in the bounded
+admin_panel.RequestProfile table, so every worker process sees it, and can
+be listed and downloaded from /api/admin/profiles/. Requests without a
+token only pay for one header lookup.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import logging
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from django.conf import settings
+from django.core import signing
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .instrumentation import get_view_name
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = '_profile'
+_TOKEN_SALT = 'election_cart.profiling'
+
+# Upper bounds on what is stored per profile
+MAX_RECORDED_QUERIES = 500
+STATS_LINES = 60
+
+
+def issue_profile_token(user):
+    """Signed token that lets `user` profile their own requests for PROFILER_TOKEN_MAX_AGE seconds"""
+    return signing.dumps({'user_id': user.id}, salt=_TOKEN_SALT)
+
+
+def profile_token_user_id(token):
+    """User id a valid, unexpired token was issued to, or None"""
+    try:
+        payload = signing.loads(token, salt=_TOKEN_SALT, max_age=settings.PROFILER_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return payload.get('user_id')
+
+
+class QueryRecorder:
+    """Database execute wrapper recording the SQL and duration of every query"""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.time += elapsed
+            if len(self.queries) < MAX_RECORDED_QUERIES:
+                self.queries.append({'sql': sql, 'time_ms': round(elapsed * 1000, 3), 'many': many})
+
+
+class ProfileStore:
+    """
+    The last PROFILER_BUFFER_SIZE profiles, kept for PROFILER_TTL seconds in
+    the admin_panel.RequestProfile table, as dicts
+    """
+
+    summary_fields = (
+        'id', 'view_name', 'method', 'path', 'status_code', 'user', 'created_at',
+        'duration_ms', 'query_count', 'db_time_ms',
+    )
+
+    def _recent(self):
+        from admin_panel.models import RequestProfile
+
+        return RequestProfile.objects.filter(created_at__gte=timezone.now() - timedelta(seconds=settings.PROFILER_TTL))
+
+    def add(self, profile):
+        from admin_panel.models import RequestProfile
+
+        stored = RequestProfile.objects.create(**profile)
+        # Keep only the newest PROFILER_BUFFER_SIZE rows
+        cutoff = RequestProfile.objects.order_by('-id').values_list('id', flat=True)[
+            settings.PROFILER_BUFFER_SIZE:settings.PROFILER_BUFFER_SIZE + 1
+        ]
+        if cutoff:
+            RequestProfile.objects.filter(id__lte=cutoff[0]).delete()
+        return stored.id
+
+    def get(self, profile_id):
+        profile = self._recent().filter(id=profile_id).values().first()
+        if profile is not None:
+            profile['raw'] = bytes(profile['raw'])
+        return profile
+
+    def list(self):
+        """Stored profiles without their stats and queries, newest first"""
+        return list(self._recent().order_by('-id').values(*self.summary_fields))
+
+    def clear(self):
+        from admin_panel.models import RequestProfile
+
+        RequestProfile.objects.all().delete()
+
+
+profile_store = ProfileStore()
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile requests that carry a valid profile token.
+
+    The profile is only stored when the request was authenticated as the
+    admin the token was issued to, so a leaked token cannot be used to
+    profile (and read the SQL of) anyone else's requests. The stored
+    profile's id is returned in the X-Profile-Id header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if not token and PROFILE_QUERY_PARAM in request.META.get('QUERY_STRING', ''):
+            token = request.GET.get(PROFILE_QUERY_PARAM)
+        if not token:
+            return self.get_response(request)
+
+        token_user_id = profile_token_user_id(token)
+        if token_user_id is None:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this thread
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+
+        user = getattr(request, 'user', None)
+        if not (user and user.is_authenticated and user.id == token_user_id and user.role == 'admin'):
+            return response
+
+        try:
+            profile_id = profile_store.add(self.build_profile(request, response, profiler, recorder, duration))
+        except DatabaseError as exc:
+            logger.error(f"Could not store the profile of {request.path}: {str(exc)}")
+            return response
+        response['X-Profile-Id'] = str(profile_id)
+        return response
+
+    def build_profile(self, request, response, profiler, recorder, duration):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(STATS_LINES)
+        return {
+            'view_name': get_view_name(request)[:200],
+            'method': request.method,
+            'path': request.path[:500],
+            'status_code': response.status_code,
+            'user': request.user.username,
+            'duration_ms': round(duration * 1000, 2),
+            'query_count': recorder.count,
+            'db_time_ms': round(recorder.time * 1000, 2),
+            'stats': stream.getvalue(),
+            # Same format as cProfile's dump_stats, loadable with pstats or snakeviz
+            'raw': marshal.dumps(stats.stats),
+            'queries': recorder.queries,
+        }
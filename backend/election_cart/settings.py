@@ -38,6 +38,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'election_cart.profiling.RequestProfilerMiddleware',
+    'election_cart.instrumentation.RequestInstrumentationMiddleware',
+    'election_cart.degraded_mode.LoadSheddingMiddleware',
+    'election_cart.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,9 +83,49 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Keep connections open between requests (seconds) and check them
+        # with SELECT 1 before reusing them in a new request
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# In-process connection pooling (see election_cart/db_pool). Each process
+# opens at most DB_POOL_SIZE connections, shared by its threads; requests
+# wait up to DB_POOL_TIMEOUT seconds for a free one. Connections go back to
+# the pool after every request instead of staying with their thread
+if int(os.getenv('DB_POOL_SIZE', '0')) > 0:
+    DATABASES['default'].update({
+        'ENGINE': 'election_cart.db_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_SIZE')),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'MAX_IDLE': int(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            'HEALTH_CHECKS': True,
+        },
+    })
+
+# Server-side pooling: PgBouncer in transaction mode cannot keep the
+# server-side cursors of QuerySet.iterator() open between transactions
+if os.getenv('DB_PGBOUNCER', 'False') == 'True':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replica (see election_cart/db_router.py). Analytics, exports and
+# admin lists read from it; everything else, and anything after a write in
+# the same request, uses the primary. Reads are only routed to it when
+# DB_REPLICA_HOST is set; otherwise the 'replica' alias is an unused second
+# connection to the primary. Tests treat the alias as a mirror of the
+# primary and enable routing with override_settings(REPLICA_DATABASE=...)
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+    'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    'TEST': {'MIRROR': 'default'},
+}
+REPLICA_DATABASE = 'replica' if os.getenv('DB_REPLICA_HOST') else None
+DATABASE_ROUTERS = ['election_cart.db_router.ReadReplicaRouter']
+
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.CustomUser'
 
@@ -180,40 +224,197 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
+    'x-profile',
     'x-requested-with',
 ]
 
+# Lets the admin frontend read the id of a profiled request
+CORS_EXPOSE_HEADERS = ['x-profile-id']
+
 # Firebase settings
 FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH', '')
 
 # Razorpay settings
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID', '')
 RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', '')
+# Point the Razorpay client at another API host, e.g. the local stand-in
+# gateway used for load tests (python -m loadtest gateway)
+RAZORPAY_BASE_URL = os.getenv('RAZORPAY_BASE_URL', '')
 
 # Cache settings
-# Using LocMemCache for development, can be upgraded to Redis in production
+# 'default' is a two-tier cache (see election_cart/two_tier_cache.py): a
+# small per-process LRU answers hot reads and 'shared' holds the data all
+# processes see. 'shared' is Redis when REDIS_CACHE_URL is set, otherwise a
+# local memory cache, which is only coherent within one process
 CACHES = {
     'default': {
+        'BACKEND': 'election_cart.instrumentation.InstrumentedTwoTierCache',
+        'LOCATION': 'election-cart-l1',
+        'TIMEOUT': 300,  # 5 minutes default timeout
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', '500')),
+            # Seconds an entry is served from memory without reading 'shared'
+            'L1_TIMEOUT': int(os.getenv('CACHE_L1_TIMEOUT', '10')),
+            # Seconds before a process sees writes made by other processes
+            'GENERATION_CHECK_INTERVAL': float(os.getenv('CACHE_GENERATION_CHECK_INTERVAL', '1')),
+        }
+    },
+    'shared': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'election-cart-cache',
-        'TIMEOUT': 300,  # 5 minutes default timeout
+        'TIMEOUT': 300,
         'OPTIONS': {
             'MAX_ENTRIES': 1000
         }
+    },
+}
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        'TIMEOUT': 300,
     }
+# Cross-process coordination state (bulkhead slots, switches, queues). Never
+# cleared; give it its own Redis database with REDIS_COORDINATION_URL
+CACHES['coordination'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'election-cart-coordination',
+    'TIMEOUT': None,
+    'OPTIONS': {
+        'MAX_ENTRIES': 10000
+    }
+}
+if os.getenv('REDIS_COORDINATION_URL', os.getenv('REDIS_CACHE_URL')):
+    CACHES['coordination'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_COORDINATION_URL', os.getenv('REDIS_CACHE_URL')),
+        'KEY_PREFIX': 'coordination',
+        'TIMEOUT': None,
+    }
+
+# Seconds public catalogue responses and authenticated users stay cached;
+# writes through the app invalidate them sooner
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', '300'))
+
+# Request instrumentation (see election_cart/instrumentation.py)
+# Adds X-DB-Queries / X-DB-Time-ms / X-Cache-* / X-Response-Time-ms headers
+INSTRUMENTATION_HEADERS = DEBUG
+# Maximum number of SQL queries per request, keyed by URL name. Includes one
+# query for the user lookup of token authentication. Enforced in tests by
+# election_cart/test_query_budgets.py, which also checks that the counts do
+# not grow with the number of orders, items or products.
+QUERY_BUDGETS = {
+    # Public catalogue
+    'package-list': 5,
+    'package-detail': 4,
+    'campaign-list': 4,
+    'campaign-detail': 3,
+    'product-images-list': 6,
+    # Customer
+    'user-profile': 1,
+    'get-cart': 9,
+    'my-orders': 9,
+    'my-payments': 3,
+    'get-order': 9,
+    'get-order-resources': 9,
+    'get-resource-upload-status': 9,
+    'get-order-resource-fields': 11,
+    'get-payment-history': 3,
+    # Admin
+    'user-list': 3,
+    'admin-order-list': 4,
+    'admin-order-detail': 15,
+    'admin-order-statistics': 6,
+    'admin-staff-list': 2,
+    'admin-staff-workload': 2,
+    'notification-list': 3,
+    'product-list': 2,
+    'product-detail': 5,
+    'product-resource-fields': 5,
+    'product-audit-logs': 2,
+    'product-images-detail': 1,
+    'checklist-template-list': 6,
+    'checklist-template-detail': 1,
+    'analytics-overview': 5,
+    'analytics-revenue-trend': 1,
+    'analytics-top-products': 4,
+    'analytics-staff-performance': 3,
+    'analytics-order-distribution': 1,
+    # Staff
+    'staff-order-list': 4,
+    'staff-order-detail': 15,
+}
+# 'log' warns when a budget is exceeded, 'raise' fails the request
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'log')
+
+# Slow query capture (see election_cart/slow_queries.py). Queries slower
+# than the threshold are logged and stored by a Celery task in
+# admin_panel.SlowQuery, which keeps the newest SLOW_QUERY_LOG_SIZE rows;
+# the task also runs EXPLAIN (ANALYZE, BUFFERS) for this share of the slow
+# SELECTs. None (an empty SLOW_QUERY_THRESHOLD_MS variable) disables the
+# capture
+SLOW_QUERY_THRESHOLD_MS = os.getenv('SLOW_QUERY_THRESHOLD_MS', '200')
+SLOW_QUERY_THRESHOLD_MS = float(SLOW_QUERY_THRESHOLD_MS) if SLOW_QUERY_THRESHOLD_MS else None
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', '0.1'))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '1000'))
+
+# Admission control (see election_cart/admission.py). Per workload class:
+# the URL names in it, how many of its requests may run at once across all
+# workers (counted in ADMISSION_CACHE, so only across workers when that is
+# Redis) and the PostgreSQL statement_timeout of its queries. Views in no
+# class, including checkout and payment, are never limited
+ADMISSION_CACHE = 'coordination'
+WORKLOAD_CLASSES = {
+    'reporting': {
+        'views': [
+            'analytics-overview', 'analytics-revenue-trend', 'analytics-top-products',
+            'analytics-staff-performance', 'analytics-order-distribution', 'analytics-export',
+            'admin-order-statistics', 'admin-staff-workload',
+        ],
+        'max_concurrent': int(os.getenv('REPORTING_MAX_CONCURRENT', '4')),
+        'statement_timeout_ms': 30000,
+        'retry_after': 10,
+    },
+    'documents': {
+        'views': ['download-invoice'],
+        'max_concurrent': int(os.getenv('DOCUMENTS_MAX_CONCURRENT', '8')),
+        'statement_timeout_ms': 10000,
+        'retry_after': 5,
+    },
+    'admin_lists': {
+        'views': ['admin-order-list', 'admin-staff-list', 'product-list', 'staff-order-list'],
+        'max_concurrent': int(os.getenv('ADMIN_LISTS_MAX_CONCURRENT', '8')),
+        'statement_timeout_ms': 15000,
+        'retry_after': 5,
+    },
 }
 
-# To use Redis in production, install django-redis and update to:
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         },
-#         'TIMEOUT': 300,
-#     }
-# }
+# Degraded mode for peak traffic (see election_cart/degraded_mode.py),
+# switched at /api/admin/degraded-mode/ or with `manage.py degraded_mode`.
+# While it is on these URL names answer 503, analytics are served from
+# snapshots kept for DEGRADED_MODE_SNAPSHOT_TTL seconds, and notification
+# fan-out and analytics invalidation wait until it is switched off
+DEGRADED_MODE_CACHE = 'coordination'
+DEGRADED_MODE_REJECT_VIEWS = [
+    'analytics-export', 'admin-order-statistics', 'product-audit-logs', 'notification-list',
+]
+DEGRADED_MODE_RETRY_AFTER = 60
+DEGRADED_MODE_SNAPSHOT_TTL = int(os.getenv('DEGRADED_MODE_SNAPSHOT_TTL', str(24 * 60 * 60)))
+
+# Opt-in request profiling (see election_cart/profiling.py)
+# Number of profiles kept, how long they are kept and how long a profile
+# token from /api/admin/profiles/token/ stays valid (seconds)
+PROFILER_BUFFER_SIZE = int(os.getenv('PROFILER_BUFFER_SIZE', '20'))
+PROFILER_TTL = 24 * 60 * 60
+PROFILER_TOKEN_MAX_AGE = 15 * 60
+
+# Prometheus metrics (see election_cart/metrics.py). Scrapers send
+# `Authorization: Bearer <METRICS_AUTH_TOKEN>`; without a token /metrics is
+# only served when DEBUG is on. With several gunicorn workers or Celery
+# processes, also set the PROMETHEUS_MULTIPROC_DIR environment variable
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN', '')
 
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
@@ -224,3 +425,25 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+# Celery closes Django's database connections before and after every task
+# unless this is set; election_cart/celery.py closes them only when they are
+# broken or older than CONN_MAX_AGE (or returns them to the pool)
+CELERY_DB_REUSE_MAX = 1000
+
+# Progress notifications for the same order within this window are merged
+NOTIFICATION_COALESCE_WINDOW = int(os.getenv('NOTIFICATION_COALESCE_WINDOW', '60'))  # seconds
+# Holds the pending-notification markers, so every worker coalesces together
+NOTIFICATION_COALESCE_CACHE = 'coordination'
+
+# Automatic assignment of ready orders to the least loaded staff member
+AUTO_ASSIGN_ORDERS = os.getenv('AUTO_ASSIGN_ORDERS', 'False') == 'True'
+AUTO_ASSIGN_INTERVAL = int(os.getenv('AUTO_ASSIGN_INTERVAL', '300'))  # seconds
+AUTO_ASSIGN_BATCH_SIZE = int(os.getenv('AUTO_ASSIGN_BATCH_SIZE', '50'))
+AUTO_ASSIGN_DEFAULT_TASK_MINUTES = 30  # Effort of checklist items without an estimate
+
+CELERY_BEAT_SCHEDULE = {}
+if AUTO_ASSIGN_ORDERS:
+    CELERY_BEAT_SCHEDULE['auto-assign-orders'] = {
+        'task': 'admin_panel.tasks.auto_assign_orders',
+        'schedule': AUTO_ASSIGN_INTERVAL,
+    }
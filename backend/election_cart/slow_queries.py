@@ -0,0 +1,185 @@
+"""
+Slow query capture.
+
+The request instrumentation's query counter hands every query slower than
+SLOW_QUERY_THRESHOLD_MS to capture_slow_query, which notes the SQL and the
+project frames that issued it (e.g. AnalyticsService.get_top_products).
+Once the response is ready, record_slow_queries logs them and queues the
+admin_panel store_slow_queries task, which runs EXPLAIN for a sample of
+the SELECTs (EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL) and stores them in
+the bounded admin_panel.SlowQuery table, off the request path.
+"""
+import logging
+import os
+import random
+import re
+import sys
+from functools import partial
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 8
+_ROW_LOCK = re.compile(r'\bFOR (?:NO KEY |KEY )?(?:UPDATE|SHARE)\b', re.IGNORECASE)
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+_SKIPPED_FILES = {__file__, os.path.join(os.path.dirname(__file__), 'instrumentation.py')}
+
+
+def slow_query_threshold():
+    """Threshold in seconds, or None when slow query capture is off"""
+    threshold_ms = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    return None if threshold_ms is None else threshold_ms / 1000
+
+
+def _is_project_file(filename):
+    return (
+        filename.startswith(_PROJECT_ROOT)
+        and filename not in _SKIPPED_FILES
+        and 'site-packages' not in filename
+    )
+
+
+def project_stack():
+    """Frames of project code on the current stack, innermost first"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < STACK_DEPTH:
+        code = frame.f_code
+        if _is_project_file(code.co_filename):
+            frames.append({
+                'file_path': os.path.relpath(code.co_filename, _PROJECT_ROOT),
+                'line_number': frame.f_lineno,
+                'function': getattr(code, 'co_qualname', code.co_name),
+            })
+        frame = frame.f_back
+    return frames
+
+
+def capture_slow_query(sql, params, many, duration, alias):
+    """Snapshot a slow query while its caller is still on the stack"""
+    return {
+        'sql': sql,
+        # executemany parameter lists are not replayed by EXPLAIN
+        'params': None if many else params,
+        'duration_ms': round(duration * 1000, 2),
+        'database': alias,
+        'stack': project_stack(),
+    }
+
+
+def explain(query):
+    """Execution plan of a captured SELECT, or '' if it cannot be explained"""
+    connection = connections[query['database']]
+    sql = query['sql'].lstrip()
+    if sql[:6].upper() != 'SELECT':
+        # EXPLAIN ANALYZE would execute writes a second time
+        return ''
+    if _ROW_LOCK.search(sql):
+        # EXPLAIN ANALYZE would take the row locks again
+        return ''
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        return ''
+    try:
+        # A savepoint keeps a failing EXPLAIN from breaking an open transaction
+        with transaction.atomic(using=query['database']):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, query['params'])
+                rows = cursor.fetchall()
+    except DatabaseError as exc:
+        return f'EXPLAIN failed: {exc}'
+    # PostgreSQL returns one plan line per row, SQLite (id, parent, notused, detail)
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def _serializable_params(params):
+    """
+    Parameters the task can receive as JSON; other types (dates, decimals,
+    UUIDs) are sent as their text, which the database casts back
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _serializable_params([value])[0] for key, value in params.items()}
+    return [
+        value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+        for value in params
+    ]
+
+
+def record_slow_queries(view_name, queries):
+    """
+    Log slow queries and queue them, with a sample to explain, for storage
+    once the request's transaction (if any) commits
+    """
+    sample_rate = getattr(settings, 'SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0)
+    rows = []
+    for query in queries:
+        innermost = query['stack'][0] if query['stack'] else {
+            'file_path': '', 'line_number': 0, 'function': 'unknown'
+        }
+        logger.warning(
+            f"Slow query ({query['duration_ms']}ms) in {view_name} at "
+            f"{innermost['file_path']}:{innermost['line_number']} {innermost['function']}: {query['sql'][:200]}"
+        )
+        sampled = random.random() < sample_rate
+        rows.append({
+            'view_name': view_name[:200],
+            'location': innermost['function'][:300],
+            'file_path': innermost['file_path'][:300],
+            'line_number': innermost['line_number'],
+            'stack': '\n'.join(
+                f"{frame['file_path']}:{frame['line_number']} {frame['function']}" for frame in query['stack']
+            ),
+            'sql': query['sql'],
+            'duration_ms': query['duration_ms'],
+            'database': query['database'],
+            'explain': sampled,
+            'params': _serializable_params(query['params']) if sampled else None,
+        })
+
+    transaction.on_commit(partial(queue_slow_queries, view_name, rows))
+
+
+def queue_slow_queries(view_name, rows):
+    """Send captured slow queries to the store_slow_queries task"""
+    from admin_panel.tasks import store_slow_queries
+
+    try:
+        # Without publish retries an unavailable broker does not hold up the response
+        store_slow_queries.apply_async(args=[view_name, rows], retry=False)
+    except Exception as exc:
+        # Dropped rather than explained and stored in the request
+        logger.error(f"Could not queue {len(rows)} slow queries of {view_name}: {str(exc)}")
+
+
+def store_slow_queries(view_name, rows):
+    """Explain the sampled queries and store them in the bounded table"""
+    from admin_panel.models import SlowQuery
+
+    slow_queries = []
+    for row in rows:
+        row = dict(row)
+        params = row.pop('params')
+        sampled = row.pop('explain')
+        slow_queries.append(SlowQuery(
+            **row,
+            explain=explain({'sql': row['sql'], 'params': params, 'database': row['database']}) if sampled else ''
+        ))
+
+    try:
+        SlowQuery.objects.bulk_create(slow_queries)
+        # Keep only the newest SLOW_QUERY_LOG_SIZE rows
+        cutoff = SlowQuery.objects.order_by('-id').values_list('id', flat=True)[
+            settings.SLOW_QUERY_LOG_SIZE:settings.SLOW_QUERY_LOG_SIZE + 1
+        ]
+        if cutoff:
+            SlowQuery.objects.filter(id__lte=cutoff[0]).delete()
+    except DatabaseError as exc:
+        logger.error(f"Could not store slow queries for {view_name}: {str(exc)}")
+        return 0
+    return len(slow_queries)
@@ -0,0 +1,82 @@
+"""
+Tests for admission control of expensive endpoints
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from election_cart.admission import Bulkhead
+
+
+class AdmissionControlTest(TestCase):
+    """Test bulkheads per workload class"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        caches[settings.ADMISSION_CACHE].clear()
+        cache.clear()
+
+    def bulkhead(self, name):
+        return Bulkhead(name, settings.WORKLOAD_CLASSES[name]['max_concurrent'])
+
+    def saturate(self, name):
+        for _ in range(settings.WORKLOAD_CLASSES[name]['max_concurrent']):
+            self.assertTrue(self.bulkhead(name).acquire())
+
+    def test_slot_is_released_after_the_request(self):
+        """Test that a request takes a slot of its class and gives it back"""
+        response = self.client.get('/api/admin/analytics/overview/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.bulkhead('reporting').in_use(), 0)
+
+    def test_saturated_class_is_rejected(self):
+        """Test that a saturated class answers 503 with Retry-After"""
+        self.saturate('reporting')
+
+        response = self.client.get('/api/admin/analytics/top-products/')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '10')
+        # The rejected request did not take a slot
+        self.assertEqual(
+            self.bulkhead('reporting').in_use(), settings.WORKLOAD_CLASSES['reporting']['max_concurrent']
+        )
+
+    def test_other_classes_keep_their_capacity(self):
+        """Test that saturated reporting does not affect admin lists or customer endpoints"""
+        self.saturate('reporting')
+
+        self.assertEqual(self.client.get('/api/admin/orders/').status_code, 200)
+        self.assertEqual(self.client.get('/api/orders/my-orders/').status_code, 200)
+
+    def test_bulkhead_limit(self):
+        """Test that a bulkhead admits up to its limit and frees slots on release"""
+        first, second, third = (Bulkhead('test', 2) for _ in range(3))
+
+        self.assertTrue(first.acquire())
+        self.assertTrue(second.acquire())
+        self.assertFalse(third.acquire())
+        first.release()
+        self.assertTrue(third.acquire())
+
+    def test_expired_lease_is_not_released_twice(self):
+        """Test that a request whose lease expired does not free a slot another request took"""
+        holder = Bulkhead('test', 1)
+        self.assertTrue(holder.acquire())
+        # The lease expires and another request takes the slot
+        caches[settings.ADMISSION_CACHE].delete(holder.held)
+        self.assertTrue(Bulkhead('test', 1).acquire())
+
+        holder.release()
+
+        self.assertFalse(Bulkhead('test', 1).acquire())
@@ -0,0 +1,32 @@
+"""
+Tests for versioned cache key namespaces
+"""
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from election_cart.cache_keys import invalidate_namespace, versioned_key
+
+
+class VersionedKeyTest(SimpleTestCase):
+    """Test that invalidated and evicted namespace versions never serve older entries"""
+
+    def setUp(self):
+        """Start every test with an empty cache"""
+        cache.clear()
+
+    def test_invalidation_changes_keys(self):
+        """Test that invalidating a namespace makes its entries unreachable"""
+        cache.set(versioned_key('catalog', 'packages'), ['package'])
+
+        invalidate_namespace('catalog')
+
+        self.assertIsNone(cache.get(versioned_key('catalog', 'packages')))
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        """Test that losing the version entry never returns to a version older entries used"""
+        cache.set(versioned_key('catalog', 'packages'), ['old'])
+        invalidate_namespace('catalog')
+        cache.set(versioned_key('catalog', 'packages'), ['new'])
+
+        cache.delete('catalog:version')
+
+        self.assertIsNone(cache.get(versioned_key('catalog', 'packages')))
@@ -0,0 +1,110 @@
+"""
+Tests for the process-local database connection pool
+"""
+import threading
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+from election_cart.db_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stand-in for a DB-API connection that records rollbacks"""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.broken = False
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError('connection lost')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """Test connection reuse, the size cap and discarding of bad connections"""
+
+    def setUp(self):
+        """Set up a pool of two connections"""
+        self.opened = []
+        self.pool = ConnectionPool('test-pool', max_size=2, timeout=0.05)
+
+    def connect(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def test_released_connections_are_reused(self):
+        """Test that a returned connection is handed out again after a rollback"""
+        connection = self.pool.acquire(self.connect)
+        self.pool.release(connection)
+
+        self.assertIs(self.pool.acquire(self.connect), connection)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(connection.rollbacks, 1)
+
+    def test_waits_for_a_free_connection(self):
+        """Test that a full pool makes callers wait and times out"""
+        before = REGISTRY.get_sample_value('election_cart_db_pool_timeouts_total', {'database': 'test-pool'}) or 0
+        first = self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire(self.connect)
+        self.assertEqual(
+            REGISTRY.get_sample_value('election_cart_db_pool_timeouts_total', {'database': 'test-pool'}) - before, 1
+        )
+
+        self.pool.timeout = 5
+        threading.Timer(0.05, self.pool.release, [first]).start()
+        self.assertIs(self.pool.acquire(self.connect), first)
+        self.assertEqual(len(self.opened), 2)
+
+    def test_broken_connections_are_discarded(self):
+        """Test that connections failing rollback or the usability check are replaced"""
+        broken = self.pool.acquire(self.connect)
+        broken.broken = True
+        self.pool.release(broken)
+        self.assertEqual(self.pool.idle_count, 0)
+        self.assertEqual(broken.closed, 1)
+
+        stale = self.pool.acquire(self.connect)
+        self.pool.release(stale)
+        connection = self.pool.acquire(self.connect, is_usable=lambda connection: False)
+
+        self.assertIsNot(connection, stale)
+        self.assertEqual(stale.closed, 1)
+
+    def test_idle_connections_expire(self):
+        """Test that connections idle for longer than max_idle are not reused"""
+        self.pool.max_idle = 0
+        connection = self.pool.acquire(self.connect)
+        self.pool.release(connection)
+
+        self.assertIsNot(self.pool.acquire(self.connect), connection)
+        self.assertEqual(connection.closed, 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        """Test that an error while connecting does not use up the pool"""
+        def fail():
+            raise RuntimeError('server down')
+
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.pool.acquire(fail)
+
+        self.assertIsNotNone(self.pool.acquire(self.connect))
+
+    def test_backend_loads(self):
+        """Test that the pooled PostgreSQL backend can be configured as ENGINE"""
+        backend = load_backend('election_cart.db_pool')
+        wrapper = backend.DatabaseWrapper(
+            {**connections['default'].settings_dict, 'ENGINE': 'election_cart.db_pool', 'NAME': 'election_cart'}
+        )
+
+        self.assertEqual(wrapper.vendor, 'postgresql')
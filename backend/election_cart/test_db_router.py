@@ -0,0 +1,89 @@
+"""
+Tests for read-replica routing.
+
+The settings always define a 'replica' alias, which tests use as a mirror
+of the primary; the routing tests enable routing to it with
+override_settings(REPLICA_DATABASE='replica').
+"""
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from election_cart.db_router import ReadReplicaRouter, reset_pinning, use_replica
+from orders.models import Order
+
+
+class ReplicaFallbackTest(SimpleTestCase):
+    """Test that reads stay on the primary without a usable replica"""
+
+    def setUp(self):
+        """Start as a new request that has not written"""
+        reset_pinning()
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica_configured(self):
+        """Test that use_replica() reads go to the primary when no replica is set"""
+        with use_replica():
+            self.assertEqual(Order.objects.all().db, 'default')
+
+    @override_settings(REPLICA_DATABASE='reporting')
+    def test_replica_alias_missing(self):
+        """Test that a replica alias that is not in DATABASES is ignored"""
+        with use_replica():
+            self.assertEqual(Order.objects.all().db, 'default')
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTest(TransactionTestCase):
+    """Test which reads go to the replica"""
+    databases = '__all__'
+
+    def setUp(self):
+        """Start as a new request that has not written"""
+        reset_pinning()
+
+    def test_only_designated_reads_use_replica(self):
+        """Test that reads go to the replica only inside use_replica()"""
+        self.assertEqual(Order.objects.all().db, 'default')
+        with use_replica():
+            self.assertEqual(Order.objects.all().db, 'replica')
+
+    def test_reads_after_a_write_use_primary(self):
+        """Test that once the request has written, its reads go to the primary"""
+        with use_replica():
+            ReadReplicaRouter().db_for_write(Order)
+            self.assertEqual(Order.objects.all().db, 'default')
+
+        reset_pinning()
+        with use_replica():
+            self.assertEqual(Order.objects.all().db, 'replica')
+
+    def test_reads_in_transaction_use_primary(self):
+        """Test that reads inside a transaction on the primary stay there"""
+        with use_replica(), transaction.atomic():
+            self.assertEqual(Order.objects.all().db, 'default')
+
+    def test_analytics_reads_from_replica(self):
+        """Test that an analytics endpoint runs its queries on the replica"""
+        admin = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        Order.objects.create(
+            user=admin, total_amount=100.00, status='completed', payment_completed_at=timezone.now()
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        cache.clear()
+
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = client.get('/api/admin/analytics/overview/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(replica_queries), 0)
+        self.assertEqual(response.data['data']['revenue']['order_count'], 1)
@@ -0,0 +1,115 @@
+"""
+Tests for degraded mode
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from admin_panel.cache_utils import invalidate_analytics_cache
+from admin_panel.models import Notification
+from admin_panel.services import NotificationService
+from admin_panel.tasks import send_deferred_admin_notifications
+from election_cart.cache_keys import versioned_key
+from election_cart.degraded_mode import is_degraded, set_degraded, status
+from orders.models import Order
+
+
+class DegradedModeTest(TestCase):
+    """Test load shedding and deferred work in degraded mode"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        caches[settings.DEGRADED_MODE_CACHE].clear()
+        cache.clear()
+
+    def test_switch_endpoint(self):
+        """Test that admins switch degraded mode through the API"""
+        response = self.client.post('/api/admin/degraded-mode/', {'enabled': True}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['enabled'])
+        self.assertTrue(is_degraded())
+
+        response = self.client.post('/api/admin/degraded-mode/', {'enabled': 'yes'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.client.post('/api/admin/degraded-mode/', {'enabled': False}, format='json')
+        self.assertFalse(self.client.get('/api/admin/degraded-mode/').data['enabled'])
+
+    def test_non_essential_views_are_rejected(self):
+        """Test that listed views answer 503 only while degraded"""
+        self.assertEqual(self.client.get('/api/admin/notifications/').status_code, 200)
+
+        set_degraded(True)
+
+        response = self.client.get('/api/admin/notifications/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(self.client.get('/api/admin/orders/').status_code, 200)
+
+    def test_analytics_served_from_snapshot(self):
+        """Test that analytics the cache cannot answer come from the last snapshot"""
+        set_degraded(True)
+        # No snapshot yet
+        self.assertEqual(self.client.get('/api/admin/analytics/overview/').status_code, 503)
+
+        set_degraded(False)
+        computed = self.client.get('/api/admin/analytics/overview/')
+        # Orders change before the peak; the snapshot outlives the invalidation
+        invalidate_analytics_cache()
+        set_degraded(True)
+
+        response = self.client.get('/api/admin/analytics/overview/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Degraded-Mode'], 'snapshot')
+        self.assertEqual(response.data, computed.data)
+
+    def test_analytics_invalidation_is_deferred(self):
+        """Test that invalidation waits until degraded mode is switched off"""
+        cache.set(versioned_key('analytics', 'test'), 'cached')
+        set_degraded(True)
+
+        invalidate_analytics_cache()
+
+        self.assertEqual(cache.get(versioned_key('analytics', 'test')), 'cached')
+        self.assertTrue(status()['analytics_invalidation_pending'])
+
+        set_degraded(False)
+        self.assertIsNone(cache.get(versioned_key('analytics', 'test')))
+
+    def test_notifications_are_deferred(self):
+        """Test that admin notifications are deferred once per order and type"""
+        order = Order.objects.create(user=self.admin_user, total_amount=100.00, status='ready_for_processing')
+        set_degraded(True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationService.queue_admin_notification(order, 'new_order')
+            NotificationService.queue_admin_notification(order, 'new_order')
+            NotificationService.queue_admin_notification(order, 'order_completed')
+
+        self.assertEqual(status()['deferred_notifications'], 2)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_deferred_notifications_are_sent_by_task(self):
+        """Test that the task sends and removes the deferred notifications"""
+        order = Order.objects.create(user=self.admin_user, total_amount=100.00, status='ready_for_processing')
+        set_degraded(True)
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationService.queue_admin_notification(order, 'new_order')
+        caches[settings.DEGRADED_MODE_CACHE].delete('degraded-mode:enabled')
+
+        result = send_deferred_admin_notifications.apply().get()
+
+        self.assertEqual(result['sent'], 1)
+        self.assertEqual(status()['deferred_notifications'], 0)
+        self.assertEqual(Notification.objects.filter(order=order, notification_type='new_order').count(), 1)
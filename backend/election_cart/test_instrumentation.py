@@ -0,0 +1,87 @@
+"""
+Tests for the per-request instrumentation middleware
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from orders.models import Order
+from election_cart.instrumentation import QueryBudgetExceeded, view_metrics
+
+
+class RequestInstrumentationTest(TestCase):
+    """Test query, cache and timing metrics recorded per request"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='9000000001',
+            password='testpass123',
+            role='user'
+        )
+        Order.objects.create(user=self.customer, total_amount=100.00)
+        self.client.force_authenticate(user=self.admin_user)
+        cache.clear()
+        view_metrics.reset()
+
+    @override_settings(INSTRUMENTATION_HEADERS=True)
+    def test_response_headers(self):
+        """Test that query count, DB time, cache and total time are reported"""
+        response = self.client.get('/api/admin/orders/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertGreaterEqual(float(response['X-DB-Time-ms']), 0)
+        self.assertGreaterEqual(float(response['X-Response-Time-ms']), float(response['X-DB-Time-ms']))
+
+    @override_settings(INSTRUMENTATION_HEADERS=True)
+    def test_cache_hits_and_misses(self):
+        """Test that cached views report a miss, then a hit"""
+        first = self.client.get('/api/admin/staff/workload/')
+        second = self.client.get('/api/admin/staff/workload/')
+
+        self.assertEqual(first['X-Cache-Misses'], '1')
+        self.assertEqual(second['X-Cache-Hits'], '1')
+        self.assertLess(int(second['X-DB-Queries']), int(first['X-DB-Queries']))
+
+    @override_settings(INSTRUMENTATION_HEADERS=False)
+    def test_headers_disabled(self):
+        """Test that headers are omitted when disabled"""
+        response = self.client.get('/api/admin/orders/')
+
+        self.assertNotIn('X-DB-Queries', response)
+
+    def test_metrics_aggregated_per_view(self):
+        """Test that metrics are aggregated by URL name"""
+        self.client.get('/api/admin/orders/')
+        self.client.get('/api/admin/orders/')
+
+        response = self.client.get('/api/admin/metrics/requests/')
+
+        stats = response.data['admin-order-list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['avg_queries'], 0)
+        self.assertEqual(stats['over_budget'], 0)
+
+    @override_settings(QUERY_BUDGETS={'admin-order-list': 1}, QUERY_BUDGET_MODE='log')
+    def test_budget_exceeded_logs(self):
+        """Test that an exceeded budget is logged and counted"""
+        with self.assertLogs('election_cart.instrumentation', level='WARNING'):
+            response = self.client.get('/api/admin/orders/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(view_metrics.snapshot()['admin-order-list']['over_budget'], 1)
+
+    @override_settings(QUERY_BUDGETS={'admin-order-list': 1}, QUERY_BUDGET_MODE='raise')
+    def test_budget_exceeded_raises(self):
+        """Test that an exceeded budget fails the request in raise mode"""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/admin/orders/')
@@ -0,0 +1,152 @@
+"""
+Tests for the Prometheus metrics endpoint and the recorded metrics
+"""
+from io import BytesIO
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from products.models import Package, ProductImage
+from products.tasks import generate_thumbnail_async
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_AUTH_TOKEN='scrape-token')
+class MetricsTest(TestCase):
+    """Test the /metrics endpoint and the metrics of each subsystem"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        cache.clear()
+
+    def scrape(self):
+        return self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+
+    def test_endpoint_requires_token(self):
+        """Test that scrapes without the bearer token are rejected"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(
+            self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403
+        )
+
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+    @override_settings(METRICS_AUTH_TOKEN='', DEBUG=False)
+    def test_endpoint_closed_without_token_in_production(self):
+        """Test that an unset token does not leave the endpoint open"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_request_latency_and_status(self):
+        """Test that requests are counted by URL name and status with a latency histogram"""
+        labels = {'view': 'admin-order-list', 'method': 'GET'}
+        before_ok = sample('election_cart_requests_total', status='200', **labels)
+        before_denied = sample('election_cart_requests_total', status='401', **labels)
+        before_count = sample('election_cart_request_duration_seconds_count', **labels)
+
+        self.client.get('/api/admin/orders/')
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.get('/api/admin/orders/')
+
+        self.assertEqual(sample('election_cart_requests_total', status='200', **labels) - before_ok, 1)
+        self.assertEqual(sample('election_cart_requests_total', status='401', **labels) - before_denied, 1)
+        self.assertEqual(sample('election_cart_request_duration_seconds_count', **labels) - before_count, 2)
+        body = self.scrape().content.decode()
+        self.assertIn(
+            'election_cart_request_duration_seconds_bucket{le="0.005",method="GET",view="admin-order-list"}', body
+        )
+
+    def test_analytics_cache_hits_and_misses(self):
+        """Test that cache_analytics counts a miss and then a hit"""
+        self.client.force_authenticate(user=self.admin_user)
+        before_miss = sample('election_cart_analytics_cache_requests_total', view='analytics_overview', result='miss')
+        before_hit = sample('election_cart_analytics_cache_requests_total', view='analytics_overview', result='hit')
+
+        self.client.get('/api/admin/analytics/overview/')
+        self.client.get('/api/admin/analytics/overview/')
+
+        self.assertEqual(
+            sample('election_cart_analytics_cache_requests_total', view='analytics_overview', result='miss') - before_miss, 1
+        )
+        self.assertEqual(
+            sample('election_cart_analytics_cache_requests_total', view='analytics_overview', result='hit') - before_hit, 1
+        )
+
+    def test_upload_size_and_validation_time(self):
+        """Test that an upload endpoint records the file sizes and their validation time"""
+        before_bytes = sample('election_cart_upload_size_bytes_sum', content_type='image/jpeg')
+        before_count = sample('election_cart_upload_size_bytes_count', content_type='image/jpeg')
+        before_valid = sample('election_cart_upload_validation_duration_seconds_count', outcome='success')
+        before_rejected = sample('election_cart_upload_validation_duration_seconds_count', outcome='error')
+        package = Package.objects.create(
+            name='Package', price=100, description='Package', created_by=self.admin_user
+        )
+        url = f'/api/admin/products/package/{package.id}/images/'
+        buffer = BytesIO()
+        Image.new('RGB', (64, 48), color='red').save(buffer, format='JPEG')
+        photo = buffer.getvalue()
+        # The product image endpoints are guarded by IsAdminUser
+        self.admin_user.is_staff = True
+        self.admin_user.save()
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            url, {'image': SimpleUploadedFile('photo.jpg', photo, 'image/jpeg')}, format='multipart'
+        )
+        rejected = self.client.post(
+            url, {'image': SimpleUploadedFile('fake.jpg', b'not an image', 'image/jpeg')}, format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(rejected.status_code, 400)
+        # Both uploads are counted, the generated thumbnail is not
+        self.assertEqual(sample('election_cart_upload_size_bytes_count', content_type='image/jpeg') - before_count, 2)
+        self.assertEqual(
+            sample('election_cart_upload_size_bytes_sum', content_type='image/jpeg') - before_bytes,
+            len(photo) + len(b'not an image')
+        )
+        self.assertEqual(
+            sample('election_cart_upload_validation_duration_seconds_count', outcome='success') - before_valid, 1
+        )
+        self.assertEqual(
+            sample('election_cart_upload_validation_duration_seconds_count', outcome='error') - before_rejected, 1
+        )
+
+    def test_celery_task_duration_and_retries(self):
+        """Test that task runs are timed by state and retries are counted"""
+        name = generate_thumbnail_async.name
+        before_success = sample('election_cart_celery_task_duration_seconds_count', task=name, state='SUCCESS')
+        before_retries = sample('election_cart_celery_task_retries_total', task=name)
+        package = Package.objects.create(
+            name='Package', price=100, description='Package', created_by=self.admin_user
+        )
+        # The image file does not exist in storage, so thumbnail generation fails and retries
+        image, = ProductImage.objects.bulk_create([ProductImage(
+            content_type=ContentType.objects.get_for_model(Package),
+            object_id=package.id,
+            image='product_images/missing.jpg'
+        )])
+
+        generate_thumbnail_async.apply(args=[image.id + 1000])
+        generate_thumbnail_async.apply(args=[image.id])
+
+        self.assertEqual(
+            sample('election_cart_celery_task_duration_seconds_count', task=name, state='SUCCESS') - before_success, 1
+        )
+        self.assertGreater(sample('election_cart_celery_task_retries_total', task=name) - before_retries, 0)
@@ -0,0 +1,166 @@
+"""
+Tests for opt-in request profiling
+"""
+import marshal
+import pstats
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from orders.models import Order
+
+
+class RequestProfilerTest(TestCase):
+    """Test profile capture, storage and the admin profile endpoints"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.other_admin = CustomUser.objects.create_user(
+            username='admin2',
+            phone_number='9000000002',
+            password='testpass123',
+            role='admin'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='9000000001',
+            password='testpass123',
+            role='user'
+        )
+        Order.objects.create(user=self.customer, total_amount=100.00)
+        cache.clear()
+
+    def get_token(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.post('/api/admin/profiles/token/')
+        self.assertEqual(response.status_code, 201)
+        return response.data['token']
+
+    def test_requests_without_token_are_not_profiled(self):
+        """Test that ordinary requests store nothing"""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get('/api/admin/orders/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.client.get('/api/admin/profiles/').data, [])
+
+    def test_profile_with_header(self):
+        """Test that a request with a valid token is profiled with its view name and queries"""
+        token = self.get_token(self.admin_user)
+
+        response = self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token)
+
+        self.assertEqual(response.status_code, 200)
+        profile_id = int(response['X-Profile-Id'])
+        profiles = self.client.get('/api/admin/profiles/').data
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]['id'], profile_id)
+        self.assertEqual(profiles[0]['view_name'], 'admin-order-list')
+        self.assertEqual(profiles[0]['status_code'], 200)
+        self.assertNotIn('stats', profiles[0])
+
+        detail = self.client.get(f'/api/admin/profiles/{profile_id}/').data
+        self.assertIn('cumulative', detail['stats'])
+        self.assertIn('views.py', detail['stats'])
+        self.assertEqual(len(detail['queries']), detail['query_count'])
+        self.assertTrue(any('orders_order' in query['sql'] for query in detail['queries']))
+        self.assertNotIn('raw', detail)
+
+    def test_profile_with_query_parameter(self):
+        """Test that the token can also be passed as the _profile query parameter"""
+        token = self.get_token(self.admin_user)
+
+        response = self.client.get('/api/admin/orders/', {'_profile': token})
+
+        self.assertIn('X-Profile-Id', response)
+
+    def test_download_is_loadable_by_pstats(self):
+        """Test that the downloaded profile is in cProfile's dump format"""
+        token = self.get_token(self.admin_user)
+        profile_id = self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token)['X-Profile-Id']
+
+        response = self.client.get(f'/api/admin/profiles/{profile_id}/download/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        with tempfile.NamedTemporaryFile(suffix='.prof') as handle:
+            handle.write(response.content)
+            handle.flush()
+            self.assertGreater(pstats.Stats(handle.name).total_calls, 0)
+        self.assertIsInstance(marshal.loads(response.content), dict)
+
+    def test_token_only_profiles_its_own_admin(self):
+        """Test that a token used by anyone but the admin it was issued to stores nothing"""
+        token = self.get_token(self.admin_user)
+
+        for user in (self.other_admin, self.customer):
+            self.client.force_authenticate(user=user)
+            response = self.client.get('/api/orders/my-orders/', HTTP_X_PROFILE=token)
+            self.assertNotIn('X-Profile-Id', response)
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.get('/api/admin/profiles/').data, [])
+
+    def test_invalid_token_is_ignored(self):
+        """Test that a tampered token neither profiles nor fails the request"""
+        token = self.get_token(self.admin_user)
+
+        response = self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token + 'x')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    @override_settings(PROFILER_BUFFER_SIZE=2)
+    def test_ring_buffer_keeps_latest_profiles(self):
+        """Test that only the newest PROFILER_BUFFER_SIZE profiles are kept"""
+        token = self.get_token(self.admin_user)
+        ids = [
+            int(self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token)['X-Profile-Id'])
+            for _ in range(3)
+        ]
+
+        profiles = self.client.get('/api/admin/profiles/').data
+
+        self.assertEqual([profile['id'] for profile in profiles], ids[:0:-1])
+        self.assertEqual(self.client.get(f'/api/admin/profiles/{ids[0]}/').status_code, 404)
+
+    def test_profiles_outlive_the_cache(self):
+        """Test that profiles are kept in the database, not in the cache"""
+        token = self.get_token(self.admin_user)
+        profile_id = int(self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token)['X-Profile-Id'])
+
+        cache.clear()
+
+        self.assertEqual(self.client.get(f'/api/admin/profiles/{profile_id}/').status_code, 200)
+
+    @override_settings(PROFILER_TTL=0)
+    def test_expired_profiles_are_hidden(self):
+        """Test that profiles older than PROFILER_TTL are not served"""
+        token = self.get_token(self.admin_user)
+        profile_id = self.client.get('/api/admin/orders/', HTTP_X_PROFILE=token)['X-Profile-Id']
+
+        self.assertEqual(self.client.get('/api/admin/profiles/').data, [])
+        self.assertEqual(self.client.get(f'/api/admin/profiles/{profile_id}/').status_code, 404)
+
+    def test_profile_endpoints_require_admin(self):
+        """Test that staff cannot get tokens or read profiles"""
+        staff = CustomUser.objects.create_user(
+            username='staff',
+            phone_number='9000000003',
+            password='testpass123',
+            role='staff'
+        )
+        self.client.force_authenticate(user=staff)
+
+        self.assertEqual(self.client.post('/api/admin/profiles/token/').status_code, 403)
+        self.assertEqual(self.client.get('/api/admin/profiles/').status_code, 403)
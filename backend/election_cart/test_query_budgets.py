@@ -0,0 +1,288 @@
+"""
+Query budget regression tests for list and detail endpoints.
+
+Every endpoint is requested against a small data set and again after the
+data set has grown (more orders, more items per order, more products). The
+number of queries must not change between the two and must stay within the
+endpoint's budget in settings.QUERY_BUDGETS, so a newly introduced N+1
+fails here instead of showing up as production latency.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from cart.models import Cart, CartItem
+from products.models import (
+    Package, PackageItem, Campaign, ProductImage, ResourceFieldDefinition, ChecklistTemplateItem,
+    ProductAuditLog
+)
+from orders.models import (
+    Order, OrderItem, OrderResource, DynamicResourceSubmission, PaymentHistory, ChecklistItem
+)
+from admin_panel.models import Notification
+from admin_panel.checklist_service import ChecklistService
+
+
+# (URL name, user, URL kwargs). Kwargs name an attribute of the test case
+# resolved at request time, so detail endpoints always target the newest
+# (largest) order or product.
+ENDPOINTS = [
+    # Public catalogue
+    ('package-list', None, {}),
+    ('package-detail', None, {'pk': 'latest_package'}),
+    ('campaign-list', None, {}),
+    ('campaign-detail', None, {'pk': 'latest_campaign'}),
+    ('product-images-list', None, {'product_type': 'package', 'product_id': 'latest_package'}),
+
+    # Customer
+    ('user-profile', 'customer', {}),
+    ('get-cart', 'customer', {}),
+    ('my-orders', 'customer', {}),
+    ('my-payments', 'customer', {}),
+    ('get-order', 'customer', {'order_id': 'latest_order'}),
+    ('get-order-resources', 'customer', {'order_id': 'latest_order'}),
+    ('get-resource-upload-status', 'customer', {'order_id': 'latest_order'}),
+    ('get-order-resource-fields', 'customer', {'order_id': 'latest_order'}),
+    ('get-payment-history', 'customer', {'order_id': 'latest_order'}),
+
+    # Admin
+    ('user-list', 'admin', {}),
+    ('admin-order-list', 'admin', {}),
+    ('admin-order-detail', 'admin', {'pk': 'latest_order'}),
+    ('admin-order-statistics', 'admin', {}),
+    ('admin-staff-list', 'admin', {}),
+    ('admin-staff-workload', 'admin', {}),
+    ('notification-list', 'admin', {}),
+    ('product-list', 'admin', {}),
+    ('product-detail', 'admin', {'product_type': 'package', 'product_id': 'latest_package'}),
+    ('product-resource-fields', 'admin', {'product_type': 'package', 'product_id': 'latest_package'}),
+    ('product-audit-logs', 'admin', {'product_type': 'package', 'product_id': 'latest_package'}),
+    ('product-images-detail', 'admin', {'pk': 'latest_image'}),
+    ('checklist-template-list', 'admin', {'product_type': 'package', 'product_id': 'latest_package'}),
+    ('checklist-template-detail', 'admin', {'pk': 'latest_template'}),
+    ('analytics-overview', 'admin', {}),
+    ('analytics-revenue-trend', 'admin', {}),
+    ('analytics-top-products', 'admin', {}),
+    ('analytics-staff-performance', 'admin', {}),
+    ('analytics-order-distribution', 'admin', {}),
+
+    # Staff
+    ('staff-order-list', 'staff', {}),
+    ('staff-order-detail', 'staff', {'pk': 'latest_order'}),
+]
+
+
+# Storing slow queries would add to the counted queries
+@override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+class QueryBudgetTest(TestCase):
+    """Test that endpoint query counts are bounded and independent of data size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the users every endpoint is requested as"""
+        cls.admin = CustomUser.objects.create_user(
+            username='admin', phone_number='9000000000', password='testpass123', role='admin',
+            is_staff=True
+        )
+        cls.staff = CustomUser.objects.create_user(
+            username='staff', phone_number='9000000001', password='testpass123', role='staff'
+        )
+        cls.customer = CustomUser.objects.create_user(
+            username='customer', phone_number='9000000002', password='testpass123', role='user'
+        )
+        cls.package_ct = ContentType.objects.get_for_model(Package)
+        cls.campaign_ct = ContentType.objects.get_for_model(Campaign)
+
+    def setUp(self):
+        """Set up the API client"""
+        self.client = APIClient()
+        self.users = {'admin': self.admin, 'staff': self.staff, 'customer': self.customer}
+        self.sequence = 0
+
+    def seed_products(self, count):
+        """
+        Create packages and campaigns with items, images, resource fields,
+        checklist templates and count + 1 audit log entries each
+        """
+        products = []
+        for _ in range(count):
+            self.sequence += 1
+            package = Package.objects.create(
+                name=f'Package {self.sequence}', price=Decimal('1000.00'), description='Package',
+                created_by=self.admin
+            )
+            PackageItem.objects.bulk_create([
+                PackageItem(package=package, name=f'Item {index}', quantity=index + 1) for index in range(3)
+            ])
+            campaign = Campaign.objects.create(
+                name=f'Campaign {self.sequence}', price=Decimal('500.00'), unit='day', description='Campaign',
+                created_by=self.admin
+            )
+            for product, content_type in ((package, self.package_ct), (campaign, self.campaign_ct)):
+                # Images and files are referenced by name only, nothing is written to storage
+                ProductImage.objects.bulk_create([
+                    ProductImage(
+                        content_type=content_type,
+                        object_id=product.id,
+                        image=f'product_images/{content_type.model}-{product.id}-{index}.jpg',
+                        thumbnail=f'product_thumbnails/{content_type.model}-{product.id}-{index}.jpg',
+                        is_primary=index == 0,
+                        order=index
+                    )
+                    for index in range(3)
+                ])
+                ResourceFieldDefinition.objects.bulk_create([
+                    ResourceFieldDefinition(
+                        content_type=content_type, object_id=product.id,
+                        field_name='Slogan', field_type='text', order=0
+                    ),
+                    ResourceFieldDefinition(
+                        content_type=content_type, object_id=product.id,
+                        field_name='Candidate photo', field_type='image', order=1
+                    ),
+                ])
+                ChecklistTemplateItem.objects.bulk_create([
+                    ChecklistTemplateItem(
+                        content_type=content_type, object_id=product.id,
+                        name=f'Task {index}', description='Task', order=index,
+                        is_optional=index == 2, estimated_duration_minutes=30
+                    )
+                    for index in range(3)
+                ])
+                ProductAuditLog.objects.bulk_create([
+                    ProductAuditLog(
+                        content_type=content_type, object_id=product.id,
+                        action='create' if index == 0 else 'update',
+                        user=self.admin if index % 2 == 0 else self.staff,
+                        changes={'price': str(product.price)}
+                    )
+                    for index in range(count + 1)
+                ])
+                products.append((product, content_type))
+        self.latest_package = package.id
+        self.latest_campaign = campaign.id
+        self.latest_image = ProductImage.objects.filter(content_type=self.package_ct, object_id=package.id).last().id
+        self.latest_template = ChecklistTemplateItem.objects.filter(
+            content_type=self.package_ct, object_id=package.id
+        ).last().id
+        return products
+
+    def seed_orders(self, count, items_per_order):
+        """
+        Create paid, assigned orders for the customer, each with items,
+        static and dynamic resources, payment history, a partly completed
+        checklist and notifications; also fill the customer's cart.
+        """
+        products = self.seed_products(items_per_order)
+        now = timezone.now()
+        orders = []
+        for _ in range(count):
+            order = Order.objects.create(
+                user=self.customer,
+                total_amount=Decimal('1000.00'),
+                status='in_progress',
+                assigned_to=self.staff,
+                payment_completed_at=now - timedelta(days=1)
+            )
+            for product, content_type in products:
+                item = OrderItem.objects.create(
+                    order=order, content_type=content_type, object_id=product.id,
+                    quantity=1, price=product.price, resources_uploaded=True
+                )
+                OrderResource.objects.create(
+                    order_item=item,
+                    candidate_photo=f'order_resources/photo-{item.id}.jpg',
+                    party_logo=f'order_resources/logo-{item.id}.jpg',
+                    campaign_slogan='Vote',
+                    preferred_date=now.date(),
+                    whatsapp_number='9000000002'
+                )
+                for field in ResourceFieldDefinition.objects.filter(content_type=content_type, object_id=product.id):
+                    DynamicResourceSubmission.objects.create(
+                        order_item=item,
+                        field_definition=field,
+                        text_value='Vote' if field.field_type == 'text' else None,
+                        file_value=f'dynamic_resources/{item.id}-{field.id}.jpg' if field.field_type == 'image' else None
+                    )
+            PaymentHistory.objects.create(
+                order=order,
+                transaction_id=f'pay_{order.id}',
+                amount=order.total_amount,
+                status='completed',
+                payment_date=now,
+                invoice_number=f'INV-{order.id}'
+            )
+            orders.append(order)
+
+        ChecklistService.generate_checklists_for_orders(orders)
+        for item in ChecklistItem.objects.filter(checklist__order__in=orders, order_index=0):
+            ChecklistService.set_item_completed(item, True, self.staff)
+        Notification.objects.bulk_create([
+            Notification(
+                user=user, order=order, notification_type='order_assigned',
+                title='Order assigned', message=order.order_number
+            )
+            for order in orders for user in (self.admin, self.staff)
+        ])
+
+        cart, _ = Cart.objects.get_or_create(user=self.customer)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, content_type=content_type, object_id=product.id)
+            for product, content_type in products
+        ])
+        self.latest_order = order.id
+
+    def count_queries(self, url_name, role, kwargs):
+        """Return the number of queries a cold request to the endpoint runs"""
+        url = reverse(url_name, kwargs={key: getattr(self, value, value) for key, value in kwargs.items()})
+        self.client.force_authenticate(user=self.users.get(role))
+
+        # Warm up per-process caches (content types), then measure without cached responses
+        cache.clear()
+        self.client.get(url)
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f'{url_name}: {response.status_code}')
+        return len(queries), [query['sql'] for query in queries.captured_queries]
+
+    def measure_all(self):
+        """Return the query count and SQL of every endpoint"""
+        return {url_name: self.count_queries(url_name, role, kwargs) for url_name, role, kwargs in ENDPOINTS}
+
+    def test_every_endpoint_has_a_budget(self):
+        """Test that every measured endpoint has a configured budget"""
+        missing = [url_name for url_name, _, _ in ENDPOINTS if url_name not in settings.QUERY_BUDGETS]
+        self.assertEqual(missing, [])
+
+    def test_query_counts_do_not_grow_with_data(self):
+        """Test that query counts stay within budget as orders, items and products grow"""
+        self.seed_orders(count=2, items_per_order=1)
+        small = self.measure_all()
+
+        self.seed_orders(count=5, items_per_order=3)
+        large = self.measure_all()
+
+        for url_name, _, _ in ENDPOINTS:
+            with self.subTest(endpoint=url_name):
+                small_count, _ = small[url_name]
+                large_count, large_queries = large[url_name]
+                queries = '\n'.join(large_queries)
+                self.assertEqual(
+                    large_count, small_count,
+                    f'{url_name} ran {small_count} queries on the small data set and '
+                    f'{large_count} on the large one:\n{queries}'
+                )
+                self.assertLessEqual(
+                    large_count, settings.QUERY_BUDGETS.get(url_name, 0),
+                    f'{url_name} ran {large_count} queries:\n{queries}'
+                )
@@ -0,0 +1,143 @@
+"""
+Tests for slow query capture and EXPLAIN sampling
+"""
+import json
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from admin_panel.models import SlowQuery
+from authentication.models import CustomUser
+from admin_panel.tasks import store_slow_queries
+from election_cart.slow_queries import explain, queue_slow_queries
+from orders.models import Order
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0)
+class SlowQueryCaptureTest(TestCase):
+    """Test that slow queries are stored with their call site and plan"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username='admin',
+            phone_number='9000000000',
+            password='testpass123',
+            role='admin'
+        )
+        self.customer = CustomUser.objects.create_user(
+            username='customer',
+            phone_number='9000000001',
+            password='testpass123',
+            role='user'
+        )
+        Order.objects.create(user=self.customer, total_amount=100.00, status='completed')
+        self.client.force_authenticate(user=self.admin_user)
+        cache.clear()
+
+    def get(self, path, data=None):
+        """Request a path and run the store task for the slow queries it queued"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get(path, data)
+        for callback in callbacks:
+            if getattr(callback, 'func', None) is queue_slow_queries:
+                store_slow_queries.apply(args=callback.args)
+        return response
+
+    @override_settings(SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1.0)
+    def test_storage_is_queued(self):
+        """Test that the request only queues its slow queries, as JSON the task can receive"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.get('/api/admin/analytics/revenue-trend/', {'start_date': '2024-01-01'})
+
+        self.assertFalse(SlowQuery.objects.exists())
+        queued = [callback for callback in callbacks if getattr(callback, 'func', None) is queue_slow_queries]
+        self.assertEqual(len(queued), 1)
+        view_name, rows = json.loads(json.dumps(queued[0].args))
+        self.assertEqual(view_name, 'analytics-revenue-trend')
+        self.assertTrue(rows)
+
+        # Date parameters arrive as text and still replay
+        store_slow_queries.apply(args=[view_name, rows])
+        for query in SlowQuery.objects.filter(sql__startswith='SELECT'):
+            self.assertNotEqual(query.explain, '')
+            self.assertNotIn('EXPLAIN failed', query.explain)
+
+    def test_records_view_and_call_site(self):
+        """Test that a slow query is stored with the view and the service method that ran it"""
+        response = self.get('/api/admin/analytics/top-products/')
+
+        self.assertEqual(response.status_code, 200)
+        captured = SlowQuery.objects.filter(view_name='analytics-top-products')
+        self.assertTrue(captured.exists())
+        service_query = captured.filter(location='AnalyticsService.get_top_products').first()
+        self.assertIsNotNone(service_query)
+        self.assertEqual(service_query.file_path, 'admin_panel/analytics_service.py')
+        self.assertGreater(service_query.line_number, 0)
+        self.assertIn('admin_panel/views.py', service_query.stack)
+        self.assertEqual(service_query.explain, '')
+
+    @override_settings(SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1.0)
+    def test_sampled_selects_are_explained(self):
+        """Test that sampled SELECTs get their execution plan"""
+        self.get('/api/admin/orders/')
+
+        selects = SlowQuery.objects.filter(view_name='admin-order-list', sql__startswith='SELECT')
+        self.assertTrue(selects.exists())
+        for query in selects:
+            self.assertNotEqual(query.explain, '')
+            self.assertNotIn('EXPLAIN failed', query.explain)
+
+    def test_writes_are_never_explained(self):
+        """Test that EXPLAIN is not run for statements that change data"""
+        query = {
+            'sql': 'UPDATE orders_order SET status = %s',
+            'params': ('completed',),
+            'database': 'default',
+        }
+
+        self.assertEqual(explain(query), '')
+        self.assertEqual(Order.objects.filter(status='completed').count(), 1)
+
+    def test_locking_selects_are_never_explained(self):
+        """Test that EXPLAIN is not run for SELECTs that take row locks"""
+        for clause in ('FOR UPDATE', 'FOR NO KEY UPDATE SKIP LOCKED', 'for share'):
+            query = {
+                'sql': f'SELECT id FROM orders_order WHERE status = %s {clause}',
+                'params': ('completed',),
+                'database': 'default',
+            }
+            self.assertEqual(explain(query), '')
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=5)
+    def test_log_is_bounded(self):
+        """Test that only the newest SLOW_QUERY_LOG_SIZE slow queries are kept"""
+        for _ in range(3):
+            self.get('/api/admin/orders/')
+        newest = self.get('/api/admin/analytics/top-products/')
+
+        self.assertEqual(newest.status_code, 200)
+        self.assertEqual(SlowQuery.objects.count(), 5)
+        self.assertTrue(SlowQuery.objects.filter(view_name='analytics-top-products').exists())
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+    def test_disabled_without_threshold(self):
+        """Test that nothing is captured when the threshold is None"""
+        self.get('/api/admin/orders/')
+
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_slow_query_endpoint(self):
+        """Test listing slow queries filtered by view and clearing them"""
+        self.get('/api/admin/orders/')
+        self.get('/api/admin/analytics/top-products/')
+
+        response = self.get('/api/admin/metrics/slow-queries/', {'view': 'analytics-top-products'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data)
+        self.assertEqual({row['view_name'] for row in response.data}, {'analytics-top-products'})
+
+        response = self.client.delete('/api/admin/metrics/slow-queries/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(SlowQuery.objects.exists())
@@ -0,0 +1,171 @@
+"""
+Tests for the two-tier (process-local L1 + shared L2) cache
+"""
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from election_cart.two_tier_cache import GENERATION_KEY_PREFIX, TwoTierCache
+
+
+def make_cache(location, **options):
+    """A TwoTierCache with its own L1, as a separate process would have"""
+    options = {'L2': 'shared', 'GENERATION_CHECK_INTERVAL': 0, **options}
+    return TwoTierCache(location, {'TIMEOUT': 300, 'OPTIONS': options})
+
+
+class TwoTierCacheTest(SimpleTestCase):
+    """Test L1 reads, write-through to L2 and cross-process invalidation"""
+
+    def setUp(self):
+        """Start every test with empty tiers"""
+        self.shared = caches['shared']
+        self.shared.clear()
+        self.worker_a = make_cache('test-worker-a')
+        self.worker_b = make_cache('test-worker-b')
+        self.worker_a.l1.clear()
+        self.worker_b.l1.clear()
+
+    def test_reads_are_served_from_l1(self):
+        """Test that a value read once keeps being served from memory"""
+        self.worker_a.set('catalog', ['package'])
+        self.assertEqual(self.worker_a.get('catalog'), ['package'])
+
+        # Not a write through the two-tier cache, so nobody is told
+        self.shared.delete('catalog')
+
+        self.assertEqual(self.worker_a.get('catalog'), ['package'])
+        self.assertIsNone(self.worker_b.get('catalog'))
+
+    def test_writes_invalidate_other_processes(self):
+        """Test that a write in one process is seen by another that cached the old value"""
+        self.worker_a.set('stats', 1)
+        self.assertEqual(self.worker_b.get('stats'), 1)
+
+        self.worker_a.set('stats', 2)
+        self.assertEqual(self.worker_b.get('stats'), 2)
+
+        self.worker_a.delete('stats')
+        self.assertIsNone(self.worker_b.get('stats'))
+
+    def test_clear_invalidates_other_processes(self):
+        """Test that clear() empties every process's L1"""
+        self.worker_a.set_many({'one': 1, 'two': 2})
+        self.assertEqual(self.worker_b.get_many(['one', 'two', 'three']), {'one': 1, 'two': 2})
+
+        self.worker_a.clear()
+
+        self.assertEqual(self.worker_b.get_many(['one', 'two']), {})
+
+    def test_invalidation_is_checked_once_per_interval(self):
+        """Test that L2's generation stamp is not read on every L1 hit"""
+        worker_c = make_cache('test-worker-c', GENERATION_CHECK_INTERVAL=60)
+        worker_c.l1.clear()
+        self.worker_a.set('stats', 1)
+        self.assertEqual(worker_c.get('stats'), 1)
+
+        self.worker_a.set('stats', 2)
+
+        self.assertEqual(worker_c.get('stats'), 1)
+        worker_c.l1.checked_at = float('-inf')
+        self.assertEqual(worker_c.get('stats'), 2)
+
+    def test_l1_is_bounded(self):
+        """Test that L1 evicts least recently used entries"""
+        worker = make_cache('test-worker-small', L1_MAX_ENTRIES=2)
+        worker.l1.clear()
+        worker.set_many({'one': 'one', 'two': 'two', 'three': 'three'})
+        for key in ('one', 'two', 'three'):
+            worker.get(key)
+
+        self.assertEqual(len(worker.l1.entries), 2)
+        self.assertEqual(worker.get('one'), 'one')
+
+    def test_cached_values_are_copies(self):
+        """Test that mutating a returned value does not change the cached one"""
+        self.worker_a.set('data', {'orders': 1})
+        self.worker_a.get('data')['orders'] = 2
+
+        self.assertEqual(self.worker_a.get('data'), {'orders': 1})
+
+    def test_add_and_incr_are_atomic_in_l2(self):
+        """Test that add() and incr() act on the shared value"""
+        self.assertTrue(self.worker_a.add('counter', 0))
+        self.assertFalse(self.worker_b.add('counter', 5))
+        self.worker_a.incr('counter')
+
+        self.assertEqual(self.worker_b.incr('counter'), 2)
+        self.assertEqual(self.worker_a.get('counter'), 2)
+
+    def test_writes_only_invalidate_their_namespace(self):
+        """Test that a write drops other processes' entries of its namespace only"""
+        self.worker_a.set_many({'catalog:packages': ['package'], 'analytics:overview': 1})
+        self.worker_b.get_many(['catalog:packages', 'analytics:overview'])
+        self.shared.set('catalog:packages', ['changed'])
+
+        self.worker_a.set('analytics:overview', 2)
+
+        self.assertEqual(self.worker_b.get('analytics:overview'), 2)
+        # Still the copy in memory: the catalog namespace was not written to
+        self.assertEqual(self.worker_b.get('catalog:packages'), ['package'])
+
+    def test_writer_keeps_its_l1(self):
+        """Test that a process's own writes do not drop the rest of its L1"""
+        self.worker_a.set_many({'user:1': 'one', 'user:2': 'two'})
+        self.worker_a.get_many(['user:1', 'user:2'])
+        self.shared.set('user:2', 'changed')
+
+        self.worker_a.set('user:1', 'new')
+
+        self.assertEqual(self.worker_a.get('user:1'), 'new')
+        self.assertEqual(self.worker_a.get('user:2'), 'two')
+
+    def test_fills_do_not_invalidate_other_processes(self):
+        """Test that filling absent keys leaves other processes' L1 in place"""
+        self.worker_a.set('user:1', 'one')
+        self.assertEqual(self.worker_b.get('user:1'), 'one')
+        self.shared.set('user:1', 'changed')
+
+        self.worker_a.set('user:2', 'two')
+        self.worker_a.add('user:3', 'three')
+        self.worker_a.set_many({'user:4': 'four'})
+
+        self.assertEqual(self.worker_b.get('user:1'), 'one')
+        self.assertEqual(self.worker_b.get('user:2'), 'two')
+
+    def test_changes_only_drop_changed_keys(self):
+        """Test that deleting or overwriting a key drops only that key from other processes"""
+        self.worker_a.set_many({'user:1': 'one', 'user:2': 'two', 'user:3': 'three'})
+        self.worker_b.get_many(['user:1', 'user:2', 'user:3'])
+        self.shared.set('user:3', 'changed')
+
+        self.worker_a.delete('user:1')
+        self.worker_a.set('user:2', 'new')
+
+        self.assertIsNone(self.worker_b.get('user:1'))
+        self.assertEqual(self.worker_b.get('user:2'), 'new')
+        self.assertEqual(self.worker_b.get('user:3'), 'three')
+
+    def test_lost_change_log_drops_namespace(self):
+        """Test that a process drops the whole namespace when it cannot tell which keys changed"""
+        self.worker_a.set_many({'user:1': 'one', 'user:2': 'two'})
+        self.worker_b.get_many(['user:1', 'user:2'])
+        self.shared.set('user:2', 'changed')
+
+        self.worker_a.delete('user:1')
+        generation = self.shared.get(f'{GENERATION_KEY_PREFIX}user')
+        self.shared.delete(self.worker_a._change_key('user', generation))
+
+        self.assertEqual(self.worker_b.get('user:2'), 'changed')
+
+    def test_evicted_generation_does_not_repeat(self):
+        """Test that a generation counter lost to eviction never restarts at a value already seen"""
+        self.worker_a.set('user:1', 'one')
+        self.worker_a.delete('user:1')
+        self.worker_a.set('user:1', 'one')
+        self.assertEqual(self.worker_b.get('user:1'), 'one')
+        seen = self.shared.get(f'{GENERATION_KEY_PREFIX}user')
+        self.shared.delete(f'{GENERATION_KEY_PREFIX}user')
+
+        self.worker_a.delete('user:1')
+
+        self.assertGreater(self.shared.get(f'{GENERATION_KEY_PREFIX}user'), seen)
+        self.assertIsNone(self.worker_b.get('user:1'))
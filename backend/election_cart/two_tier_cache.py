@@ -0,0 +1,320 @@
+"""
+Two-tier cache: a small process-local LRU (L1) in front of a shared cache
+(L2, Redis in production).
+
+Reads are served from L1 while the entry is younger than L1_TIMEOUT
+seconds; L1 misses read L2 and keep the value in L1. Writes go to L2 and
+drop the key from the writing process's L1.
+
+Other processes learn about changes through generation counters kept in
+L2, one per key namespace (the part of the key before the first ':', so
+'analytics:...' and 'catalog:...' are separate namespaces). Deleting or
+overwriting keys increments the counter of their namespace and records the
+changed keys under the new generation in a short-lived change log. Each
+process compares the counters of the namespaces it holds with the ones it
+last saw at most every GENERATION_CHECK_INTERVAL seconds and drops the
+changed keys from its L1; when a change log entry is missing (evicted or
+expired) or too many changes happened, it drops the whole namespace
+instead. A change is therefore visible everywhere within
+GENERATION_CHECK_INTERVAL, a hot read costs at most one L2 round trip per
+interval per process, and changes to one key leave the other keys cached.
+
+Filling a key that is absent from L2 (set() or add() after a miss) changes
+nothing other processes can hold, apart from copies of an entry L2 evicted
+in the last L1_TIMEOUT seconds, so it increments no counter. A counter
+lost to eviction restarts from the current time in microseconds, never
+from a value other processes may have seen. Unlike pub/sub this needs no
+listener thread in the workers and works with any L2 backend.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'election_cart.two_tier_cache.TwoTierCache',
+            'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 500, 'L1_TIMEOUT': 10},
+        },
+        'shared': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', ...},
+    }
+
+add() and incr() are atomic in L2 and always go there; set() is an add()
+followed, when the key already exists, by a set(). clear() clears L2,
+which for Redis flushes its whole database; invalidate groups of keys with
+election_cart.cache_keys instead.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .metrics import cache_lookups
+
+GENERATION_KEY_PREFIX = 'two-tier-cache:generation:'
+CHANGE_KEY_PREFIX = 'two-tier-cache:change:'
+# Seconds a change log entry is kept; processes that check less often
+# than this drop the whole namespace
+CHANGE_LOG_TIMEOUT = 300
+# Changes replayed per namespace and check before dropping the namespace
+MAX_REPLAYED_CHANGES = 100
+_MISSING = object()
+
+# Process-wide L1 stores, shared by the per-thread backend instances
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def namespace_of(key):
+    return key.split(':', 1)[0] if ':' in key else ''
+
+
+class L1Store:
+    """Thread-safe LRU of pickled values with per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # Generation of each namespace held, as last seen in L2
+        self.generations = {}
+        self.checked_at = float('-inf')
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            pickled, expires, namespace = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, namespace, value, ttl):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (pickled, time.monotonic() + ttl, namespace)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def drop_namespace(self, namespace):
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry[2] == namespace]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generations.clear()
+
+
+class TwoTierCache(BaseCache):
+    """Process-local LRU in front of the cache configured as OPTIONS['L2']"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = options.get('L2', 'shared')
+        self.l1_timeout = options.get('L1_TIMEOUT', 10)
+        self.check_interval = options.get('GENERATION_CHECK_INTERVAL', 1)
+        with _stores_lock:
+            self.l1 = _stores.setdefault(location, L1Store(options.get('L1_MAX_ENTRIES', 500)))
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def _l1_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _generation_key(self, namespace):
+        return f'{GENERATION_KEY_PREFIX}{namespace}'
+
+    def _change_key(self, namespace, generation):
+        return f'{CHANGE_KEY_PREFIX}{namespace}:{generation}'
+
+    def _track(self, namespaces):
+        """Note the generation of namespaces before first reading them from L2"""
+        untracked = [namespace for namespace in namespaces if namespace not in self.l1.generations]
+        if not untracked:
+            return
+        keys = [self._generation_key(namespace) for namespace in untracked]
+        current = self.l2.get_many(keys)
+        missing = [key for key in keys if key not in current]
+        if missing:
+            # A missing counter means cleared or evicted to the other
+            # processes, so every tracked namespace needs one
+            for key in missing:
+                self.l2.add(key, time.time_ns() // 1000, None)
+            current.update(self.l2.get_many(missing))
+        with self.l1.lock:
+            for namespace, key in zip(untracked, keys):
+                self.l1.generations.setdefault(namespace, current.get(key))
+
+    def _sync_generation(self):
+        """Drop the keys other processes changed since the last check"""
+        now = time.monotonic()
+        if now - self.l1.checked_at < self.check_interval:
+            return
+        self.l1.checked_at = now
+        namespaces = list(self.l1.generations)
+        if not namespaces:
+            return
+        current = self.l2.get_many([self._generation_key(namespace) for namespace in namespaces])
+        changed = {}
+        for namespace in namespaces:
+            generation = current.get(self._generation_key(namespace))
+            if generation is None:
+                # Cleared or evicted: tracked again on the next L2 read
+                self.l1.drop_namespace(namespace)
+                self.l1.generations.pop(namespace, None)
+                continue
+            seen = self.l1.generations.get(namespace)
+            if seen != generation:
+                changed[namespace] = (seen, generation)
+        if not changed:
+            return
+
+        replayable = {
+            namespace: range(seen + 1, generation + 1)
+            for namespace, (seen, generation) in changed.items()
+            if seen is not None and 0 < generation - seen <= MAX_REPLAYED_CHANGES
+        }
+        changes = self.l2.get_many([
+            self._change_key(namespace, generation)
+            for namespace, generations in replayable.items()
+            for generation in generations
+        ])
+        for namespace, (seen, generation) in changed.items():
+            change_keys = [self._change_key(namespace, number) for number in replayable.get(namespace, ())]
+            if change_keys and all(key in changes for key in change_keys):
+                self.l1.delete([l1_key for key in change_keys for l1_key in changes[key]])
+            else:
+                self.l1.drop_namespace(namespace)
+            self.l1.generations[namespace] = generation
+
+    def _bump(self, namespace):
+        key = self._generation_key(namespace)
+        try:
+            return self.l2.incr(key)
+        except ValueError:
+            # Never restart from a generation other processes may have seen
+            if self.l2.add(key, time.time_ns() // 1000, None):
+                return None
+            return self.l2.incr(key)
+
+    def _written(self, keys, version):
+        """Forget changed keys locally and tell the other processes"""
+        l1_keys = [self._l1_key(key, version) for key in keys]
+        self.l1.delete(l1_keys)
+        by_namespace = {}
+        for key, l1_key in zip(keys, l1_keys):
+            by_namespace.setdefault(namespace_of(key), []).append(l1_key)
+        for namespace, namespace_keys in by_namespace.items():
+            generation = self._bump(namespace)
+            if generation is None:
+                continue
+            self.l2.set(self._change_key(namespace, generation), namespace_keys, CHANGE_LOG_TIMEOUT)
+            with self.l1.lock:
+                # Nobody else changed the namespace since we last looked
+                if self.l1.generations.get(namespace) == generation - 1:
+                    self.l1.generations[namespace] = generation
+
+    def _filled(self, keys, version):
+        """Forget filled keys locally; other processes cannot hold them"""
+        self.l1.delete([self._l1_key(key, version) for key in keys])
+
+    def get(self, key, default=None, version=None):
+        l1_key = self._l1_key(key, version)
+        self._sync_generation()
+        value = self.l1.get(l1_key)
+        if value is not _MISSING:
+            cache_lookups.labels('l1', 'hit').inc()
+            return value
+        self._track([namespace_of(key)])
+        value = self.l2.get(key, _MISSING, version)
+        if value is _MISSING:
+            cache_lookups.labels('l2', 'miss').inc()
+            return default
+        cache_lookups.labels('l2', 'hit').inc()
+        self.l1.set(l1_key, namespace_of(key), value, self.l1_timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync_generation()
+        found = {}
+        remote = []
+        for key in keys:
+            value = self.l1.get(self._l1_key(key, version))
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+        cache_lookups.labels('l1', 'hit').inc(len(found))
+        if remote:
+            self._track({namespace_of(key) for key in remote})
+            values = self.l2.get_many(remote, version)
+            cache_lookups.labels('l2', 'hit').inc(len(values))
+            cache_lookups.labels('l2', 'miss').inc(len(remote) - len(values))
+            for key, value in values.items():
+                self.l1.set(self._l1_key(key, version), namespace_of(key), value, self.l1_timeout)
+            found.update(values)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.l2.add(key, value, timeout, version):
+            self._filled([key], version)
+            return
+        self.l2.set(key, value, timeout, version)
+        self._written([key], version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        filled = {key for key, value in data.items() if self.l2.add(key, value, timeout, version)}
+        self._filled(filled, version)
+        existing = {key: value for key, value in data.items() if key not in filled}
+        if not existing:
+            return []
+        failed = self.l2.set_many(existing, timeout, version)
+        self._written(list(existing), version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added:
+            self._filled([key], version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version)
+        self._written([key], version)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self.l2.touch(key, timeout, version)
+        if touched:
+            # The entry may now expire sooner than the L1 copies
+            self._written([key], version)
+        return touched
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version)
+        self._written([key], version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version)
+        self._written(keys, version)
+
+    def clear(self):
+        # Other processes find their generations gone and drop their L1
+        self.l2.clear()
+        self.l1.clear()
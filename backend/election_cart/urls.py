@@ -6,7 +6,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from admin_panel.views import StaffOrderListView, StaffOrderDetailView, update_checklist_item
+from election_cart.metrics import metrics_view
+from admin_panel.views import StaffOrderListView, StaffOrderDetailView, update_checklist_item, bulk_update_checklist_items
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -18,9 +19,12 @@ urlpatterns = [
     # Staff endpoints
     path('api/staff/orders/', StaffOrderListView.as_view(), name='staff-order-list'),
     path('api/staff/orders/<int:pk>/', StaffOrderDetailView.as_view(), name='staff-order-detail'),
+    path('api/staff/orders/<int:order_id>/checklist/', bulk_update_checklist_items, name='staff-checklist-bulk-update'),
     path('api/staff/checklist/<int:item_id>/', update_checklist_item, name='staff-checklist-update'),
     # Secure file serving
     path('api/secure-files/', include('products.file_urls')),
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='prometheus-metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,31 @@
+"""
+gunicorn configuration: gunicorn --config gunicorn.conf.py election_cart.wsgi
+
+Prometheus metrics are collected per worker process; with
+PROMETHEUS_MULTIPROC_DIR set, each worker writes them to that directory and
+/metrics aggregates them (see election_cart/metrics.py).
+"""
+import glob
+import os
+
+from prometheus_client import multiprocess
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+# Each thread holds its own database connection during a request; with
+# DB_POOL_SIZE set they share at most that many per worker
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+
+
+def on_starting(server):
+    # Samples of a previous run would otherwise be added to the new one
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,7 @@
+"""
+End-to-end load testing harness.
+
+Drives customer and staff journeys over HTTP against a running backend,
+with a local Razorpay stand-in so checkout needs no network access.
+Run `python -m loadtest --help` from the backend directory.
+"""
@@ -0,0 +1,183 @@
+"""
+Command line entry point.
+
+    python -m loadtest gateway --port 9100 --key-secret <secret>
+    python -m loadtest credentials firebase-loadtest.json
+    python -m loadtest run --base-url http://127.0.0.1:8000 --gateway-url http://127.0.0.1:9100 \\
+        --admin admin --admin-password admin123 --customers 200 --concurrency 20
+
+See loadtest/README.md for the full setup.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .fakes import FakeRazorpayGateway, write_firebase_credentials
+from .journeys import ApiSession, CustomerJourney, StaffJourney, StepFailed, login
+from .stats import StepStats
+
+
+def run_gateway(args):
+    gateway = FakeRazorpayGateway(args.key_secret, host=args.host, port=args.port, latency=args.latency)
+    print(f'Fake Razorpay gateway listening on {gateway.url} (Ctrl+C to stop)')
+    try:
+        gateway.server.serve_forever()
+    except KeyboardInterrupt:
+        gateway.server.server_close()
+
+
+def run_credentials(args):
+    write_firebase_credentials(args.path, project_id=args.project_id)
+    print(f'Wrote Firebase service account key to {args.path}')
+
+
+def create_staff(args, stats, run_id):
+    """Log in as admin and create the staff accounts orders are assigned to"""
+    admin = ApiSession(args.base_url, stats)
+    login(admin, args.admin, args.admin_password, step='admin_login')
+
+    staff = []
+    for index in range(args.staff):
+        username = f'lt_staff_{run_id}_{index}'
+        password = f'lt-staff-{run_id}'
+        created = admin.call(
+            'create_staff', 'POST', '/api/auth/users/create/', expected=(201,),
+            json={
+                'username': username,
+                'phone_number': f'+6{run_id % 10000:04d}{index:08d}',
+                'role': 'staff',
+                'password': password,
+            }
+        )
+        # Each staff worker gets its own sessions; requests.Session is not shared across threads
+        admin_api = ApiSession(args.base_url, stats)
+        admin_api.session.headers.update(admin.session.headers)
+        staff_api = ApiSession(args.base_url, stats)
+        login(staff_api, username, password, step='staff_login')
+        staff.append(StaffJourney(admin_api, staff_api, created['user']['id']))
+    return staff
+
+
+def run_load(args):
+    stats = StepStats()
+    run_id = int(time.time()) % 100000000
+    gateway = None
+    gateway_url = args.gateway_url
+    if not gateway_url:
+        gateway = FakeRazorpayGateway(args.key_secret, port=args.gateway_port, latency=args.gateway_latency).start()
+        gateway_url = gateway.url
+        print(f'Started fake Razorpay gateway on {gateway_url}')
+
+    try:
+        staff = create_staff(args, stats, run_id)
+    except StepFailed as exc:
+        print(f'Setup failed: {exc}')
+        return 2
+    staff_cycle = itertools.cycle(staff)
+    staff_locks = {id(journey): threading.Lock() for journey in staff}
+    failures = []
+
+    def customer(index):
+        if args.ramp_up:
+            time.sleep(args.ramp_up * index / args.customers)
+        started = time.perf_counter()
+        try:
+            order_id = CustomerJourney(args.base_url, gateway_url, stats, seed=index, run_id=run_id).run()
+        except StepFailed as exc:
+            stats.record('customer_journey', time.perf_counter() - started, ok=False)
+            failures.append(str(exc))
+            return None
+        stats.record('customer_journey', time.perf_counter() - started)
+        return order_id
+
+    def process(order_id, journey):
+        started = time.perf_counter()
+        # A staff member works one order at a time
+        with staff_locks[id(journey)]:
+            try:
+                journey.run(order_id)
+            except StepFailed as exc:
+                stats.record('staff_journey', time.perf_counter() - started, ok=False)
+                failures.append(str(exc))
+                return
+        stats.record('staff_journey', time.perf_counter() - started)
+
+    print(f'Running {args.customers} customer journeys with {args.concurrency} concurrent users '
+          f'and {len(staff)} staff members...')
+    with ThreadPoolExecutor(args.concurrency) as customers, ThreadPoolExecutor(max(len(staff), 1)) as staff_pool:
+        staff_futures = []
+        for future in as_completed([customers.submit(customer, index) for index in range(args.customers)]):
+            order_id = future.result()
+            if order_id is not None and staff:
+                staff_futures.append(staff_pool.submit(process, order_id, next(staff_cycle)))
+        for future in staff_futures:
+            future.result()
+    stats.finish()
+
+    if gateway is not None:
+        gateway.stop()
+
+    print(f'\nFinished in {stats.elapsed:.1f}s\n')
+    print(stats.format_table())
+    if failures:
+        print(f'\n{len(failures)} failed journeys, first errors:')
+        for failure in failures[:5]:
+            print(f'  {failure}')
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({
+                'customers': args.customers,
+                'concurrency': args.concurrency,
+                'staff': len(staff),
+                'elapsed_s': round(stats.elapsed, 2),
+                'failed_journeys': len(failures),
+                'steps': stats.summary(),
+            }, handle, indent=2)
+        print(f'\nWrote results to {args.json}')
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='Election Cart load testing')
+    commands = parser.add_subparsers(dest='command', required=True)
+    key_secret = os.getenv('RAZORPAY_KEY_SECRET', 'loadtest_secret')
+
+    gateway = commands.add_parser('gateway', help='Serve the fake Razorpay gateway')
+    gateway.add_argument('--host', default='127.0.0.1')
+    gateway.add_argument('--port', type=int, default=9100)
+    gateway.add_argument('--key-secret', default=key_secret, help='Must match the backend RAZORPAY_KEY_SECRET')
+    gateway.add_argument('--latency', type=float, default=0.0, help='Seconds added to every gateway API call')
+    gateway.set_defaults(handler=run_gateway)
+
+    credentials = commands.add_parser('credentials', help='Write throwaway Firebase credentials')
+    credentials.add_argument('path')
+    credentials.add_argument('--project-id', default='election-cart-loadtest')
+    credentials.set_defaults(handler=run_credentials)
+
+    run = commands.add_parser('run', help='Run customer and staff journeys against a backend')
+    run.add_argument('--base-url', default='http://127.0.0.1:8000')
+    run.add_argument('--gateway-url', help='URL of a running fake gateway; default: start one in-process')
+    run.add_argument('--gateway-port', type=int, default=9100, help='Port of the in-process gateway')
+    run.add_argument('--gateway-latency', type=float, default=0.0)
+    run.add_argument('--key-secret', default=key_secret, help='Must match the backend RAZORPAY_KEY_SECRET')
+    run.add_argument('--admin', default='admin', help='Admin username used to create staff and assign orders')
+    run.add_argument('--admin-password', default='admin123')
+    run.add_argument('--customers', type=int, default=50, help='Number of customer journeys')
+    run.add_argument('--concurrency', type=int, default=10, help='Concurrent customers')
+    run.add_argument('--staff', type=int, default=3, help='Staff members processing orders')
+    run.add_argument('--ramp-up', type=float, default=0.0, help='Seconds over which journeys are started')
+    run.add_argument('--json', help='Also write the results to this file')
+    run.set_defaults(handler=run_load)
+
+    args = parser.parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Local stand-ins for the external services checkout depends on.
+
+FakeRazorpayGateway implements the part of the Razorpay REST API the
+backend calls (create/fetch order, fetch payment) plus a checkout endpoint
+that plays the customer's browser: it "pays" an order and returns the
+payment id and an HMAC-SHA256 signature made with the same key secret, so
+the backend's signature verification runs unchanged.
+
+write_firebase_credentials creates a throwaway service account key so the
+Firebase Admin SDK initializes without network access or real credentials.
+"""
+import hashlib
+import hmac
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def payment_signature(key_secret, razorpay_order_id, razorpay_payment_id):
+    """Signature Razorpay Checkout returns for a successful payment"""
+    message = f'{razorpay_order_id}|{razorpay_payment_id}'
+    return hmac.new(key_secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    routes = [
+        ('POST', re.compile(r'^/v1/orders/?$'), 'create_order'),
+        ('GET', re.compile(r'^/v1/orders/(?P<order_id>[\w-]+)/?$'), 'fetch_order'),
+        ('GET', re.compile(r'^/v1/payments/(?P<payment_id>[\w-]+)/?$'), 'fetch_payment'),
+        ('POST', re.compile(r'^/checkout/(?P<order_id>[\w-]+)/?$'), 'checkout'),
+    ]
+
+    def log_message(self, format, *args):
+        # Keep load test output readable
+        pass
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0]
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                status, payload = getattr(self.server.gateway, handler)(body, **match.groupdict())
+                return self._respond(status, payload)
+        return self._respond(404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Not found'}})
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+class FakeRazorpayGateway:
+    """
+    In-memory Razorpay API stand-in served over HTTP.
+
+    Start it, point the backend at it with RAZORPAY_BASE_URL and give both
+    the same RAZORPAY_KEY_SECRET. `latency` adds a fixed delay (seconds) to
+    every API call to model the real gateway round trip.
+    """
+
+    def __init__(self, key_secret, host='127.0.0.1', port=0, latency=0.0):
+        self.key_secret = key_secret
+        self.latency = latency
+        self.orders = {}
+        self.payments = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _GatewayHandler)
+        self.server.daemon_threads = True
+        self.server.gateway = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _next_id(self, prefix):
+        with self._lock:
+            return f'{prefix}_{next(self._ids):014d}'
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_order(self, body):
+        self._wait()
+        if not isinstance(body.get('amount'), int) or body['amount'] < 100:
+            return 400, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'The amount must be atleast INR 1.00'}}
+        order = {
+            'id': self._next_id('order'),
+            'entity': 'order',
+            'amount': body['amount'],
+            'amount_paid': 0,
+            'amount_due': body['amount'],
+            'currency': body.get('currency', 'INR'),
+            'receipt': body.get('receipt', ''),
+            'status': 'created',
+            'attempts': 0,
+            'created_at': int(time.time()),
+        }
+        with self._lock:
+            self.orders[order['id']] = order
+        return 200, order
+
+    def fetch_order(self, body, order_id):
+        self._wait()
+        order = self.orders.get(order_id)
+        if order is None:
+            return 400, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'The id provided does not exist'}}
+        return 200, order
+
+    def fetch_payment(self, body, payment_id):
+        self._wait()
+        payment = self.payments.get(payment_id)
+        if payment is None:
+            return 400, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'The id provided does not exist'}}
+        return 200, payment
+
+    def checkout(self, body, order_id):
+        """Pay an order and return what Razorpay Checkout hands the frontend"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return 404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'The id provided does not exist'}}
+        payment_id = self._next_id('pay')
+        payment = {
+            'id': payment_id,
+            'entity': 'payment',
+            'amount': order['amount'],
+            'currency': order['currency'],
+            'status': 'captured',
+            'order_id': order_id,
+            'method': body.get('method', 'upi'),
+            'captured': True,
+            'created_at': int(time.time()),
+        }
+        with self._lock:
+            self.payments[payment_id] = payment
+            order.update(status='paid', amount_paid=order['amount'], amount_due=0, attempts=order['attempts'] + 1)
+        return 200, {
+            'razorpay_order_id': order_id,
+            'razorpay_payment_id': payment_id,
+            'razorpay_signature': payment_signature(self.key_secret, order_id, payment_id),
+        }
+
+
+def write_firebase_credentials(path, project_id='election-cart-loadtest'):
+    """Write a service account key file with a freshly generated RSA key"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    credentials = {
+        'type': 'service_account',
+        'project_id': project_id,
+        'private_key_id': hashlib.sha1(private_key.encode()).hexdigest(),
+        'private_key': private_key,
+        'client_email': f'loadtest@{project_id}.iam.gserviceaccount.com',
+        'client_id': '0',
+        'token_uri': 'http://127.0.0.1:9/token',
+    }
+    with open(path, 'w') as handle:
+        json.dump(credentials, handle, indent=2)
+    return path
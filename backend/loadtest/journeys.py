@@ -0,0 +1,181 @@
+"""
+Scripted user journeys against a running backend.
+
+CustomerJourney: sign up, log in, browse the catalogue, fill the cart,
+create an order, pay through the stand-in gateway, verify the payment and
+upload resources for every item. StaffJourney: an admin assigns a ready
+order, the staff member opens it and ticks off its checklist.
+"""
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from io import BytesIO
+
+import requests
+from PIL import Image
+
+
+class StepFailed(Exception):
+    """A journey step returned an unexpected response"""
+
+
+def sample_image(rng, size=(320, 240)):
+    """A small random-coloured JPEG, like a phone photo thumbnail"""
+    buffer = BytesIO()
+    Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3))).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def results(payload):
+    """List endpoints may or may not be paginated"""
+    return payload['results'] if isinstance(payload, dict) and 'results' in payload else payload
+
+
+class ApiSession:
+    """requests.Session that times every call and records it as a step"""
+
+    def __init__(self, base_url, stats, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def authenticate(self, token):
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def call(self, step, method, path, expected=(200,), **kwargs):
+        url = path if path.startswith('http') else f'{self.base_url}{path}'
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            self.stats.record(step, time.perf_counter() - started, ok=False)
+            raise StepFailed(f'{step}: {exc}') from exc
+        ok = response.status_code in expected
+        self.stats.record(step, time.perf_counter() - started, ok=ok)
+        if not ok:
+            body = ' '.join(response.text.split())[:200]
+            raise StepFailed(f'{step}: HTTP {response.status_code} {body}')
+        return response.json() if response.content else None
+
+
+def login(api, username, password, step='login'):
+    data = api.call(step, 'POST', '/api/auth/login/', json={'username': username, 'password': password})
+    api.authenticate(data['token'])
+    return data['user']
+
+
+class CustomerJourney:
+    """One customer going from sign-up to a paid order with resources uploaded"""
+
+    def __init__(self, base_url, gateway_url, stats, seed, run_id, max_cart_items=3):
+        self.api = ApiSession(base_url, stats)
+        self.gateway = ApiSession(gateway_url, stats)
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.run_id = run_id
+        self.max_cart_items = max_cart_items
+
+    def run(self):
+        """Run the journey and return the id of the order ready for processing"""
+        username = f'lt_{self.run_id}_{self.seed}'
+        password = f'pw-{uuid.uuid4().hex[:12]}'
+        phone = f'+7{self.run_id % 10000:04d}{self.seed:08d}'
+        self.api.call(
+            'signup', 'POST', '/api/auth/signup/', expected=(201,),
+            json={'username': username, 'password': password, 'phone_number': phone}
+        )
+        login(self.api, username, password)
+
+        products = self.browse()
+        for item_type, product in self.rng.sample(products, min(len(products), self.rng.randint(1, self.max_cart_items))):
+            self.api.call(
+                'add_to_cart', 'POST', '/api/cart/add/', expected=(200, 201),
+                json={'item_type': item_type, 'item_id': product['id'], 'quantity': 1}
+            )
+        self.api.call('view_cart', 'GET', '/api/cart/')
+
+        checkout = self.api.call('create_order', 'POST', '/api/orders/create/', expected=(201,))
+        order_id = checkout['order']['id']
+        payment = self.gateway.call('gateway_checkout', 'POST', f'/checkout/{checkout["razorpay_order_id"]}')
+        self.api.call('verify_payment', 'POST', f'/api/orders/{order_id}/payment-success/', json=payment)
+
+        self.upload_resources(order_id)
+        self.api.call('my_orders', 'GET', '/api/orders/my-orders/')
+        return order_id
+
+    def browse(self):
+        packages = results(self.api.call('list_packages', 'GET', '/api/packages/'))
+        campaigns = results(self.api.call('list_campaigns', 'GET', '/api/campaigns/'))
+        products = [('package', product) for product in packages] + [('campaign', product) for product in campaigns]
+        # Only products costing at least 1 INR can be paid for
+        products = [(item_type, product) for item_type, product in products if float(product['price']) >= 1]
+        if not products:
+            raise StepFailed('browse: no active products to buy')
+        item_type, product = self.rng.choice(products)
+        self.api.call('product_detail', 'GET', f'/api/{item_type}s/{product["id"]}/')
+        return products
+
+    def upload_resources(self, order_id):
+        fields = self.api.call('resource_fields', 'GET', f'/api/orders/{order_id}/resource-fields/')
+        for item in fields['items']:
+            if item['fields']:
+                self.submit_dynamic_resources(order_id, item)
+            else:
+                self.upload_static_resources(order_id, item)
+
+    def submit_dynamic_resources(self, order_id, item):
+        data = {'order_item_id': item['order_item_id']}
+        files = {}
+        for field in item['fields']:
+            key = f'field_{field["id"]}'
+            if field['field_type'] == 'text':
+                data[key] = 'Vote for progress'[:field['max_length'] or None]
+            elif field['field_type'] == 'number':
+                data[key] = field['min_value'] or 1
+            elif field['field_type'] == 'image':
+                files[key] = (f'{key}.jpg', sample_image(self.rng), 'image/jpeg')
+            else:
+                files[key] = (f'{key}.pdf', b'%PDF-1.4\n%%EOF\n', 'application/pdf')
+        self.api.call(
+            'submit_resources', 'POST', f'/api/orders/{order_id}/submit-resources/',
+            expected=(201,), data=data, files=files
+        )
+
+    def upload_static_resources(self, order_id, item):
+        self.api.call(
+            'upload_resources', 'POST', f'/api/orders/{order_id}/upload-resources/', expected=(201,),
+            data={
+                'order_item_id': item['order_item_id'],
+                'campaign_slogan': 'Vote for progress',
+                'preferred_date': (date.today() + timedelta(days=14)).isoformat(),
+                'whatsapp_number': '9876543210',
+            },
+            files={
+                'candidate_photo': ('candidate.jpg', sample_image(self.rng), 'image/jpeg'),
+                'party_logo': ('logo.jpg', sample_image(self.rng, (128, 128)), 'image/jpeg'),
+            }
+        )
+
+
+class StaffJourney:
+    """An admin assigns a ready order to a staff member, who completes its checklist"""
+
+    def __init__(self, admin_api, staff_api, staff_id):
+        self.admin_api = admin_api
+        self.staff_api = staff_api
+        self.staff_id = staff_id
+
+    def run(self, order_id):
+        self.admin_api.call(
+            'assign_order', 'POST', f'/api/admin/orders/{order_id}/assign/', json={'staff_id': self.staff_id}
+        )
+        self.staff_api.call('staff_orders', 'GET', '/api/staff/orders/')
+        order = self.staff_api.call('staff_order_detail', 'GET', f'/api/staff/orders/{order_id}/')
+        for item in (order['checklist'] or {}).get('items', []):
+            if not item['completed']:
+                self.staff_api.call(
+                    'complete_checklist_item', 'PATCH', f'/api/staff/checklist/{item["id"]}/',
+                    json={'completed': True}
+                )
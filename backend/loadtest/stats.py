@@ -0,0 +1,83 @@
+"""
+Per-step latency and throughput bookkeeping for load test runs.
+"""
+import math
+import threading
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StepStats:
+    """Thread-safe latency samples and error counts keyed by step name"""
+
+    PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._errors = {}
+        self._order = []
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, step, seconds, ok=True):
+        with self._lock:
+            if step not in self._samples:
+                self._samples[step] = []
+                self._errors[step] = 0
+                self._order.append(step)
+            self._samples[step].append(seconds)
+            if not ok:
+                self._errors[step] += 1
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self):
+        """Return one dict per step: count, errors, throughput and latency percentiles in ms"""
+        elapsed = self.elapsed or 1e-9
+        with self._lock:
+            steps = [(step, sorted(self._samples[step]), self._errors[step]) for step in self._order]
+
+        rows = []
+        for step, samples, errors in steps:
+            row = {
+                'step': step,
+                'count': len(samples),
+                'errors': errors,
+                'rps': round(len(samples) / elapsed, 2),
+                'mean_ms': round(sum(samples) / len(samples) * 1000, 1),
+            }
+            for fraction in self.PERCENTILES:
+                row[f'p{int(fraction * 100)}_ms'] = round(percentile(samples, fraction) * 1000, 1)
+            row['max_ms'] = round(samples[-1] * 1000, 1)
+            rows.append(row)
+        return rows
+
+    def format_table(self):
+        """Render the summary as a fixed-width text table"""
+        rows = self.summary()
+        columns = ['step', 'count', 'errors', 'rps', 'mean_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms']
+        widths = {
+            column: max([len(column)] + [len(str(row[column])) for row in rows])
+            for column in columns
+        }
+        lines = ['  '.join(column.rjust(widths[column]) if column != 'step' else column.ljust(widths[column])
+                           for column in columns)]
+        for row in rows:
+            lines.append('  '.join(
+                str(row[column]).ljust(widths[column]) if column == 'step' else str(row[column]).rjust(widths[column])
+                for column in columns
+            ))
+        return '\n'.join(lines)
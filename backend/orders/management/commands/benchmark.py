@@ -0,0 +1,91 @@
+"""
+Run the micro-benchmark suite and compare it with the stored baseline.
+
+    python manage.py benchmark                      # run everything, compare with benchmarks/baseline.json
+    python manage.py benchmark --filter Analytics   # only matching cases
+    python manage.py benchmark --save               # store the results as the new baseline
+    python manage.py benchmark --filter search --orders 2000000   # order search at production scale
+
+The suite runs against a throwaway test database seeded with
+generate_load_data, never against the configured database's data.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, setup_test_environment, teardown_test_environment
+from django.conf import settings
+
+from benchmarks import cases  # noqa: F401 (registers the cases)
+from benchmarks.fixtures import BenchmarkData
+from benchmarks.runner import (
+    DEFAULT_BASELINE, REGRESSIONS, compare, environment, format_comparison,
+    load_baseline, measure, registry, save_baseline
+)
+
+
+class Command(BaseCommand):
+    help = 'Time serializers, services and image/PDF hot paths and compare with the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filter', type=str, default='', help='Only run cases whose name contains this')
+        parser.add_argument('--list', action='store_true', help='List the cases and exit')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+        parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timed run')
+        parser.add_argument('--orders', type=int, default=2000, help='Orders seeded for the analytics cases')
+        parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE, help='Baseline JSON file')
+        parser.add_argument('--save', action='store_true', help='Write the results to the baseline file')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='Relative change of the median reported as slower/faster (0.1 = 10%%)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if a case got slower or runs more queries than the baseline'
+        )
+
+    def handle(self, *args, **options):
+        selected = [case for case in registry if options['filter'].lower() in case.name.lower()]
+        if options['list']:
+            for case in selected:
+                self.stdout.write(case.name)
+            return
+        if not selected:
+            raise CommandError(f'No benchmark matches "{options["filter"]}"')
+
+        setup_test_environment()
+        test_runner = get_runner(settings)(verbosity=0, interactive=False)
+        old_config = test_runner.setup_databases()
+        try:
+            results = self.run_cases(selected, options)
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        baseline = load_baseline(options['baseline'])
+        if baseline and baseline['environment'] != environment():
+            self.stdout.write(self.style.WARNING(
+                f'Baseline was recorded on {baseline["environment"]}, '
+                f'this run on {environment()}; timings are not comparable'
+            ))
+        rows = compare(results, baseline, options['threshold'])
+        self.stdout.write('\n' + format_comparison(rows))
+
+        if options['save']:
+            save_baseline(options['baseline'], results, baseline)
+            self.stdout.write(self.style.SUCCESS(f'\nSaved baseline to {options["baseline"]}'))
+
+        regressions = [row['name'] for row in rows if row['verdict'] in REGRESSIONS]
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regressions: {", ".join(regressions)}')
+
+    def run_cases(self, selected, options):
+        self.stdout.write(f'Seeding {options["orders"]} orders...')
+        started = time.monotonic()
+        data = BenchmarkData(orders=options['orders'])
+        self.stdout.write(f'Seeded in {time.monotonic() - started:.1f}s, running {len(selected)} cases')
+
+        results = {}
+        for case in selected:
+            results[case.name] = measure(case.prepare(data), options['repeat'], options['min_time'])
+            self.stdout.write(f'  {case.name}: {results[case.name]["median_ms"]:.3f} ms')
+        return results
@@ -0,0 +1,550 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from PIL import Image
+
+from authentication.models import CustomUser
+from cart.models import Cart, CartItem
+from products.models import (
+    Package, PackageItem, Campaign, ProductImage, ResourceFieldDefinition, ChecklistTemplateItem
+)
+from orders.models import (
+    Order, OrderItem, OrderResource, DynamicResourceSubmission, PaymentHistory,
+    OrderChecklist, ChecklistItem
+)
+from admin_panel.models import Notification
+
+
+# Directory under SECURE_MEDIA_ROOT (where the file fields' storage is
+# rooted) holding the generated image files, one subdirectory per prefix
+LOAD_DATA_DIR = 'load_data'
+
+# Share of generated orders in each status
+STATUS_WEIGHTS = {
+    'pending_payment': 10,
+    'pending_resources': 10,
+    'ready_for_processing': 10,
+    'assigned': 15,
+    'in_progress': 20,
+    'completed': 35,
+}
+PAID_STATUSES = {'pending_resources', 'ready_for_processing', 'assigned', 'in_progress', 'completed'}
+UPLOADED_STATUSES = {'ready_for_processing', 'assigned', 'in_progress', 'completed'}
+ASSIGNED_STATUSES = {'assigned', 'in_progress', 'completed'}
+
+# Fraction of checklist items completed, by order status
+CHECKLIST_COMPLETION = {
+    'assigned': (0.0, 0.3),
+    'in_progress': (0.3, 0.9),
+    'completed': (1.0, 1.0),
+}
+
+PACKAGE_ITEM_NAMES = [
+    'Posters (A3 size)', 'Pamphlets', 'Banners (6x4 ft)', 'Stickers',
+    'Social Media Campaign', 'WhatsApp Campaign', 'Video Campaign', 'Door-to-Door Support',
+]
+CHECKLIST_TASKS = [
+    'Collect candidate details', 'Design artwork', 'Customer approval', 'Print materials',
+    'Schedule campaign', 'Quality check', 'Dispatch', 'Share completion report',
+]
+SLOGANS = ['Vote for progress', 'Your ward, your voice', 'Development for all', 'Clean ward, green ward']
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create store the given created/updated timestamps instead of now()"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate large, deterministic volumes of users, products, carts, orders in every status, '
+        'order items, resources, payments, checklists and notifications with bulk inserts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+        parser.add_argument('--users', type=int, default=10000, help='Number of customers')
+        parser.add_argument('--staff', type=int, default=25, help='Number of staff members')
+        parser.add_argument('--admins', type=int, default=2, help='Number of admins')
+        parser.add_argument('--products', type=int, default=20, help='Number of packages and of campaigns')
+        parser.add_argument('--orders', type=int, default=100000, help='Number of orders')
+        parser.add_argument('--max-items', type=int, default=4, help='Maximum items per order')
+        parser.add_argument('--cart-ratio', type=float, default=0.3, help='Share of customers with a cart')
+        parser.add_argument('--days', type=int, default=120, help='Spread orders over this many days')
+        parser.add_argument(
+            '--end-date', type=str, default=None,
+            help='Date of the newest generated rows, YYYY-MM-DD (default: today)'
+        )
+        parser.add_argument('--images', type=int, default=12, help='Number of dummy image files to write')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Orders inserted per transaction')
+        parser.add_argument('--prefix', type=str, default='load', help='Prefix of generated usernames and products')
+        parser.add_argument('--clear', action='store_true', help='Delete data generated with this prefix first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.seed = options['seed']
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.counts = {}
+        started = time.monotonic()
+
+        if options['end_date']:
+            end_date = datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+        else:
+            end_date = timezone.localdate()
+        self.end = timezone.make_aware(datetime.combine(end_date, dt_time(18, 0)))
+        self.start = self.end - timedelta(days=options['days'])
+
+        if options['clear']:
+            self.clear()
+        elif CustomUser.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(f'Data with prefix "{self.prefix}" exists; use --clear or another --prefix')
+
+        self.stdout.write(f'Generating load data with seed {self.seed}...')
+        image_names = self.write_images(options['images'])
+        customers, staff, admins = self.create_users(options['users'], options['staff'], options['admins'])
+        products = self.create_products(options['products'], image_names)
+        self.create_carts(customers, products, options['cart_ratio'])
+        self.create_orders(
+            options['orders'], options['max_items'], customers, staff, admins, products, image_names
+        )
+        self.update_order_counts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nLoad data generated in {time.monotonic() - started:.1f}s'
+        ))
+        for name, count in self.counts.items():
+            self.stdout.write(f'  {name}: {count}')
+
+    def count(self, name, rows):
+        self.counts[name] = self.counts.get(name, 0) + rows
+
+    def random_time(self, after=None):
+        """Random moment between `after` (or the start of the period) and the end"""
+        after = after or self.start
+        span = (self.end - after).total_seconds()
+        return after + timedelta(seconds=self.rng.uniform(0, max(span, 0)))
+
+    def image_storage(self):
+        """Plain storage for the prefix's image files; the secure storage would randomize their names"""
+        return FileSystemStorage(location=os.path.join(settings.SECURE_MEDIA_ROOT, LOAD_DATA_DIR, self.prefix))
+
+    def clear(self):
+        """Delete previously generated data and image files for the prefix"""
+        self.stdout.write(f'Deleting data with prefix "{self.prefix}"...')
+        users = CustomUser.objects.filter(username__startswith=f'{self.prefix}_')
+        # Orders go first: checklist items and resource submissions protect the product rows
+        self.delete_orders(Order.objects.filter(user__in=users))
+        CartItem.objects.filter(cart__user__in=users)._raw_delete(CartItem.objects.db)
+        Cart.objects.filter(user__in=users)._raw_delete(Cart.objects.db)
+        product_names = f'[{self.prefix}] '
+        for model in (Package, Campaign):
+            product_ids = list(model.objects.filter(name__startswith=product_names).values_list('id', flat=True))
+            content_type = ContentType.objects.get_for_model(model)
+            for related in (ProductImage, ResourceFieldDefinition, ChecklistTemplateItem, CartItem):
+                related.objects.filter(content_type=content_type, object_id__in=product_ids).delete()
+            model.objects.filter(id__in=product_ids).delete()
+        users.delete()
+
+        storage = self.image_storage()
+        if storage.exists(''):
+            for name in storage.listdir('')[1]:
+                storage.delete(name)
+
+    def delete_orders(self, orders):
+        """
+        Delete orders and the rows hanging off them in batches with plain
+        DELETE statements, without loading them into the deletion collector
+        """
+        order_ids = list(orders.values_list('id', flat=True))
+        for start in range(0, len(order_ids), self.batch_size):
+            batch = order_ids[start:start + self.batch_size]
+            with transaction.atomic():
+                for queryset in (
+                    DynamicResourceSubmission.objects.filter(order_item__order_id__in=batch),
+                    OrderResource.objects.filter(order_item__order_id__in=batch),
+                    OrderItem.objects.filter(order_id__in=batch),
+                    ChecklistItem.objects.filter(checklist__order_id__in=batch),
+                    OrderChecklist.objects.filter(order_id__in=batch),
+                    PaymentHistory.objects.filter(order_id__in=batch),
+                    Notification.objects.filter(order_id__in=batch),
+                    Order.objects.filter(id__in=batch),
+                ):
+                    queryset._raw_delete(queryset.db)
+
+    def write_images(self, count):
+        """
+        Write small JPEG files referenced by every generated image and file
+        field. File names depend only on the prefix, seed and index, so the
+        same seed writes the same files.
+        """
+        storage = self.image_storage()
+        names = []
+        for index in range(count):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            buffer = BytesIO()
+            Image.new('RGB', (64, 64), color).save(buffer, format='JPEG')
+            name = f'{self.seed}-{index}.jpg'
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(f'{LOAD_DATA_DIR}/{self.prefix}/{name}')
+        self.count('image files', len(names))
+        return names or [f'{LOAD_DATA_DIR}/missing.jpg']
+
+    def create_users(self, customer_count, staff_count, admin_count):
+        """Create customers, staff and admins sharing one password hash"""
+        password = make_password(f'{self.prefix}123')
+        roles = [('admin', admin_count), ('staff', staff_count), ('user', customer_count)]
+        users = []
+        index = 0
+        for role, count in roles:
+            for _ in range(count):
+                index += 1
+                joined = self.random_time()
+                users.append(CustomUser(
+                    username=f'{self.prefix}_{role}_{index:07d}',
+                    phone_number=f'+9{self.seed % 100:02d}{index:09d}',
+                    first_name=f'{role.title()}{index}',
+                    password=password,
+                    role=role,
+                    is_staff=role == 'admin',
+                    created_at=joined,
+                    updated_at=joined,
+                    date_joined=joined
+                ))
+
+        with explicit_timestamps(CustomUser):
+            CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        self.count('users', len(users))
+
+        admins = [user for user in users if user.role == 'admin']
+        staff = [user for user in users if user.role == 'staff']
+        customers = [user for user in users if user.role == 'user']
+        if not customers:
+            raise CommandError('At least one customer is needed')
+        return customers, staff, admins
+
+    def create_products(self, count, image_names):
+        """
+        Create packages and campaigns with package items, images, resource
+        fields and checklist templates. Returns a list of product dicts.
+        """
+        packages = [
+            Package(
+                name=f'[{self.prefix}] Package {index}',
+                price=Decimal(self.rng.choice([1000, 5000, 18500, 35000])),
+                description=f'Generated package {index}',
+                features=['Design', 'Printing', 'Delivery'],
+                deliverables=['Posters', 'Pamphlets']
+            )
+            for index in range(count)
+        ]
+        campaigns = [
+            Campaign(
+                name=f'[{self.prefix}] Campaign {index}',
+                price=Decimal(self.rng.choice([8000, 10000, 12000, 15000])),
+                unit='Per Ward',
+                description=f'Generated campaign {index}'
+            )
+            for index in range(count)
+        ]
+        Package.objects.bulk_create(packages)
+        Campaign.objects.bulk_create(campaigns)
+
+        PackageItem.objects.bulk_create([
+            PackageItem(package=package, name=name, quantity=self.rng.choice([1, 50, 100, 500]))
+            for package in packages
+            for name in self.rng.sample(PACKAGE_ITEM_NAMES, self.rng.randint(3, 6))
+        ])
+
+        products = []
+        images = []
+        fields = []
+        templates = []
+        for product_list, model in ((packages, Package), (campaigns, Campaign)):
+            content_type = ContentType.objects.get_for_model(model)
+            for product in product_list:
+                for position in range(self.rng.randint(1, 4)):
+                    image_name = self.rng.choice(image_names)
+                    images.append(ProductImage(
+                        content_type=content_type, object_id=product.id,
+                        image=image_name, thumbnail=image_name,
+                        is_primary=position == 0, order=position
+                    ))
+                product_fields = [
+                    ResourceFieldDefinition(
+                        content_type=content_type, object_id=product.id,
+                        field_name='Campaign slogan', field_type='text', order=0, max_length=200
+                    ),
+                    ResourceFieldDefinition(
+                        content_type=content_type, object_id=product.id,
+                        field_name='Candidate photo', field_type='image', order=1, max_file_size_mb=5
+                    ),
+                ]
+                product_templates = [
+                    ChecklistTemplateItem(
+                        content_type=content_type, object_id=product.id,
+                        name=name, description=name, order=position,
+                        is_optional=self.rng.random() < 0.2,
+                        estimated_duration_minutes=self.rng.choice([None, 15, 30, 60, 120])
+                    )
+                    for position, name in enumerate(self.rng.sample(CHECKLIST_TASKS, self.rng.randint(3, 6)))
+                ]
+                fields.extend(product_fields)
+                templates.extend(product_templates)
+                products.append({
+                    'product': product,
+                    'content_type': content_type,
+                    'fields': product_fields,
+                    'templates': product_templates,
+                })
+
+        ProductImage.objects.bulk_create(images)
+        ResourceFieldDefinition.objects.bulk_create(fields)
+        ChecklistTemplateItem.objects.bulk_create(templates)
+        self.count('products', len(products))
+        self.count('product images', len(images))
+        return products
+
+    def create_carts(self, customers, products, cart_ratio):
+        """Give a share of the customers a cart with a few items"""
+        owners = [customer for customer in customers if self.rng.random() < cart_ratio]
+        carts = []
+        for owner in owners:
+            created = self.random_time(owner.created_at)
+            carts.append(Cart(user=owner, created_at=created, updated_at=created))
+        with explicit_timestamps(Cart, CartItem):
+            Cart.objects.bulk_create(carts, batch_size=self.batch_size)
+            cart_items = [
+                CartItem(
+                    cart=cart,
+                    content_type=entry['content_type'],
+                    object_id=entry['product'].id,
+                    quantity=self.rng.randint(1, 3),
+                    added_at=cart.created_at
+                )
+                for cart in carts
+                for entry in self.rng.sample(products, min(len(products), self.rng.randint(1, 3)))
+            ]
+            CartItem.objects.bulk_create(cart_items, batch_size=self.batch_size)
+        self.count('carts', len(carts))
+        self.count('cart items', len(cart_items))
+
+    def create_orders(self, count, max_items, customers, staff, admins, products, image_names):
+        """Create orders and everything hanging off them in batches"""
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        if not staff:
+            # Without staff nothing can be assigned
+            weights = [0 if status in ASSIGNED_STATUSES else weight for status, weight in STATUS_WEIGHTS.items()]
+
+        created = 0
+        while created < count:
+            size = min(self.batch_size, count - created)
+            with transaction.atomic(), explicit_timestamps(
+                Order, OrderResource, DynamicResourceSubmission, PaymentHistory, OrderChecklist, Notification
+            ):
+                self.create_order_batch(
+                    created, size, max_items, statuses, weights, customers, staff, admins, products, image_names
+                )
+            created += size
+            self.stdout.write(f'  {created}/{count} orders')
+
+    def create_order_batch(self, offset, size, max_items, statuses, weights, customers, staff, admins,
+                           products, image_names):
+        rng = self.rng
+        orders = []
+        order_products = []
+        for index in range(offset, offset + size):
+            customer = rng.choice(customers)
+            status = rng.choices(statuses, weights)[0]
+            created_at = self.random_time(customer.created_at)
+            entries = rng.sample(products, min(len(products), rng.randint(1, max_items)))
+            quantities = [rng.randint(1, 3) for _ in entries]
+            order_number = f'LD-{self.seed}-{index:09d}'
+            paid_at = created_at + timedelta(minutes=rng.randint(1, 90)) if status in PAID_STATUSES else None
+            orders.append(Order(
+                user=customer,
+                order_number=order_number,
+                total_amount=sum(entry['product'].price * quantity for entry, quantity in zip(entries, quantities)),
+                status=status,
+                razorpay_order_id=f'order_{self.prefix}{index:09d}',
+                razorpay_payment_id=f'pay_{self.prefix}{index:09d}' if paid_at else None,
+                payment_completed_at=paid_at,
+                assigned_to=rng.choice(staff) if status in ASSIGNED_STATUSES else None,
+                created_at=created_at,
+                updated_at=self.random_time(paid_at or created_at),
+                search_text=' '.join(
+                    [order_number, customer.phone_number, customer.username]
+                    + [entry['product'].name for entry in entries]
+                ).lower()
+            ))
+            order_products.append(list(zip(entries, quantities)))
+        Order.objects.bulk_create(orders)
+
+        items = []
+        for order, entries in zip(orders, order_products):
+            for entry, quantity in entries:
+                item = OrderItem(
+                    order=order,
+                    content_type=entry['content_type'],
+                    object_id=entry['product'].id,
+                    quantity=quantity,
+                    price=entry['product'].price,
+                    resources_uploaded=order.status in UPLOADED_STATUSES
+                )
+                item.entry = entry
+                items.append(item)
+        OrderItem.objects.bulk_create(items)
+
+        resources = []
+        submissions = []
+        for item in items:
+            if not item.resources_uploaded:
+                continue
+            uploaded_at = item.order.payment_completed_at + timedelta(hours=rng.randint(1, 48))
+            resources.append(OrderResource(
+                order_item=item,
+                candidate_photo=rng.choice(image_names),
+                party_logo=rng.choice(image_names),
+                campaign_slogan=rng.choice(SLOGANS),
+                preferred_date=(uploaded_at + timedelta(days=rng.randint(3, 30))).date(),
+                whatsapp_number=item.order.user.phone_number[-10:],
+                uploaded_at=uploaded_at
+            ))
+            for field in item.entry['fields']:
+                submissions.append(DynamicResourceSubmission(
+                    order_item=item,
+                    field_definition=field,
+                    text_value=rng.choice(SLOGANS) if field.field_type == 'text' else None,
+                    file_value=rng.choice(image_names) if field.field_type == 'image' else None,
+                    uploaded_at=uploaded_at
+                ))
+        OrderResource.objects.bulk_create(resources)
+        DynamicResourceSubmission.objects.bulk_create(submissions)
+
+        payments = [
+            PaymentHistory(
+                order=order,
+                transaction_id=order.razorpay_payment_id,
+                amount=order.total_amount,
+                status='completed',
+                payment_date=order.payment_completed_at,
+                invoice_number=f'INV-{order.order_number}',
+                metadata={'razorpay_order_id': order.razorpay_order_id, 'generated': True},
+                created_at=order.payment_completed_at,
+                updated_at=order.payment_completed_at
+            )
+            for order in orders if order.payment_completed_at
+        ]
+        PaymentHistory.objects.bulk_create(payments)
+
+        checklists = []
+        checklist_items = []
+        for order, entries in zip(orders, order_products):
+            if order.status not in ASSIGNED_STATUSES:
+                continue
+            checklist = OrderChecklist(order=order, created_at=order.updated_at)
+            templates = [template for entry, _ in entries for template in entry['templates']]
+            low, high = CHECKLIST_COMPLETION[order.status]
+            done = round(len(templates) * rng.uniform(low, high))
+            new_items = [
+                ChecklistItem(
+                    checklist=checklist,
+                    template_item=template,
+                    description=template.name,
+                    completed=position < done,
+                    completed_at=order.updated_at if position < done else None,
+                    completed_by=order.assigned_to if position < done else None,
+                    order_index=position,
+                    is_optional=template.is_optional
+                )
+                for position, template in enumerate(templates)
+            ]
+            # Counters are normally maintained by ChecklistItem.save()
+            checklist.total_items = len(new_items)
+            checklist.required_items = sum(1 for item in new_items if not item.is_optional)
+            checklist.completed_items = sum(1 for item in new_items if item.completed)
+            checklist.completed_required = sum(1 for item in new_items if item.completed and not item.is_optional)
+            checklists.append(checklist)
+            checklist_items.extend(new_items)
+        OrderChecklist.objects.bulk_create(checklists)
+        ChecklistItem.objects.bulk_create(checklist_items)
+
+        notifications = []
+        for order in orders:
+            if order.payment_completed_at:
+                notifications.extend(
+                    Notification(
+                        user=admin, order=order, notification_type='new_order',
+                        title='New Order Received', message=f'Order {order.order_number} was paid',
+                        is_read=rng.random() < 0.8, created_at=order.payment_completed_at
+                    )
+                    for admin in admins
+                )
+            if order.assigned_to is not None:
+                notifications.append(Notification(
+                    user=order.assigned_to, order=order, notification_type='order_assigned',
+                    title='New Order Assigned', message=f'Order {order.order_number} has been assigned to you',
+                    is_read=order.status != 'assigned', created_at=order.updated_at
+                ))
+            if order.status == 'completed':
+                notifications.extend(
+                    Notification(
+                        user=admin, order=order, notification_type='order_completed',
+                        title='Order Completed', message=f'Order {order.order_number} has been completed',
+                        is_read=rng.random() < 0.5, created_at=order.updated_at
+                    )
+                    for admin in admins
+                )
+        Notification.objects.bulk_create(notifications)
+
+        self.count('orders', len(orders))
+        self.count('order items', len(items))
+        self.count('order resources', len(resources))
+        self.count('dynamic resource submissions', len(submissions))
+        self.count('payment histories', len(payments))
+        self.count('checklists', len(checklists))
+        self.count('checklist items', len(checklist_items))
+        self.count('notifications', len(notifications))
+
+    def update_order_counts(self):
+        """Set the denormalized order count of generated customers in one statement"""
+        order_counts = (
+            Order.objects.filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+        CustomUser.objects.filter(username__startswith=f'{self.prefix}_').update(
+            order_count=Coalesce(Subquery(order_counts), Value(0))
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.25 on 2026-10-18 22:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_checklist_counters(apps, schema_editor):
+    """Populate the progress counters of existing checklists in one UPDATE"""
+    OrderChecklist = apps.get_model('orders', 'OrderChecklist')
+    ChecklistItem = apps.get_model('orders', 'ChecklistItem')
+
+    def count_items(condition=Q()):
+        items = (
+            ChecklistItem.objects.filter(condition, checklist=OuterRef('pk'))
+            .order_by()
+            .values('checklist')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return Coalesce(Subquery(items), 0)
+
+    OrderChecklist.objects.update(
+        total_items=count_items(),
+        required_items=count_items(Q(is_optional=False)),
+        completed_items=count_items(Q(completed=True)),
+        completed_required=count_items(Q(completed=True, is_optional=False)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_paymenthistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderchecklist',
+            name='completed_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orderchecklist',
+            name='completed_required',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orderchecklist',
+            name='required_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orderchecklist',
+            name='total_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_checklist_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.25 on 2026-10-18 22:59
+
+from collections import defaultdict
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_search_text(apps, schema_editor):
+    """Build the search text of existing orders in batches"""
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    product_names = {}
+    for content_type in ContentType.objects.filter(app_label='products', model__in=['package', 'campaign']):
+        model = apps.get_model('products', content_type.model)
+        for product_id, name in model.objects.values_list('id', 'name'):
+            product_names[(content_type.id, product_id)] = name
+
+    last_id = 0
+    while True:
+        orders = list(Order.objects.filter(id__gt=last_id).select_related('user').order_by('id')[:BATCH_SIZE])
+        if not orders:
+            break
+        last_id = orders[-1].id
+
+        item_names = defaultdict(list)
+        items = OrderItem.objects.filter(order__in=orders).values_list('order_id', 'content_type_id', 'object_id')
+        for order_id, content_type_id, object_id in items:
+            name = product_names.get((content_type_id, object_id))
+            if name:
+                item_names[order_id].append(name)
+
+        for order in orders:
+            parts = [order.order_number, order.user.phone_number, order.user.username] + item_names[order.id]
+            order.search_text = ' '.join(part for part in parts if part).lower()
+        Order.objects.bulk_update(orders, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    """Trigram index for partial matches on the search text (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS orders_order_search_text_trgm '
+        'ON orders_order USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS orders_order_search_text_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_checklist_counters'),
+        ('products', '0009_product_listing_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
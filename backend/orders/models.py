@@ -1,8 +1,13 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from authentication.models import CustomUser
+from authentication.cache_utils import forget_cached_user
 import uuid
 from datetime import datetime
 import os
@@ -15,6 +20,31 @@ def generate_order_number():
     return f"EC-{date_str}-{unique_id}"
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_product(self, product):
+        """Orders with an item of `product` (a Package or Campaign)"""
+        return self.filter(pk__in=OrderItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(product),
+            object_id=product.pk
+        ).values('order_id'))
+    
+    def refresh_search_text(self, batch_size=500):
+        """
+        Rebuild the denormalized search text of the orders in this queryset,
+        `batch_size` orders at a time. Returns the number of orders updated.
+        """
+        order_ids = list(self.values_list('pk', flat=True))
+        for start in range(0, len(order_ids), batch_size):
+            orders = list(
+                Order.objects.filter(pk__in=order_ids[start:start + batch_size])
+                .select_related('user').prefetch_related('items__content_object')
+            )
+            for order in orders:
+                order.search_text = order.build_search_text()
+            Order.objects.bulk_update(orders, ['search_text'])
+        return len(order_ids)
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending_payment', 'Pending Payment'),
@@ -25,7 +55,8 @@ class Order(models.Model):
         ('completed', 'Completed'),
     ]
     
-    user = models.ForeignKey(CustomUser, related_name='orders', on_delete=models.CASCADE)
+    # Served by the composite indexes in Meta, which lead with these columns
+    user = models.ForeignKey(CustomUser, related_name='orders', on_delete=models.CASCADE, db_index=False)
     order_number = models.CharField(max_length=50, unique=True, default=generate_order_number)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending_payment')
@@ -38,16 +69,82 @@ class Order(models.Model):
         related_name='assigned_orders', 
         on_delete=models.SET_NULL, 
         blank=True, 
-        null=True
+        null=True,
+        db_index=False
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    
+    # Lower-cased order number, customer phone/username and product names,
+    # trigram-indexed on PostgreSQL for the admin order search
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Admin order list, newest first, optionally by status
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # Customer order history
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            # Staff order lists and workload counts
+            models.Index(fields=['assigned_to', 'status', '-created_at'], name='order_staff_status_idx'),
+            # Revenue analytics only look at paid orders
+            models.Index(
+                fields=['payment_completed_at', 'status'],
+                name='order_paid_idx',
+                condition=models.Q(payment_completed_at__isnull=False)
+            ),
+            # Orders waiting for assignment, oldest first
+            models.Index(
+                fields=['created_at'],
+                name='order_ready_unassigned_idx',
+                condition=models.Q(status='ready_for_processing', assigned_to__isnull=True)
+            ),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number}"
     
+    def build_search_text(self, include_items=True):
+        """Build the text the admin order search matches against"""
+        parts = [self.order_number, self.user.phone_number, self.user.username]
+        if include_items:
+            parts.extend(
+                item.content_object.name
+                for item in self.items.all()
+                if item.content_object is not None
+            )
+        return ' '.join(part for part in parts if part).lower()
+    
+    def save(self, *args, **kwargs):
+        """Save the order and count new orders on the customer"""
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        
+        # Items are added to the search text as they are created
+        self.search_text = self.build_search_text(include_items=False)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            CustomUser.objects.filter(pk=self.user_id).update(order_count=F('order_count') + 1)
+        forget_cached_user(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        """Delete the order and remove it from the customer's order count"""
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            CustomUser.objects.filter(pk=self.user_id, order_count__gt=0).update(order_count=F('order_count') - 1)
+        forget_cached_user(self.user_id)
+        return result
+    
+    def _items_prefetched(self):
+        """Whether items were loaded with prefetch_related('items')"""
+        return 'items' in getattr(self, '_prefetched_objects_cache', {})
+    
     def get_total_items(self):
         """Get total number of items in order"""
+        # count() reuses prefetched items
         return self.items.count()
     
     def all_resources_uploaded(self):
@@ -60,29 +157,58 @@ class Order(models.Model):
         if total_items == 0:
             return 100
         
-        uploaded_items = self.items.filter(resources_uploaded=True).count()
+        if self._items_prefetched():
+            uploaded_items = sum(1 for item in self.items.all() if item.resources_uploaded)
+        else:
+            uploaded_items = self.items.filter(resources_uploaded=True).count()
         return int((uploaded_items / total_items) * 100)
     
     def get_pending_resource_items(self):
         """Get list of order items that still need resources"""
+        if self._items_prefetched():
+            return [item for item in self.items.all() if not item.resources_uploaded]
         return self.items.filter(resources_uploaded=False)
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    # Served by orderitem_product_idx
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, db_index=False)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
     quantity = models.IntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     resources_uploaded = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Product sales aggregations and lookups by product
+            models.Index(fields=['content_type', 'object_id'], name='orderitem_product_idx'),
+        ]
+
     def __str__(self):
         return f"{self.content_object} x{self.quantity}"
     
     def get_subtotal(self):
         """Calculate subtotal for this order item"""
         return self.price * self.quantity
+    
+    def save(self, *args, **kwargs):
+        """Save the item and add its product name to the order's search text"""
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        
+        product = self.content_object
+        if adding and product is not None:
+            Order.objects.filter(pk=self.order_id).update(
+                search_text=Concat(F('search_text'), Value(f' {product.name.lower()}'))
+            )
+    
+    def delete(self, *args, **kwargs):
+        """Delete the item and drop its product name from the order's search text"""
+        result = super().delete(*args, **kwargs)
+        Order.objects.filter(pk=self.order_id).refresh_search_text()
+        return result
 
 
 def validate_image_file(file):
@@ -155,10 +281,115 @@ class DynamicResourceSubmission(models.Model):
 
 class OrderChecklist(models.Model):
     order = models.OneToOneField(Order, related_name='checklist', on_delete=models.CASCADE)
+    
+    # Denormalized progress counters, kept in sync by ChecklistItem so progress
+    # can be read without counting the items
+    total_items = models.PositiveIntegerField(default=0)
+    required_items = models.PositiveIntegerField(default=0)
+    completed_items = models.PositiveIntegerField(default=0)
+    completed_required = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(auto_now_add=True)
 
+    COUNTER_FIELDS = ('total_items', 'required_items', 'completed_items', 'completed_required')
+
     def __str__(self):
         return f"Checklist for {self.order.order_number}"
+    
+    @staticmethod
+    def add_to_counters(checklist_id, deltas):
+        """
+        Atomically add deltas to the progress counters of a checklist.
+        
+        Args:
+            checklist_id: ID of the checklist to update
+            deltas: dict mapping counter field names to increments
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            OrderChecklist.objects.filter(pk=checklist_id).update(
+                **{field: F(field) + delta for field, delta in deltas.items()}
+            )
+        return deltas
+    
+    def refresh_counters(self):
+        """Reload the progress counters from the database"""
+        self.refresh_from_db(fields=self.COUNTER_FIELDS)
+
+
+class ChecklistItemQuerySet(models.QuerySet):
+    """
+    Checklist item writes that keep the checklist progress counters in step.
+    
+    update() refuses to change the counted fields; use set_completed() or
+    ChecklistItem.save(). delete() removes the deleted items from the
+    counters. bulk_create() does not count the new items, so callers seed
+    the counters themselves (see ChecklistService.generate_checklists_for_orders).
+    """
+    COUNTED_FIELDS = {'completed', 'is_optional'}
+    
+    def update(self, **kwargs):
+        counted = self.COUNTED_FIELDS & set(kwargs)
+        if counted:
+            raise TypeError(
+                f'update() cannot change {", ".join(sorted(counted))}; use set_completed() or save() '
+                'so the checklist progress counters stay in step'
+            )
+        return super().update(**kwargs)
+    
+    def _update_counted(self, **kwargs):
+        """update() for callers that adjust the counters themselves"""
+        return super().update(**kwargs)
+    
+    def set_completed(self, completed, user=None):
+        """
+        Mark the items complete or incomplete.
+        
+        Only items whose state changes are locked, written and counted, so
+        concurrent changes to the same items are counted once. Returns the
+        number of items that changed.
+        """
+        completed = bool(completed)
+        step = 1 if completed else -1
+        
+        with transaction.atomic():
+            changed = list(
+                self.filter(completed=not completed).select_for_update()
+                .values_list('pk', 'checklist_id', 'is_optional')
+            )
+            if not changed:
+                return 0
+            ChecklistItem.objects.filter(pk__in=[pk for pk, _, _ in changed])._update_counted(
+                completed=completed,
+                completed_at=timezone.now() if completed else None,
+                completed_by=user if completed else None
+            )
+            
+            deltas = defaultdict(lambda: dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0))
+            for _, checklist_id, is_optional in changed:
+                deltas[checklist_id]['completed_items'] += step
+                if not is_optional:
+                    deltas[checklist_id]['completed_required'] += step
+            for checklist_id, checklist_deltas in deltas.items():
+                OrderChecklist.add_to_counters(checklist_id, checklist_deltas)
+        
+        return len(changed)
+    
+    def delete(self):
+        """Delete the items and remove them from their checklists' counters"""
+        with transaction.atomic():
+            deleted = list(self.select_for_update().values_list('checklist_id', 'completed', 'is_optional'))
+            result = super().delete()
+            
+            deltas = defaultdict(lambda: dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0))
+            for checklist_id, completed, is_optional in deleted:
+                contribution = ChecklistItem(completed=completed, is_optional=is_optional).counter_contribution()
+                for field, value in contribution.items():
+                    deltas[checklist_id][field] -= value
+            for checklist_id, checklist_deltas in deltas.items():
+                OrderChecklist.add_to_counters(checklist_id, checklist_deltas)
+        
+        return result
 
 
 class ChecklistItem(models.Model):
@@ -177,11 +408,69 @@ class ChecklistItem(models.Model):
     order_index = models.IntegerField()
     is_optional = models.BooleanField(default=False)
 
+    objects = ChecklistItemQuerySet.as_manager()
+
     class Meta:
         ordering = ['order_index']
 
     def __str__(self):
         return f"{self.description} - {'✓' if self.completed else '✗'}"
+    
+    def counter_contribution(self, completed=None, is_optional=None):
+        """Return what an item in the given state adds to its checklist's counters"""
+        completed = self.completed if completed is None else completed
+        is_optional = self.is_optional if is_optional is None else is_optional
+        return {
+            'total_items': 1,
+            'required_items': 0 if is_optional else 1,
+            'completed_items': 1 if completed else 0,
+            'completed_required': 1 if completed and not is_optional else 0,
+        }
+    
+    def _stored_contribution(self):
+        """
+        Contribution of this row as currently stored in the database. The
+        row is locked until the end of the transaction, so concurrent
+        changes to the item are counted one after the other.
+        """
+        if self._state.adding:
+            return dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0)
+        stored = ChecklistItem.objects.select_for_update().filter(pk=self.pk).values(
+            'completed', 'is_optional'
+        ).first()
+        if stored is None:
+            return dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0)
+        return self.counter_contribution(**stored)
+    
+    def _apply_counter_change(self, previous, current):
+        """Push the difference between two contributions to the checklist counters"""
+        deltas = OrderChecklist.add_to_counters(
+            self.checklist_id,
+            {field: current[field] - previous[field] for field in OrderChecklist.COUNTER_FIELDS}
+        )
+        # Keep an already loaded checklist instance in step with the database
+        if deltas and ChecklistItem.checklist.is_cached(self):
+            for field, delta in deltas.items():
+                setattr(self.checklist, field, getattr(self.checklist, field) + delta)
+    
+    def save(self, *args, **kwargs):
+        """Save the item and update the checklist progress counters"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not ChecklistItemQuerySet.COUNTED_FIELDS & set(update_fields):
+            return super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            previous = self._stored_contribution()
+            super().save(*args, **kwargs)
+            self._apply_counter_change(previous, self.counter_contribution())
+    
+    def delete(self, *args, **kwargs):
+        """Delete the item and remove it from the checklist progress counters"""
+        with transaction.atomic():
+            previous = self._stored_contribution()
+            result = super().delete(*args, **kwargs)
+            self._apply_counter_change(previous, dict.fromkeys(OrderChecklist.COUNTER_FIELDS, 0))
+        return result
 
 
 class PaymentHistory(models.Model):
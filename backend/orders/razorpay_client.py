@@ -2,6 +2,7 @@ import razorpay
 from django.conf import settings
 import hmac
 import hashlib
+from election_cart.metrics import observe_duration, razorpay_duration
 
 
 class RazorpayClient:
@@ -10,8 +11,12 @@ class RazorpayClient:
     """
     
     def __init__(self):
+        options = {}
+        if settings.RAZORPAY_BASE_URL:
+            options['base_url'] = settings.RAZORPAY_BASE_URL
         self.client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
+            **options
         )
     
     def create_order(self, amount, currency='INR', receipt=None):
@@ -33,7 +38,8 @@ class RazorpayClient:
             'payment_capture': 1  # Auto capture payment
         }
         
-        return self.client.order.create(data=data)
+        with observe_duration(razorpay_duration, operation='create_order'):
+            return self.client.order.create(data=data)
     
     def verify_payment_signature(self, razorpay_order_id, razorpay_payment_id, razorpay_signature):
         """
@@ -72,7 +78,8 @@ class RazorpayClient:
         Returns:
             dict: Payment details
         """
-        return self.client.payment.fetch(payment_id)
+        with observe_duration(razorpay_duration, operation='fetch_payment'):
+            return self.client.payment.fetch(payment_id)
     
     def fetch_order(self, order_id):
         """
@@ -84,7 +91,8 @@ class RazorpayClient:
         Returns:
             dict: Order details
         """
-        return self.client.order.fetch(order_id)
+        with observe_duration(razorpay_duration, operation='fetch_order'):
+            return self.client.order.fetch(order_id)
 
 
 # Singleton instance
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Order, OrderItem, OrderResource, OrderChecklist, ChecklistItem, DynamicResourceSubmission, PaymentHistory
-from products.serializers import PackageSerializer, CampaignSerializer
+from products.serializers import PackageSerializer, CampaignSerializer, ProductItemListSerializer
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -11,6 +11,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['id', 'item_type', 'item_details', 'quantity', 'price', 'subtotal', 'resources_uploaded']
+        list_serializer_class = ProductItemListSerializer
     
     def get_item_type(self, obj):
         """Return the type of item (package or campaign)"""
@@ -0,0 +1,87 @@
+"""
+Tests for the generate_load_data management command
+"""
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from authentication.models import CustomUser
+from cart.models import Cart
+from products.models import Package, Campaign
+from orders.models import Order, OrderItem, OrderResource, ChecklistItem, PaymentHistory
+from admin_panel.models import Notification
+
+
+class GenerateLoadDataTest(TestCase):
+    """Test that generated data is reproducible and fully removed by --clear"""
+
+    options = {
+        'seed': 3, 'users': 20, 'staff': 3, 'admins': 1, 'products': 2, 'orders': 40,
+        'images': 2, 'batch_size': 15, 'end_date': '2024-06-30', 'prefix': 'ldtest',
+    }
+
+    def setUp(self):
+        """Point the secure media root at a temporary directory"""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(SECURE_MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.image_dir = os.path.join(self.media_root, 'load_data', 'ldtest')
+
+    def generate(self, **options):
+        call_command('generate_load_data', stdout=StringIO(), **{**self.options, **options})
+
+    def snapshot(self):
+        """The generated rows and files without database ids"""
+        files = {}
+        for name in sorted(os.listdir(self.image_dir)):
+            with open(os.path.join(self.image_dir, name), 'rb') as handle:
+                files[name] = handle.read()
+        return {
+            'orders': list(Order.objects.order_by('order_number').values_list(
+                'order_number', 'status', 'total_amount', 'created_at', 'updated_at',
+                'user__username', 'assigned_to__username'
+            )),
+            'items': list(OrderItem.objects.order_by('order__order_number', 'object_id').values_list(
+                'order__order_number', 'quantity', 'price'
+            )),
+            'resources': list(OrderResource.objects.order_by('order_item__order__order_number', 'uploaded_at')
+                              .values_list('candidate_photo', 'campaign_slogan', 'uploaded_at')),
+            'checklist_items': ChecklistItem.objects.filter(completed=True).count(),
+            'notifications': Notification.objects.count(),
+            'files': files,
+        }
+
+    def test_same_seed_same_data(self):
+        """Test that two runs with the same seed generate identical rows and files"""
+        self.generate()
+        first = self.snapshot()
+
+        self.generate(clear=True)
+
+        self.assertEqual(self.snapshot(), first)
+        self.assertEqual(sorted(first['files']), ['3-0.jpg', '3-1.jpg'])
+        self.assertTrue(all(photo.startswith('load_data/ldtest/') for photo, _, _ in first['resources']))
+
+    def test_clear_leaves_nothing_behind(self):
+        """Test that --clear deletes every generated row and image file"""
+        self.generate()
+        self.assertGreater(Order.objects.count(), 0)
+
+        self.generate(clear=True, seed=4, users=1, staff=0, admins=0, products=0, orders=0, images=0,
+                      cart_ratio=0)
+
+        self.assertEqual(CustomUser.objects.filter(username__startswith='ldtest_').count(), 1)
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(OrderItem.objects.count(), 0)
+        self.assertEqual(PaymentHistory.objects.count(), 0)
+        self.assertEqual(ChecklistItem.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(Cart.objects.count(), 0)
+        self.assertEqual(Package.objects.count() + Campaign.objects.count(), 0)
+        self.assertEqual(os.listdir(self.image_dir), [])
@@ -0,0 +1,214 @@
+"""
+Query plan regression tests for hot Order/OrderItem queries.
+
+Each test EXPLAINs a query used by a hot endpoint and checks that the
+expected index reads the hot table with an index condition (or, for
+partial indexes, a bounded row estimate) and that neither orders_order nor
+orders_orderitem is read with a full table scan. On PostgreSQL sequential
+scans are disabled for most checks so the planner falls back to one only
+when no index can serve the query; the realistic checks keep the default
+planner settings on a table large enough for the index to win on cost.
+"""
+import json
+import re
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from admin_panel.assignment_service import AssignmentService
+from authentication.models import CustomUser
+from products.models import Package
+from orders.models import Order, OrderItem
+
+HOT_TABLES = {'orders_order', 'orders_orderitem'}
+PAID_STATUSES = ['ready_for_processing', 'assigned', 'in_progress', 'completed']
+CUSTOMERS = 50
+PACKAGES = 20
+ORDERS = 3000
+INDEX_NODES = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+
+
+def plan_scans(queryset, realistic=False):
+    """
+    Return the table and index reads of a queryset's plan as dicts with
+    'table', 'index' (None for a full scan), 'condition' (the index
+    condition, or None) and 'rows' (the planner's estimate, or None)
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL enable_seqscan = {'on' if realistic else 'off'}")
+        plan = json.loads(queryset.explain(format='json'))
+        scans = []
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan' or node['Node Type'] in INDEX_NODES:
+                scans.append({
+                    'table': node.get('Relation Name'),
+                    'index': node.get('Index Name'),
+                    'condition': node.get('Index Cond'),
+                    'rows': node['Plan Rows'],
+                })
+            nodes.extend(node.get('Plans', []))
+        return scans
+
+    if connection.vendor == 'sqlite':
+        # "SEARCH table USING INDEX name (condition)"; "SCAN table" without
+        # an index is a full table scan
+        pattern = r'(SCAN|SEARCH) (\w+)(?: USING (?:COVERING )?INDEX (\w+))?(?: \((.*)\))?\s*$'
+        return [
+            {'table': table, 'index': index or None, 'condition': condition or None, 'rows': None}
+            for _, table, index, condition in re.findall(pattern, queryset.explain(), re.MULTILINE)
+        ]
+
+    return []
+
+
+class HotQueryPlanTest(TestCase):
+    """Test that hot order queries are served by indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed orders across customers, staff and statuses"""
+        cls.staff = CustomUser.objects.create_user(
+            username='staff', phone_number='9000000001', password='testpass123', role='staff'
+        )
+        password = make_password('testpass123')
+        customers = CustomUser.objects.bulk_create([
+            CustomUser(username=f'customer{index}', phone_number=f'91{index:08d}', password=password, role='user')
+            for index in range(CUSTOMERS)
+        ])
+        cls.customer = customers[0]
+        packages = Package.objects.bulk_create([
+            Package(name=f'Kit {index}', price=Decimal('100.00'), description='Kit')
+            for index in range(PACKAGES)
+        ])
+        cls.package = packages[0]
+        cls.package_ct = ContentType.objects.get_for_model(Package)
+
+        now = timezone.now()
+        statuses = [status for status, _ in Order.STATUS_CHOICES]
+        orders = []
+        for index in range(ORDERS):
+            status = statuses[index % len(statuses)]
+            orders.append(Order(
+                user=customers[index % CUSTOMERS],
+                order_number=f'EC-TEST-{index:05d}',
+                total_amount=Decimal('100.00'),
+                status=status,
+                assigned_to=cls.staff if status in ('assigned', 'in_progress', 'completed') else None,
+                payment_completed_at=now - timedelta(hours=index) if status in PAID_STATUSES else None
+            ))
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                content_type=cls.package_ct,
+                object_id=packages[index % PACKAGES].id,
+                quantity=1,
+                price=Decimal('100.00')
+            )
+            for index, order in enumerate(Order.objects.order_by('id'))
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE orders_order')
+            cursor.execute('ANALYZE orders_orderitem')
+
+    def assertIndexScan(self, queryset, table, index_names, max_rows=None, realistic=False):
+        """
+        Assert that `table` is read through one of `index_names` with an
+        index condition or, when `max_rows` is given, an estimate of at
+        most `max_rows` rows, and that no hot table is fully scanned
+        """
+        scans = plan_scans(queryset, realistic)
+        self.assertEqual([scan for scan in scans if scan['index'] is None and scan['table'] in HOT_TABLES], [])
+        reads = [scan for scan in scans if scan['index'] in index_names]
+        self.assertTrue(reads, f'{table} is not read through {", ".join(index_names)}: {scans}')
+        for scan in reads:
+            bounded = max_rows is not None and scan['rows'] is not None and scan['rows'] <= max_rows
+            self.assertTrue(
+                scan['condition'] or bounded,
+                f'{scan["index"]} is read without a condition or bounded estimate: {scan}'
+            )
+
+    def test_customer_order_history(self):
+        """get_my_orders: orders of one user, newest first"""
+        self.assertIndexScan(
+            Order.objects.filter(user=self.customer).order_by('-created_at'),
+            'orders_order', ['order_user_created_idx']
+        )
+
+    def test_customer_order_history_realistic(self):
+        """First page of one customer's orders with the default planner settings"""
+        self.assertIndexScan(
+            Order.objects.filter(user=self.customer).order_by('-created_at')[:20],
+            'orders_order', ['order_user_created_idx'], realistic=True
+        )
+
+    def test_staff_order_list(self):
+        """Staff order list filtered by assignee and status"""
+        self.assertIndexScan(
+            Order.objects.filter(assigned_to=self.staff, status='in_progress').order_by('-created_at'),
+            'orders_order', ['order_staff_status_idx']
+        )
+
+    def test_admin_order_list_by_status(self):
+        """Admin order list filtered by status"""
+        self.assertIndexScan(
+            Order.objects.filter(status='assigned').order_by('-created_at'),
+            'orders_order', ['order_status_created_idx']
+        )
+
+    def test_paid_orders_in_date_range(self):
+        """Revenue analytics over paid orders in a date range"""
+        now = timezone.now()
+        self.assertIndexScan(
+            Order.objects.filter(
+                status__in=PAID_STATUSES,
+                payment_completed_at__isnull=False,
+                payment_completed_at__gte=now - timedelta(days=30),
+                payment_completed_at__lte=now
+            ),
+            'orders_order', ['order_paid_idx']
+        )
+
+    def test_unassigned_ready_orders(self):
+        """Auto-assignment picks the oldest unassigned ready orders"""
+        # SQLite cannot match a partial index predicate against the bound
+        # status parameter and searches the staff index for NULL instead
+        self.assertIndexScan(
+            Order.objects.filter(status='ready_for_processing', assigned_to__isnull=True).order_by('created_at')[:50],
+            'orders_order', ['order_ready_unassigned_idx', 'order_staff_status_idx'], max_rows=ORDERS // 6
+        )
+
+    def test_staff_open_order_counts(self):
+        """Auto-assignment workloads: open orders per staff member"""
+        self.assertIndexScan(
+            AssignmentService.open_orders_by_staff([self.staff.id]),
+            'orders_order', ['order_staff_status_idx']
+        )
+
+    def test_staff_remaining_minutes(self):
+        """Auto-assignment workloads: incomplete checklist items on open orders per staff member"""
+        self.assertIndexScan(
+            AssignmentService.remaining_minutes_by_staff([self.staff.id]),
+            'orders_order', ['order_staff_status_idx']
+        )
+
+    def test_order_items_by_product(self):
+        """Order items of one product"""
+        self.assertIndexScan(
+            OrderItem.objects.filter(content_type=self.package_ct, object_id=self.package.id),
+            'orders_orderitem', ['orderitem_product_idx']
+        )
+
+    def test_order_items_by_product_realistic(self):
+        """Order items of one product with the default planner settings"""
+        self.assertIndexScan(
+            OrderItem.objects.filter(content_type=self.package_ct, object_id=self.package.id),
+            'orders_orderitem', ['orderitem_product_idx'], realistic=True
+        )
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated
@@ -7,6 +8,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Prefetch, Q
 from .models import Order, OrderItem, OrderResource, DynamicResourceSubmission
 from .serializers import (
     OrderSerializer, 
@@ -16,8 +18,11 @@ from .serializers import (
 )
 from .razorpay_client import razorpay_client
 from cart.models import Cart
+from products.models import prefetch_item_products
 from admin_panel.services import NotificationService
+from admin_panel.assignment_service import AssignmentService
 from admin_panel.cache_utils import invalidate_analytics_cache
+from election_cart.metrics import validate_upload
 
 
 @api_view(['POST'])
@@ -184,7 +189,7 @@ def get_order(request, order_id):
     Endpoint: GET /api/orders/{id}/
     """
     try:
-        order = Order.objects.get(id=order_id, user=request.user)
+        order = Order.objects.prefetch_related('items').get(id=order_id, user=request.user)
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Order.DoesNotExist:
@@ -201,7 +206,13 @@ def get_my_orders(request):
     Get all orders for current user.
     Endpoint: GET /api/orders/my-orders/
     """
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = list(
+        Order.objects.filter(user=request.user).prefetch_related('items').order_by('-created_at')
+    )
+    
+    # Load products and images for every order item in one batch
+    prefetch_item_products(item for order in orders for item in order.items.all())
+    
     serializer = OrderSerializer(orders, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -237,7 +248,7 @@ def upload_resources(request, order_id):
         
         # Validate request data
         serializer = ResourceUploadSerializer(data=request.data)
-        if not serializer.is_valid():
+        if not validate_upload(request.FILES.values(), serializer.is_valid):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         # Get order item and verify it belongs to this order
@@ -280,7 +291,10 @@ def upload_resources(request, order_id):
                 order.save()
                 
                 # Notify admins that order is ready for processing
-                NotificationService.notify_admins_new_order(order)
+                NotificationService.queue_admin_notification(order, 'new_order')
+                
+                # Let the scheduler assign it to the least loaded staff member
+                AssignmentService.schedule_assignment()
         
         # Get pending items (items without resources)
         pending_items = []
@@ -325,10 +339,11 @@ def get_order_resources(request, order_id):
     """
     try:
         order = Order.objects.get(id=order_id, user=request.user)
+        items = prefetch_item_products(order.items.select_related('resources'))
         
         # Get all order items with their resources
         items_with_resources = []
-        for item in order.items.all():
+        for item in items:
             item_data = {
                 'id': item.id,
                 'item_type': item.content_type.model,
@@ -367,7 +382,10 @@ def get_resource_upload_status(request, order_id):
     Endpoint: GET /api/orders/{id}/resource-status/
     """
     try:
-        order = Order.objects.get(id=order_id, user=request.user)
+        order = Order.objects.prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('resources'))
+        ).get(id=order_id, user=request.user)
+        prefetch_item_products(order.items.all())
         
         # Get pending items
         pending_items = []
@@ -382,7 +400,9 @@ def get_resource_upload_status(request, order_id):
         
         # Get uploaded items
         uploaded_items = []
-        for item in order.items.filter(resources_uploaded=True):
+        for item in order.items.all():
+            if not item.resources_uploaded:
+                continue
             uploaded_items.append({
                 'id': item.id,
                 'item_type': item.content_type.model,
@@ -418,32 +438,28 @@ def get_order_resource_fields(request, order_id):
     Endpoint: GET /api/orders/{id}/resource-fields/
     """
     from products.models import ResourceFieldDefinition
-    from django.contrib.contenttypes.models import ContentType
     
     try:
         order = Order.objects.get(id=order_id, user=request.user)
+        items = prefetch_item_products(order.items.prefetch_related('dynamic_resources'))
+        
+        # Load the field definitions of every product in the order at once
+        product_filter = Q(pk__in=[])
+        for item in items:
+            product_filter |= Q(content_type_id=item.content_type_id, object_id=item.object_id)
+        fields_by_product = defaultdict(list)
+        for field in ResourceFieldDefinition.objects.filter(product_filter).order_by('order'):
+            fields_by_product[(field.content_type_id, field.object_id)].append(field)
         
         # Get all order items and their required fields
         items_with_fields = []
         
-        for item in order.items.all():
-            # Get the content type for this item
-            content_type = item.content_type
-            product_id = item.object_id
-            
+        for item in items:
             # Get resource field definitions for this product
-            fields = ResourceFieldDefinition.objects.filter(
-                content_type=content_type,
-                object_id=product_id
-            ).order_by('order')
-            
-            # Get existing submissions for this order item
-            existing_submissions = DynamicResourceSubmission.objects.filter(
-                order_item=item
-            ).select_related('field_definition')
+            fields = fields_by_product[(item.content_type_id, item.object_id)]
             
             # Create a map of field_id to submission
-            submission_map = {sub.field_definition.id: sub for sub in existing_submissions}
+            submission_map = {sub.field_definition_id: sub for sub in item.dynamic_resources.all()}
             
             # Build field list with submission status
             field_list = []
@@ -638,7 +654,9 @@ def submit_dynamic_resources(request, order_id):
                     # Validate file using validators
                     try:
                         from .validators import validate_dynamic_resource_submission
-                        validate_dynamic_resource_submission(field_value, field_def)
+                        validate_upload(
+                            [field_value], lambda: validate_dynamic_resource_submission(field_value, field_def)
+                        )
                     except ValidationError as e:
                         errors[field_key] = str(e)
                         continue
@@ -670,7 +688,10 @@ def submit_dynamic_resources(request, order_id):
                 order.save()
                 
                 # Notify admins that order is ready for processing
-                NotificationService.notify_admins_new_order(order)
+                NotificationService.queue_admin_notification(order, 'new_order')
+                
+                # Let the scheduler assign it to the least loaded staff member
+                AssignmentService.schedule_assignment()
         
         # Get pending items
         pending_items = []
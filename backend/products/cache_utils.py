@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from functools import wraps
+import hashlib
+from election_cart.cache_keys import invalidate_namespace, versioned_key
+
+
+def cache_catalog_response(view_method):
+    """
+    Decorator caching the response data of a public catalogue view method.
+    
+    Responses are keyed by their absolute URL, which also determines the
+    image URLs they contain, and kept for CATALOG_CACHE_TIMEOUT seconds or
+    until invalidate_catalog_cache() is called.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        cache_key = versioned_key('catalog', url_hash)
+        
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            return Response(cached_data)
+        
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+    
+    return wrapper
+
+
+def invalidate_catalog_cache():
+    """
+    Invalidate the cached catalogue responses.
+    This should be called when packages, campaigns or their images change.
+    """
+    invalidate_namespace('catalog')
@@ -1,16 +1,77 @@
+from collections import defaultdict
 from django.db import models
+from django.db.models import Prefetch, Q, prefetch_related_objects
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from authentication.models import CustomUser
 from PIL import Image
 from io import BytesIO
 from django.core.files.uploadedfile import InMemoryUploadedFile
 import sys
 import os
+from .cache_utils import invalidate_catalog_cache
 from .validators import validate_image_file
 
 
-class Package(models.Model):
+# Gallery order used everywhere product images are listed: primary image first
+PRODUCT_IMAGE_ORDERING = ('-is_primary', 'order', '-uploaded_at')
+
+
+class ProductQuerySet(models.QuerySet):
+    """Shared queryset for packages and campaigns"""
+    
+    def with_images(self):
+        """
+        Prefetch each product's image gallery into ``prefetched_images``
+        so serializers don't query ProductImage once per product.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                'images',
+                queryset=ProductImage.objects.select_related('content_type').order_by(*PRODUCT_IMAGE_ORDERING),
+                to_attr='prefetched_images'
+            )
+        )
+
+
+class OrderSearchTextMixin:
+    """
+    Keep the search text of orders containing the product current: renaming
+    or deleting a package or campaign rebuilds the search text of its orders.
+    Queryset update() and delete() do not; call
+    Order.objects.with_product(product).refresh_search_text() after them.
+    """
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the name copied into the order search text
+        if 'name' in field_names:
+            instance._search_name = instance.name
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Save the product and refresh its orders' search text if it was renamed"""
+        from orders.models import Order
+        
+        search_name = getattr(self, '_search_name', None)
+        super().save(*args, **kwargs)
+        
+        if search_name is not None and search_name != self.name:
+            Order.objects.with_product(self).refresh_search_text()
+        self._search_name = self.name
+    
+    def delete(self, *args, **kwargs):
+        """Delete the product and drop its name from its orders' search text"""
+        from orders.models import Order
+        
+        order_ids = list(Order.objects.with_product(self).values_list('pk', flat=True))
+        result = super().delete(*args, **kwargs)
+        Order.objects.filter(pk__in=order_ids).refresh_search_text()
+        return result
+
+
+class Package(OrderSearchTextMixin, models.Model):
     name = models.CharField(max_length=200)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField()
@@ -20,9 +81,16 @@ class Package(models.Model):
     created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_packages')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    images = GenericRelation('ProductImage')
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the unified product listing
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
     def __str__(self):
         return self.name
@@ -37,7 +105,7 @@ class PackageItem(models.Model):
         return f"{self.name} (x{self.quantity})"
 
 
-class Campaign(models.Model):
+class Campaign(OrderSearchTextMixin, models.Model):
     name = models.CharField(max_length=200)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     unit = models.CharField(max_length=50)
@@ -48,9 +116,16 @@ class Campaign(models.Model):
     created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_campaigns')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    images = GenericRelation('ProductImage')
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the unified product listing
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
     def __str__(self):
         return self.name
@@ -153,6 +228,70 @@ class ChecklistTemplateItem(models.Model):
         return f"{self.name} for {self.content_type} #{self.object_id}"
 
 
+class ProductImageQuerySet(models.QuerySet):
+    """QuerySet for product images with batch loading helpers"""
+    
+    def for_products(self, products):
+        """Filter images belonging to any of the given packages/campaigns"""
+        ids_by_type = defaultdict(set)
+        for product in products:
+            ids_by_type[ContentType.objects.get_for_model(product).id].add(product.pk)
+        
+        if not ids_by_type:
+            return self.none()
+        
+        condition = Q()
+        for content_type_id, object_ids in ids_by_type.items():
+            condition |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+        return self.filter(condition)
+    
+    def attach_to(self, products):
+        """
+        Load the images of a batch of products (packages and campaigns may be
+        mixed) in a single query and cache them on each instance as
+        ``prefetched_images``. Products that already carry images are skipped.
+        """
+        products = [p for p in products if not hasattr(p, 'prefetched_images')]
+        if not products:
+            return
+        
+        images_by_product = defaultdict(list)
+        images = self.for_products(products).select_related('content_type').order_by(*PRODUCT_IMAGE_ORDERING)
+        for image in images:
+            images_by_product[(image.content_type_id, image.object_id)].append(image)
+        
+        for product in products:
+            content_type = ContentType.objects.get_for_model(product)
+            product.prefetched_images = images_by_product.get((content_type.id, product.pk), [])
+
+
+def prefetch_item_products(items):
+    """
+    Batch-load the products behind rows that reference a package/campaign
+    through ``content_type``/``object_id`` (order items, cart items), together
+    with package items and image galleries, so serializing them costs a fixed
+    number of queries regardless of how many rows there are.
+    """
+    items = list(items)
+    if not items:
+        return items
+    
+    # Content types are cached by ContentTypeManager, no query needed
+    for item in items:
+        item.content_type = ContentType.objects.get_for_id(item.content_type_id)
+    
+    prefetch_related_objects(items, 'content_object')
+    
+    products = [item.content_object for item in items if item.content_object is not None]
+    packages = [product for product in products if isinstance(product, Package)]
+    campaigns = [product for product in products if isinstance(product, Campaign)]
+    prefetch_related_objects(packages, 'items', 'created_by')
+    prefetch_related_objects(campaigns, 'created_by')
+    ProductImage.objects.attach_to(products)
+    
+    return items
+
+
 class ProductImage(models.Model):
     """Image gallery for products (packages and campaigns)"""
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
@@ -176,6 +315,8 @@ class ProductImage(models.Model):
     
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    objects = ProductImageQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', '-uploaded_at']
         indexes = [
@@ -202,6 +343,7 @@ class ProductImage(models.Model):
             self.thumbnail = self.create_thumbnail()
         
         super().save(*args, **kwargs)
+        invalidate_catalog_cache()
     
     def create_thumbnail(self):
         """Create thumbnail using Pillow"""
@@ -252,3 +394,4 @@ class ProductImage(models.Model):
         if self.thumbnail:
             self.thumbnail.delete(save=False)
         super().delete(*args, **kwargs)
+        invalidate_catalog_cache()
@@ -1,8 +1,35 @@
 from rest_framework import serializers
-from .models import Package, PackageItem, Campaign, ChecklistTemplateItem, ProductAuditLog, ProductImage
+from .models import (
+    Package, PackageItem, Campaign, ChecklistTemplateItem, ProductAuditLog, ProductImage,
+    prefetch_item_products
+)
 from django.contrib.contenttypes.models import ContentType
 
 
+def get_product_images(product):
+    """
+    Return the product's images ordered with the primary image first.
+    Uses images attached by ``with_images()``/``attach_to()`` when present,
+    otherwise loads them once and caches them on the instance.
+    """
+    if not hasattr(product, 'prefetched_images'):
+        ProductImage.objects.attach_to([product])
+    return product.prefetched_images
+
+
+class ProductItemListSerializer(serializers.ListSerializer):
+    """
+    List serializer for rows pointing at a product through a generic foreign
+    key (order items, cart items). Loads the products and their images for the
+    whole batch before serializing each row.
+    """
+    
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        items = prefetch_item_products(iterable)
+        return super().to_representation(items)
+
+
 class PackageItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = PackageItem
@@ -26,25 +53,14 @@ class PackageSerializer(serializers.ModelSerializer):
     
     def get_images(self, obj):
         """Get all images for the package, ordered with primary first"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Package)
-        images = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).order_by('-is_primary', 'order')
+        images = get_product_images(obj)
         
         request = self.context.get('request')
         return ProductImageSerializer(images, many=True, context={'request': request}).data
     
     def get_primary_image(self, obj):
         """Get the primary image for the package"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Package)
-        primary_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_primary=True
-        ).first()
+        primary_image = next((image for image in get_product_images(obj) if image.is_primary), None)
         
         if primary_image:
             request = self.context.get('request')
@@ -124,25 +140,14 @@ class CampaignSerializer(serializers.ModelSerializer):
     
     def get_images(self, obj):
         """Get all images for the campaign, ordered with primary first"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Campaign)
-        images = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).order_by('-is_primary', 'order')
+        images = get_product_images(obj)
         
         request = self.context.get('request')
         return ProductImageSerializer(images, many=True, context={'request': request}).data
     
     def get_primary_image(self, obj):
         """Get the primary image for the campaign"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Campaign)
-        primary_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_primary=True
-        ).first()
+        primary_image = next((image for image in get_product_images(obj) if image.is_primary), None)
         
         if primary_image:
             request = self.context.get('request')
@@ -203,7 +208,8 @@ class ProductAuditLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
     
     def get_product_type(self, obj):
-        return obj.content_type.model
+        # Served from the content type cache instead of a query per object
+        return ContentType.objects.get_for_id(obj.content_type_id).model
 
 
 class ChecklistTemplateItemSerializer(serializers.ModelSerializer):
@@ -219,7 +225,8 @@ class ChecklistTemplateItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'product_type', 'product_id']
     
     def get_product_type(self, obj):
-        return obj.content_type.model
+        # Served from the content type cache instead of a query per object
+        return ContentType.objects.get_for_id(obj.content_type_id).model
     
     def get_product_id(self, obj):
         return obj.object_id
@@ -277,7 +284,9 @@ class ProductImageSerializer(serializers.ModelSerializer):
         return None
     
     def get_product_type(self, obj):
-        return obj.content_type.model if obj.content_type else None
+        if not obj.content_type_id:
+            return None
+        return ContentType.objects.get_for_id(obj.content_type_id).model
     
     def get_product_id(self, obj):
         return obj.object_id
@@ -2,7 +2,10 @@
 API tests for election cart enhancements
 Tests for product CRUD, resource field management, checklist templates, analytics, and image uploads
 """
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from rest_framework.test import APITestCase, APIClient
@@ -117,7 +120,55 @@ class ProductCRUDAPITest(APITestCase):
         response = self.client.get('/api/admin/products/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 2)
+        self.assertGreaterEqual(len(response.data['results']), 2)
+    
+    def test_list_all_products_keyset_pagination(self):
+        """Test that the unified product listing pages through both product types"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        for index in range(3):
+            Package.objects.create(
+                name=f'Package {index}',
+                price=Decimal('100.00'),
+                description='Package description'
+            )
+            Campaign.objects.create(
+                name=f'Campaign {index}',
+                price=Decimal('50.00'),
+                unit='per day',
+                description='Campaign description',
+                created_by=self.admin_user
+            )
+        
+        seen = []
+        url = '/api/admin/products/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 4)
+            seen.extend((product['type'], product['id']) for product in response.data['results'])
+            url = response.data['next']
+        
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+        
+        # Filtering by type and search is applied in the database
+        response = self.client.get('/api/admin/products/?type=package&search=Package 1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['created_by_name'], 'N/A')
+        self.assertIsNone(response.data['next'])
+    
+    def test_list_all_products_limits_each_branch(self):
+        """Test that each product type is ordered and limited before the UNION where supported"""
+        self.client.force_authenticate(user=self.admin_user)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/admin/products/?page_size=4')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = next(query['sql'] for query in queries.captured_queries if 'UNION ALL' in query['sql'])
+        limits = 3 if connection.features.supports_slicing_ordering_in_compound else 1
+        self.assertEqual(sql.count('LIMIT'), limits)
     
     def test_update_package(self):
         """Test updating a package"""
@@ -199,6 +250,50 @@ class ProductCRUDAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class CatalogCacheAPITest(APITestCase):
+    """Test that public catalogue responses are cached and invalidated by product writes"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.admin_user = User.objects.create_user(
+            username='admin',
+            password='testpass123',
+            phone_number='1234567890',
+            is_staff=True,
+            is_superuser=True
+        )
+        self.package = Package.objects.create(
+            name='Test Package',
+            price=Decimal('100.00'),
+            description='Test',
+            is_active=True,
+            created_by=self.admin_user
+        )
+        self.client = APIClient()
+    
+    def test_package_list_is_cached(self):
+        """Test that a repeated catalogue request runs no queries"""
+        first = self.client.get('/api/packages/')
+        
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/packages/')
+        
+        self.assertEqual(second.data, first.data)
+    
+    def test_product_writes_invalidate_catalog(self):
+        """Test that changes made through the admin API show up immediately"""
+        self.client.get('/api/packages/')
+        self.client.get(f'/api/packages/{self.package.id}/')
+        
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.patch(f'/api/admin/products/package/{self.package.id}/toggle-status/')
+        self.client.force_authenticate(user=None)
+        
+        self.assertEqual(len(self.client.get('/api/packages/').data['results']), 0)
+        self.assertEqual(self.client.get(f'/api/packages/{self.package.id}/').status_code, status.HTTP_404_NOT_FOUND)
+
+
 class ResourceFieldManagementAPITest(APITestCase):
     """Test resource field management API endpoints"""
     
@@ -398,6 +398,41 @@ class ProductImageModelTest(TestCase):
         self.assertEqual(images[0], image2)
         self.assertEqual(images[1], image3)
         self.assertEqual(images[2], image1)
+    
+    def test_attach_images_to_mixed_products(self):
+        """Test that images for packages and campaigns are loaded in one query"""
+        campaign = Campaign.objects.create(
+            name='Test Campaign',
+            price=Decimal('50.00'),
+            unit='per day',
+            description='Test description'
+        )
+        campaign_ct = ContentType.objects.get_for_model(Campaign)
+        
+        package_image = ProductImage.objects.create(
+            content_type=self.package_ct,
+            object_id=self.package.id,
+            image=self.create_test_image(color='red'),
+            is_primary=True,
+            order=1
+        )
+        campaign_image = ProductImage.objects.create(
+            content_type=campaign_ct,
+            object_id=campaign.id,
+            image=self.create_test_image(color='blue'),
+            order=0
+        )
+        
+        products = [Package.objects.get(id=self.package.id), Campaign.objects.get(id=campaign.id)]
+        with self.assertNumQueries(1):
+            ProductImage.objects.attach_to(products)
+        
+        self.assertEqual(products[0].prefetched_images, [package_image])
+        self.assertEqual(products[1].prefetched_images, [campaign_image])
+        
+        # Querysets can prefetch the gallery as well
+        package = Package.objects.with_images().get(id=self.package.id)
+        self.assertEqual(package.prefetched_images, [package_image])
 
 
 class PaymentHistoryModelTest(TestCase):
@@ -2,10 +2,14 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import get_object_or_404
-from django.db import models
-from django.db.models import Q
+from django.db import connection, models
+from django.db.models import Q, Case, CharField, Value, When
+from django.db.models.functions import Concat, Trim
+from django.utils.dateparse import parse_datetime
 from .models import Package, Campaign, ChecklistTemplateItem, ProductAuditLog, ProductImage
 from .serializers import (
     PackageSerializer, CampaignSerializer, ChecklistTemplateItemSerializer,
@@ -13,6 +17,11 @@ from .serializers import (
     ProductAuditLogSerializer, ProductImageSerializer, ProductImageWriteSerializer
 )
 from orders.models import Order, OrderItem
+from .cache_utils import cache_catalog_response, invalidate_catalog_cache
+from election_cart.metrics import validate_upload
+import base64
+import binascii
+import json
 
 
 class PackageViewSet(viewsets.ReadOnlyModelViewSet):
@@ -20,7 +29,7 @@ class PackageViewSet(viewsets.ReadOnlyModelViewSet):
     ViewSet for viewing packages.
     Provides list and detail endpoints.
     """
-    queryset = Package.objects.filter(is_active=True).prefetch_related('items')
+    queryset = Package.objects.filter(is_active=True).select_related('created_by').prefetch_related('items').with_images()
     serializer_class = PackageSerializer
     permission_classes = [AllowAny]
     
@@ -29,6 +38,14 @@ class PackageViewSet(viewsets.ReadOnlyModelViewSet):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
+    
+    @cache_catalog_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cache_catalog_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class CampaignViewSet(viewsets.ReadOnlyModelViewSet):
@@ -36,7 +53,7 @@ class CampaignViewSet(viewsets.ReadOnlyModelViewSet):
     ViewSet for viewing campaigns.
     Provides list and detail endpoints.
     """
-    queryset = Campaign.objects.filter(is_active=True)
+    queryset = Campaign.objects.filter(is_active=True).select_related('created_by').with_images()
     serializer_class = CampaignSerializer
     permission_classes = [AllowAny]
     
@@ -45,6 +62,14 @@ class CampaignViewSet(viewsets.ReadOnlyModelViewSet):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
+    
+    @cache_catalog_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cache_catalog_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class ChecklistTemplateViewSet(viewsets.ModelViewSet):
@@ -215,61 +240,133 @@ def create_audit_log(product, action, user, changes=None):
     )
 
 
+PRODUCT_LIST_FIELDS = (
+    'id', 'name', 'price', 'description', 'is_active',
+    'created_at', 'updated_at', 'created_by_name', 'type'
+)
+PRODUCT_LIST_ORDERING = ('-created_at', '-type', '-id')
+PRODUCT_LIST_MAX_PAGE_SIZE = 100
+
+
+def _encode_product_cursor(product):
+    """Encode the ordering key of a product row as an opaque cursor"""
+    key = [product['created_at'].isoformat(), product['type'], product['id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_product_cursor(cursor):
+    """Decode a cursor into (created_at, type, id), raising ValueError if malformed"""
+    try:
+        created_at, product_type, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError('Invalid cursor')
+    if created_at is None or product_type not in ('package', 'campaign') or not isinstance(product_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, product_type, product_id
+
+
+def _product_list_queryset(model, product_type, search_query, is_active, cursor):
+    """
+    Build the rows of one product type for the unified product listing.
+    Filtering and the keyset condition are applied per table so each
+    branch of the UNION can use its own created_at index.
+    """
+    queryset = model.objects.order_by().annotate(
+        type=Value(product_type, output_field=CharField()),
+        created_by_name=Case(
+            When(created_by__isnull=True, then=Value('N/A')),
+            default=Trim(Concat('created_by__first_name', Value(' '), 'created_by__last_name')),
+            output_field=CharField()
+        )
+    )
+    if search_query:
+        queryset = queryset.filter(name__icontains=search_query)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    
+    # Only rows after the cursor in (created_at, type, id) descending order
+    if cursor:
+        cursor_created_at, cursor_type, cursor_id = cursor
+        if product_type < cursor_type:
+            queryset = queryset.filter(created_at__lte=cursor_created_at)
+        elif product_type == cursor_type:
+            queryset = queryset.filter(
+                Q(created_at__lt=cursor_created_at) |
+                Q(created_at=cursor_created_at, id__lt=cursor_id)
+            )
+        else:
+            queryset = queryset.filter(created_at__lt=cursor_created_at)
+    
+    return queryset.values(*PRODUCT_LIST_FIELDS)
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_all_products(request):
     """
     List all products (packages and campaigns) in a unified format.
-    Supports search by name and filtering by type.
+    Supports search by name and filtering by type and active status.
+    
+    Packages and campaigns are merged, ordered and paginated by the database
+    with a single UNION ALL query. Results are returned newest first in
+    pages; pass the returned `next` cursor to fetch the following page.
     """
     search_query = request.query_params.get('search', '')
     product_type = request.query_params.get('type', '')  # 'package' or 'campaign'
+    is_active = request.query_params.get('is_active')
     
-    products = []
-    
-    # Get packages
-    if not product_type or product_type == 'package':
-        packages = Package.objects.select_related('created_by').all()
-        if search_query:
-            packages = packages.filter(name__icontains=search_query)
-        
-        for package in packages:
-            products.append({
-                'id': package.id,
-                'name': package.name,
-                'price': package.price,
-                'description': package.description,
-                'is_active': package.is_active,
-                'created_at': package.created_at,
-                'updated_at': package.updated_at,
-                'created_by_name': package.created_by.get_full_name() if package.created_by else 'N/A',
-                'type': 'package'
-            })
-    
-    # Get campaigns
-    if not product_type or product_type == 'campaign':
-        campaigns = Campaign.objects.select_related('created_by').all()
-        if search_query:
-            campaigns = campaigns.filter(name__icontains=search_query)
-        
-        for campaign in campaigns:
-            products.append({
-                'id': campaign.id,
-                'name': campaign.name,
-                'price': campaign.price,
-                'description': campaign.description,
-                'is_active': campaign.is_active,
-                'created_at': campaign.created_at,
-                'updated_at': campaign.updated_at,
-                'created_by_name': campaign.created_by.get_full_name() if campaign.created_by else 'N/A',
-                'type': 'campaign'
-            })
-    
-    # Sort by created_at descending
-    products.sort(key=lambda x: x['created_at'], reverse=True)
+    if product_type and product_type not in ('package', 'campaign'):
+        return Response(
+            {'error': 'Invalid product type. Must be "package" or "campaign"'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if is_active is not None:
+        is_active = is_active.lower() in ('true', '1')
+    
+    try:
+        page_size = int(request.query_params.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE']))
+    except ValueError:
+        return Response({'error': 'page_size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = max(1, min(page_size, PRODUCT_LIST_MAX_PAGE_SIZE))
+    
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            cursor = _decode_product_cursor(cursor)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    branches = [
+        _product_list_queryset(model, name, search_query, is_active, cursor)
+        for model, name in ((Package, 'package'), (Campaign, 'campaign'))
+        if not product_type or product_type == name
+    ]
+    products = branches[0]
+    if len(branches) > 1:
+        # A page never needs more than page_size + 1 rows of either type, so
+        # each branch is ordered and limited on its own (created_at, id)
+        # index before the UNION instead of merging both tables in full.
+        # SQLite does not allow LIMIT inside compound statements.
+        if connection.features.supports_slicing_ordering_in_compound:
+            branches = [branch.order_by('-created_at', '-id')[:page_size + 1] for branch in branches]
+            products = branches[0]
+        products = products.union(*branches[1:], all=True)
+    
+    # Fetch one extra row to know whether there is a next page
+    products = list(products.order_by(*PRODUCT_LIST_ORDERING)[:page_size + 1])
+    next_url = None
+    if len(products) > page_size:
+        products = products[:page_size]
+        next_url = replace_query_param(
+            request.build_absolute_uri(), 'cursor', _encode_product_cursor(products[-1])
+        )
     
     serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    return Response({
+        'next': next_url,
+        'results': serializer.data
+    })
 
 
 @api_view(['POST'])
@@ -280,6 +377,7 @@ def create_package(request):
     
     if serializer.is_valid():
         package = serializer.save(created_by=request.user)
+        invalidate_catalog_cache()
         
         # Create audit log
         create_audit_log(package, 'create', request.user, {
@@ -302,6 +400,7 @@ def create_campaign(request):
     
     if serializer.is_valid():
         campaign = serializer.save(created_by=request.user)
+        invalidate_catalog_cache()
         
         # Create audit log
         create_audit_log(campaign, 'create', request.user, {
@@ -373,6 +472,8 @@ def update_product(request, product_type, product_id):
         changes = {k: {'old': old_data[k], 'new': new_data[k]} 
                    for k in old_data if old_data[k] != new_data[k]}
         
+        invalidate_catalog_cache()
+        
         # Create audit log
         create_audit_log(updated_product, 'update', request.user, changes)
         
@@ -425,6 +526,7 @@ def delete_product(request, product_type, product_id):
     
     # Delete the product
     product.delete()
+    invalidate_catalog_cache()
     
     return Response(
         {'message': f'{product_type.capitalize()} deleted successfully'},
@@ -450,6 +552,7 @@ def toggle_product_status(request, product_type, product_id):
     old_status = product.is_active
     product.is_active = not product.is_active
     product.save()
+    invalidate_catalog_cache()
     
     # Create audit log
     action = 'activate' if product.is_active else 'deactivate'
@@ -596,7 +699,7 @@ class ProductImageViewSet(viewsets.ModelViewSet):
         
         # Create the image
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        validate_upload(request.FILES.values(), lambda: serializer.is_valid(raise_exception=True))
         
         # If order is not provided, set it to the next available order
         if 'order' not in request.data or request.data['order'] is None:
@@ -693,6 +796,7 @@ class ProductImageViewSet(viewsets.ModelViewSet):
             if item_id is not None and new_order is not None:
                 ProductImage.objects.filter(id=item_id).update(order=new_order)
                 updated_items.append(item_id)
+        invalidate_catalog_cache()
         
         # Return updated items
         updated_queryset = ProductImage.objects.filter(id__in=updated_items).order_by('order')